@@ -0,0 +1,97 @@
+"""
+Cold-start benchmark for the Streamlit pages.
+
+Each page is imported and rendered once in a fresh interpreter (so no module
+is already cached) using Streamlit's headless AppTest runner. Reports the
+time to import Streamlit's test harness, the first render of the page and
+the heavy modules that ended up imported.
+
+Usage (from the repo root):
+    python benchmarks/cold_start.py
+    python benchmarks/cold_start.py --repeat 5 --output benchmarks/results/cold_start.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PAGES = ["Home.py", "pages/Wind.py", "pages/Solar.py", "pages/Map.py", "pages/Help.py"]
+HEAVY_MODULES = ["openai", "geopy", "plotly", "folium", "streamlit_folium", "dotenv", "requests", "pyarrow"]
+
+# Runs inside the fresh interpreter and prints one JSON line
+_PROBE = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+harness_loaded = time.perf_counter()
+at = AppTest.from_file({page!r}, default_timeout=60)
+at.run()
+rendered = time.perf_counter()
+print(json.dumps({{
+    "harness_s": harness_loaded - start,
+    "first_render_s": rendered - harness_loaded,
+    "exceptions": len(at.exception),
+    "heavy_modules": [m for m in {heavy!r} if m in sys.modules],
+}}))
+"""
+
+
+def measure_page(page, env=None):
+    """Render one page in a fresh interpreter and return its timings"""
+
+    code = _PROBE.format(root=REPO_ROOT, page=os.path.join(REPO_ROOT, page), heavy=HEAVY_MODULES)
+    proc = subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, env=env,
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"{page} failed:\n{proc.stderr}")
+
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def run(pages=PAGES, repeat=3):
+    """Median cold-start timings per page"""
+
+    # Never reach real services during a benchmark
+    env = dict(os.environ, OPENAI_API_KEY=os.environ.get("OPENAI_API_KEY", "benchmark"))
+
+    results = {}
+    for page in pages:
+        samples = [measure_page(page, env) for _ in range(repeat)]
+        results[page] = {
+            "first_render_s": statistics.median(s["first_render_s"] for s in samples),
+            "harness_s": statistics.median(s["harness_s"] for s in samples),
+            "exceptions": max(s["exceptions"] for s in samples),
+            "heavy_modules": samples[-1]["heavy_modules"],
+        }
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh interpreters per page")
+    parser.add_argument("--page", action="append", help="Only benchmark these pages")
+    parser.add_argument("--output", help="Write results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.page or PAGES, args.repeat)
+
+    print(f"{'Page':<18} {'First render (ms)':>18}  Heavy modules loaded")
+    print("-" * 80)
+    for page, r in results.items():
+        flag = " (exceptions)" if r["exceptions"] else ""
+        print(f"{page:<18} {r['first_render_s'] * 1000:>18.1f}  {', '.join(r['heavy_modules']) or '-'}{flag}")
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Cold-load time and memory of candidate grids: CSV vs memory-mapped binary grid.
+
+Every measurement runs in a fresh process (imports done before timing), loads
+the candidate table one way and touches every value, then reports the load
+time and the growth of resident memory. On Linux it also reports the growth of
+anonymous memory: the part of the resident growth that is not file-backed, so
+cannot be shared with other processes that map the same grid.
+
+Besides the two wind CSVs, a synthetic grid of --rows rows is generated to
+show how both paths scale.
+
+Usage (from the repo root):
+    python benchmarks/grid_load.py
+    python benchmarks/grid_load.py --rows 2000000 --trials 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+WIND_CSVS = [
+    "renewable_energies/wind/optimal_wind_turbine_locations.csv",
+    "renewable_energies/wind/all_candidate_locations.csv",
+]
+
+
+def _memory_kb():
+    """(rss, anonymous) in kB from /proc, or (ru_maxrss, None) elsewhere"""
+
+    try:
+        fields = {}
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].endswith(":"):
+                    fields[parts[0][:-1]] = int(parts[1])
+        return fields["Rss"], fields["Anonymous"]
+    except (OSError, KeyError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, None
+
+
+def child(method, csv_path):
+    import pandas as pd
+
+    from src.grid_store import grid_path_for, load_grid
+
+    rss_before, anon_before = _memory_kb()
+    start = time.perf_counter()
+    if method == "csv":
+        df = pd.read_csv(csv_path)
+    else:
+        df = load_grid(grid_path_for(csv_path))
+    load_s = time.perf_counter() - start
+
+    # Touch every value so mapped pages are actually read
+    checksum = sum(float(df[col].to_numpy().sum(dtype="float64")) for col in df.columns)
+    touched_s = time.perf_counter() - start
+
+    rss_after, anon_after = _memory_kb()
+    print(json.dumps({
+        "load_s": load_s,
+        "load_and_scan_s": touched_s,
+        "rss_kb": rss_after - rss_before,
+        "anon_kb": None if anon_before is None else anon_after - anon_before,
+        "checksum": checksum,
+    }))
+
+
+def measure(method, csv_path, trials):
+    runs = []
+    for _ in range(trials):
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", method, csv_path],
+            cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        )
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    return {key: statistics.median(r[key] for r in runs) if runs[0][key] is not None else None
+            for key in ("load_s", "load_and_scan_s", "rss_kb", "anon_kb")}
+
+
+def make_synthetic_csv(path, rows):
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(0)
+    side = int(np.ceil(np.sqrt(rows)))
+    lat, lon = np.meshgrid(np.linspace(25, 49, side), np.linspace(-125, -67, side), indexing="ij")
+    speed = rng.weibull(2.0, side * side) * 8
+    pd.DataFrame({
+        "lat": lat.ravel()[:rows],
+        "lon": lon.ravel()[:rows],
+        "power_potential": (0.5 * 1.225 * speed ** 3)[:rows],
+        "mean_wind_speed": speed[:rows],
+        "nearest_turbine_km": rng.uniform(0, 500, side * side)[:rows],
+    }).to_csv(path, index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Rows in the synthetic grid (0 to skip)")
+    parser.add_argument("--trials", type=int, default=3, help="Fresh processes per measurement")
+    parser.add_argument("--child", nargs=2, metavar=("METHOD", "CSV"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child)
+        return
+
+    from src.grid_store import convert_csv
+
+    os.chdir(REPO_ROOT)
+    with tempfile.TemporaryDirectory() as tmp:
+        datasets = [path for path in WIND_CSVS if os.path.exists(path)]
+        if args.rows:
+            synthetic = os.path.join(tmp, f"synthetic_{args.rows}.csv")
+            make_synthetic_csv(synthetic, args.rows)
+            datasets.append(synthetic)
+
+        print(f"{'Dataset':<40} {'Format':<6} {'Size (KB)':>10} {'Load (ms)':>10} "
+              f"{'+Scan (ms)':>11} {'RSS (KB)':>9} {'Anon (KB)':>10}")
+        print("-" * 102)
+        for csv_path in datasets:
+            grid_path = convert_csv(csv_path)
+            for method, path in (("csv", csv_path), ("grid", grid_path)):
+                result = measure(method, csv_path, args.trials)
+                anon = f"{result['anon_kb']:>10.0f}" if result["anon_kb"] is not None else f"{'-':>10}"
+                print(f"{os.path.basename(csv_path):<40} {method:<6} {os.path.getsize(path) / 1024:>10.0f} "
+                      f"{result['load_s'] * 1000:>10.2f} {result['load_and_scan_s'] * 1000:>11.2f} "
+                      f"{result['rss_kb']:>9.0f} {anon}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Connection pooling and shared rate limiting under concurrent users.
+
+Simulates N concurrent sessions each fetching solar resource data from the
+local stub NREL server (which enforces a per-second rate limit), first with
+a bare requests.get per call - as the Solar page used to - and then through
+the shared pooled session and rate limiter in src.services. Reports upstream
+connections opened, rate-limit violations and wall time for both.
+
+Usage (from the repo root):
+    python benchmarks/http_pool_demo.py
+    python benchmarks/http_pool_demo.py --users 50 --requests-per-user 4 --upstream-rate 50
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+import requests
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src import services  # noqa: E402
+from stub_servers import start_stub_server  # noqa: E402
+
+
+def naive_fetch(url, params):
+    return requests.get(url, params=params, timeout=30)
+
+
+def pooled_fetch(url, params):
+    return services.http_get(url, params=params, rate_limit="nrel")
+
+
+def run_users(fetch, url, users, requests_per_user):
+    """Start all users at once and wait for them; returns (wall seconds, failed responses)"""
+
+    failures = []
+    barrier = threading.Barrier(users)
+
+    def user(i):
+        barrier.wait()
+        for j in range(requests_per_user):
+            response = fetch(url, {"api_key": "stub", "lat": 25 + (i % 20), "lon": -100 + j})
+            if response.status_code != 200:
+                failures.append(response.status_code)
+
+    threads = [threading.Thread(target=user, args=(i,)) for i in range(users)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - start, len(failures)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=50, help="Concurrent sessions")
+    parser.add_argument("--requests-per-user", type=int, default=4)
+    parser.add_argument("--upstream-rate", type=int, default=50, help="Stub rate limit, requests/s")
+    parser.add_argument("--latency", type=float, default=0.02, help="Stub response latency (s)")
+    args = parser.parse_args()
+
+    server = start_stub_server(latency=args.latency, rate_limit=args.upstream_rate)
+    url = f"{server.url}/api/solar/solar_resource/v1.json"
+
+    # Pace slightly under the upstream limit; calendar-second windows allow a small burst
+    os.environ["NREL_RATE_LIMIT"] = str(args.upstream_rate * 0.8)
+    services.reset()
+
+    rows = []
+    for label, fetch in (("bare requests.get", naive_fetch), ("pooled + rate limited", pooled_fetch)):
+        server.reset_stats()
+        wall, failed = run_users(fetch, url, args.users, args.requests_per_user)
+        rows.append((label, server.stats["connections"], server.stats["requests"],
+                     server.stats["rate_limited"], failed, wall))
+
+    total = args.users * args.requests_per_user
+    print(f"{args.users} users x {args.requests_per_user} requests = {total} page requests, "
+          f"upstream limit {args.upstream_rate}/s\n")
+    print(f"{'Client':<24} {'Connections':>12} {'Upstream req':>13} {'429s':>6} {'Failed':>7} {'Wall (s)':>9}")
+    print("-" * 76)
+    for label, connections, upstream, limited, failed, wall in rows:
+        print(f"{label:<24} {connections:>12} {upstream:>13} {limited:>6} {failed:>7} {wall:>9.2f}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,321 @@
+"""
+Micro-benchmarks for the calculation hot paths.
+
+Every benchmark runs on synthetic data at sizes from 10^3 up to --max-size
+rows and reports throughput (rows/s) and peak traced memory. Results can be
+stored as a baseline and later checked against it.
+
+Usage (from the repo root):
+    python benchmarks/micro.py                         # run, print table
+    python benchmarks/micro.py --max-size 10000000     # full range
+    python benchmarks/micro.py --save-baseline         # store benchmarks/baselines.json
+    python benchmarks/micro.py --check                 # exit 1 on regression or a benchmark without baseline
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from src import calculations  # noqa: E402
+from src.site_selection import diverse_top_k  # noqa: E402
+from src.solar_production import calculate_solar_financials, simulate_pv  # noqa: E402
+from src.synthetic import synthetic_wind_features  # noqa: E402
+from src.wind_production import calculate_wind_metrics, site_production  # noqa: E402
+
+BASELINE_FILE = os.path.join(REPO_ROOT, "benchmarks", "baselines.json")
+SIZES = [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7]
+
+
+# ---------- Synthetic data ----------
+
+def make_locations(n, seed=0):
+    """Location table shaped like calculations.load_locations_data"""
+
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "location": [f"Site {i}" for i in range(n)],
+        "irradiance": rng.uniform(3.5, 6.5, n),
+        "temperature": rng.uniform(5, 35, n),
+        "weather_stability": rng.uniform(60, 98, n),
+    })
+
+
+def make_wind_sites(n, seed=0):
+    """Candidate grid rows shaped like optimal_wind_turbine_locations.csv"""
+
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "lat": rng.uniform(26.0, 36.5, n).astype(np.float32),
+        "lon": rng.uniform(-106.5, -93.5, n).astype(np.float32),
+        "power_potential": rng.uniform(100, 700, n).astype(np.float32),
+        "mean_wind_speed": rng.uniform(4.0, 10.0, n).astype(np.float32),
+        "nearest_turbine_km": rng.uniform(1, 500, n).astype(np.float32),
+    })
+
+
+def make_weather(n_sites, n_hours=8760, seed=0):
+    """(n_sites, n_hours, 2) GHI / temperature array with a daily cycle"""
+
+    rng = np.random.default_rng(seed)
+    hours = np.arange(n_hours, dtype=np.float32)
+    daylight = np.clip(np.sin((hours % 24 - 6) / 12 * np.pi), 0, None)
+    weather = np.empty((n_sites, n_hours, 2), dtype=np.float32)
+    weather[:, :, 0] = daylight * rng.uniform(700, 1000, (n_sites, 1)).astype(np.float32)
+    weather[:, :, 1] = rng.uniform(0, 30, (n_sites, 1)).astype(np.float32)
+    return weather
+
+
+# ---------- Benchmarks ----------
+# Each entry: setup(n) -> state, run(state), largest n it is run at.
+# Row-at-a-time code paths are capped so a full run finishes in minutes.
+
+def _bench_score_and_rank():
+    facilities = calculations.load_facilities_data()
+
+    def setup(n):
+        # n location x facility pairs
+        return make_locations(max(1, n // len(facilities))), facilities
+
+    return setup, lambda state: calculations.score_and_rank(*state), 10 ** 4
+
+
+def _bench_calculate_roi():
+    def setup(n):
+        rng = np.random.default_rng(0)
+        return rng.uniform(1e6, 5e6, n).tolist(), rng.uniform(1e5, 1e6, n).tolist()
+
+    def run(state):
+        for budget, revenue in zip(*state):
+            calculations.calculate_roi(budget, revenue)
+
+    return setup, run, 10 ** 7
+
+
+def _bench_calculate_optimal_config():
+    def setup(n):
+        return make_locations(max(1, n // 4))
+
+    def run(locations):
+        original = calculations.load_locations_data
+        calculations.load_locations_data = lambda: locations
+        try:
+            calculations.calculate_optimal_config(
+                {"location": None, "budget": None, "facility_type": None, "revenue": None}
+            )
+        finally:
+            calculations.load_locations_data = original
+
+    return setup, run, 10 ** 4
+
+
+def _bench_solar_financials():
+    def setup(n):
+        return np.random.default_rng(0).uniform(3.5, 6.5, n).tolist()
+
+    def run(irradiances):
+        for irradiance in irradiances:
+            calculate_solar_financials(irradiance, 10)
+
+    return setup, run, 10 ** 7
+
+
+def _bench_solar_hourly():
+    # n = site-hours, so 10^7 is ~1,100 sites x 8760 h
+    def setup(n):
+        if n < 8760:
+            return make_weather(1, n)
+        return make_weather(n // 8760)
+
+    return setup, simulate_pv, 10 ** 7
+
+
+def _bench_wind_metrics():
+    def run(sites):
+        calculate_wind_metrics(site_production(sites), 10, 1.5, availability=0.9)
+
+    return make_wind_sites, run, 10 ** 7
+
+
+def _bench_notebook_grid():
+    """The wind notebook's per-cell candidate evaluation (features + nearest turbine)"""
+
+    def setup(n):
+        side = max(1, int(math.sqrt(n)))
+        lats = np.linspace(26.0, 36.5, side)
+        lons = np.linspace(-106.5, -93.5, side)
+        turbines = make_wind_sites(50, seed=1)[["lat", "lon"]].to_numpy(np.float64)
+        return lats, lons, turbines
+
+    def run(state):
+        lats, lons, turbines = state
+        t_lat = np.radians(turbines[:, 0])
+        t_lon = np.radians(turbines[:, 1])
+        for lat in lats:
+            for lon in lons:
+                np.random.seed(int(abs(lat * 1000 + lon * 1000)) % 2 ** 32)
+                base_wind = 6 + (abs(lat - 35) / 10) + np.random.normal(0, 1)
+                np.random.uniform(0.5, 1.5)
+                np.random.uniform(2, 5)
+                np.random.uniform(-3, 3)
+                np.random.choice([45, 90, 135, 180, 225, 270])
+                # Haversine stands in for geopy's geodesic distance
+                dlat = t_lat - math.radians(lat)
+                dlon = t_lon - math.radians(lon)
+                a = np.sin(dlat / 2) ** 2 + math.cos(math.radians(lat)) * np.cos(t_lat) * np.sin(dlon / 2) ** 2
+                (2 * 6371.0 * np.arcsin(np.sqrt(a))).min()
+
+    return setup, run, 10 ** 4
+
+
+def _bench_diverse_top_k():
+    """Top 10 wind sites at least 50 km apart on a regular n-cell grid"""
+
+    def setup(n):
+        side = max(2, int(math.sqrt(n)))
+        lat, lon = np.meshgrid(np.linspace(26.0, 36.5, side), np.linspace(-106.5, -93.5, side), indexing="ij")
+        rng = np.random.default_rng(0)
+        return pd.DataFrame({
+            "lat": lat.ravel(),
+            "lon": lon.ravel(),
+            "power_potential": rng.uniform(100, 700, side * side),
+        })
+
+    return setup, lambda sites: diverse_top_k(sites, "power_potential", k=10, min_separation_km=50), 10 ** 7
+
+
+def _bench_synthetic_features():
+    """Counter-based synthetic wind features (replaces the notebook's per-point reseeding)"""
+
+    def setup(n):
+        rng = np.random.default_rng(0)
+        return rng.uniform(26.0, 36.5, n), rng.uniform(-106.5, -93.5, n)
+
+    return setup, lambda state: synthetic_wind_features(*state), 10 ** 7
+
+
+BENCHMARKS = {
+    "score_and_rank": _bench_score_and_rank,
+    "calculate_roi": _bench_calculate_roi,
+    "calculate_optimal_config": _bench_calculate_optimal_config,
+    "solar_financials": _bench_solar_financials,
+    "solar_hourly_simulation": _bench_solar_hourly,
+    "wind_metrics": _bench_wind_metrics,
+    "notebook_grid_evaluation": _bench_notebook_grid,
+    "diverse_top_k": _bench_diverse_top_k,
+    "synthetic_wind_features": _bench_synthetic_features,
+}
+
+
+def measure(setup, run, n, repeat=3):
+    """Best wall time over `repeat` runs and peak traced memory of one run"""
+
+    state = setup(n)
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run(state)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    run(state)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"seconds": best, "rows_per_s": n / best if best > 0 else float("inf"), "peak_mb": peak / 2 ** 20}
+
+
+def run_suite(names=None, max_size=10 ** 5, repeat=3):
+    results = {}
+    for name in names or BENCHMARKS:
+        setup, run, cap = BENCHMARKS[name]()
+        results[name] = {}
+        for n in SIZES:
+            if n > min(max_size, cap):
+                break
+            results[name][str(n)] = measure(setup, run, n, repeat)
+            r = results[name][str(n)]
+            print(f"{name:<26} n={n:<9,} {r['seconds'] * 1000:>10.2f} ms "
+                  f"{r['rows_per_s']:>14,.0f} rows/s {r['peak_mb']:>9.1f} MB peak")
+    return results
+
+
+def check_regressions(results, baseline, threshold):
+    """
+    Compare results with the baseline.
+
+    Returns:
+        (regressions: throughput fell more than `threshold` below baseline,
+         unchecked: results with no baseline to compare against)
+    """
+
+    regressions = []
+    unchecked = []
+    for name, by_size in results.items():
+        for size, r in by_size.items():
+            base = baseline.get(name, {}).get(size)
+            if not base:
+                unchecked.append(f"{name} n={size}")
+            elif r["rows_per_s"] < base["rows_per_s"] * (1 - threshold):
+                regressions.append(
+                    f"{name} n={size}: {r['rows_per_s']:,.0f} rows/s vs baseline {base['rows_per_s']:,.0f}"
+                )
+    return regressions, unchecked
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bench", action="append", choices=sorted(BENCHMARKS), help="Only run these benchmarks")
+    parser.add_argument("--max-size", type=int, default=10 ** 5, help="Largest synthetic size (up to 10^7)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per size (best is kept)")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="Baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the baseline")
+    parser.add_argument("--check", action="store_true", help="Fail if throughput regressed vs the baseline")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed throughput drop before --check fails (default 25%%)")
+    args = parser.parse_args()
+
+    results = run_suite(args.bench, args.max_size, args.repeat)
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+
+    if args.check:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions, unchecked = check_regressions(results, baseline, args.threshold)
+        if unchecked:
+            print("\nNo baseline (store one with --save-baseline):")
+            for line in unchecked:
+                print(f"  {line}")
+        if regressions:
+            print("\nPerformance regressions:")
+            for line in regressions:
+                print(f"  {line}")
+        # A benchmark with no baseline at all would otherwise pass unnoticed
+        missing = sorted(name for name in results if name not in baseline)
+        if missing:
+            print(f"\nBenchmarks missing from {args.baseline}: {', '.join(missing)}")
+        if regressions or missing:
+            sys.exit(1)
+        print("\nNo regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+End-to-end page latency harness.
+
+Runs Home, Wind, Solar and Map headlessly with Streamlit's AppTest against
+the local stub NREL / Nominatim / OpenAI server, scripts the usual
+interactions and records the wall time of every script rerun together with
+a cProfile of it.
+
+Profiles are written as .prof files (open with snakeviz, or turn into a
+flamegraph with `flameprof run.prof > run.svg`), and per-rerun timings as
+latency.json.
+
+Usage (from the repo root):
+    python benchmarks/page_latency.py
+    python benchmarks/page_latency.py --output benchmarks/results/latency --latency 0.05
+"""
+import argparse
+import cProfile
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stub_servers import start_stub_server, stub_env  # noqa: E402
+
+
+class RerunRecorder:
+    """Times and profiles every AppTest.run() of a page"""
+
+    def __init__(self, page, output_dir, timeout=120):
+        from streamlit.testing.v1 import AppTest
+
+        self.page = page
+        self.output_dir = output_dir
+        self.app = AppTest.from_file(os.path.join(REPO_ROOT, page), default_timeout=timeout)
+        self.records = []
+
+    def run(self, step, action=None):
+        """Apply `action` to the app (widget interaction) and time the rerun it triggers"""
+
+        profiler = cProfile.Profile()
+        target = action(self.app) if action is not None else self.app
+
+        start = time.perf_counter()
+        with _profiling_script_thread(profiler):
+            target.run()
+        elapsed = time.perf_counter() - start
+
+        name = f"{os.path.splitext(os.path.basename(self.page))[0]}_{len(self.records):02d}_{step}"
+        profile_path = os.path.join(self.output_dir, f"{name}.prof")
+        stats = pstats.Stats(profiler)
+        stats.dump_stats(profile_path)
+
+        # AppTest runs a single page, so st.switch_page surfaces as an exception
+        exceptions = [e.message for e in self.app.exception]
+        switched = [m for m in exceptions if m.startswith("Could not find page")]
+
+        self.records.append({
+            "page": self.page,
+            "step": step,
+            "wall_s": elapsed,
+            "switch_page": bool(switched),
+            "exceptions": [m for m in exceptions if m not in switched],
+            "profile": os.path.relpath(profile_path, self.output_dir),
+            "top_functions": _top_functions(stats),
+            "repo_hotspots": _top_functions(stats, repo_only=True),
+        })
+        return self.app
+
+
+class _profiling_script_thread:
+    """
+    Profile the thread AppTest runs the page script on.
+
+    Before Python 3.12 cProfile only sees the thread that enabled it, so the
+    profiler is switched on from inside the first thread started while this
+    context is active.
+    """
+
+    def __init__(self, profiler):
+        self.profiler = profiler
+
+    def __enter__(self):
+        if sys.version_info >= (3, 12):
+            self.profiler.enable()
+            return
+
+        def _enable_in_new_thread(frame, event, arg):
+            sys.setprofile(None)
+            self.profiler.enable()
+
+        threading.setprofile(_enable_in_new_thread)
+
+    def __exit__(self, *exc):
+        if sys.version_info >= (3, 12):
+            self.profiler.disable()
+        else:
+            threading.setprofile(None)
+
+
+def _top_functions(stats, count=10, repo_only=False):
+    """Largest cumulative-time entries of a profile (optionally only repo code)"""
+
+    rows = []
+    for (filename, line, func), (_, _, _, cumulative, _) in stats.stats.items():
+        if repo_only:
+            if not filename.startswith(REPO_ROOT) or "/benchmarks/" in filename:
+                continue
+            filename = os.path.relpath(filename, REPO_ROOT)
+        else:
+            filename = os.path.basename(filename)
+        rows.append((cumulative, f"{filename}:{line}({func})"))
+    rows.sort(reverse=True)
+    return [{"function": name, "cumulative_s": round(seconds, 6)} for seconds, name in rows[:count]]
+
+
+def _button(label_prefix):
+    return lambda app: next(b for b in app.button if b.label.startswith(label_prefix)).click()
+
+
+def _selectbox(label, value):
+    return lambda app: next(s for s in app.selectbox if s.label == label).set_value(value)
+
+
+# ---------- Scenarios ----------
+
+def scenario_home(output_dir):
+    rec = RerunRecorder("Home.py", output_dir)
+    rec.run("initial")
+    return rec.records
+
+
+def scenario_wind(output_dir):
+    rec = RerunRecorder("pages/Wind.py", output_dir)
+    rec.run("initial")
+    rec.run("generate", _button("GENERATE"))
+    rec.run("sort_roi", _selectbox("Top 5 locations by", "ROI"))
+    rec.run("sort_payback", _selectbox("Top 5 locations by", "Payback Period"))
+    rec.run("sort_revenue_again", _selectbox("Top 5 locations by", "Revenue"))
+    rec.run("adjacent_cells", _selectbox("Site spacing", "Best cells (may be adjacent)"))
+    rec.run("view_on_map", lambda app: app.button(key="map_top_0").click())
+    return rec.records
+
+
+def scenario_solar(output_dir):
+    rec = RerunRecorder("pages/Solar.py", output_dir)
+    rec.run("initial")
+    rec.run("analyze", _button("Analyze Location"))
+    rec.run("change_region", _selectbox("Select a region", "West"))
+    return rec.records
+
+
+def scenario_map(output_dir):
+    rec = RerunRecorder("pages/Map.py", output_dir)
+    rec.run("initial")
+    rec.app.text_input[0].input("Austin")
+    rec.app.text_input[1].input("Texas")
+    rec.run("search_city", _button("Search"))
+    rec.run("sustainability_metrics", _button("Analyze Sustainability"))
+    return rec.records
+
+
+SCENARIOS = {
+    "home": scenario_home,
+    "wind": scenario_wind,
+    "solar": scenario_solar,
+    "map": scenario_map,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="Only run these pages")
+    parser.add_argument("--output", default=os.path.join(REPO_ROOT, "benchmarks", "results", "latency"),
+                        help="Directory for .prof files and latency.json")
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated upstream latency per request (s)")
+    args = parser.parse_args()
+
+    os.makedirs(args.output, exist_ok=True)
+
+    server = start_stub_server(latency=args.latency)
+    os.environ.update(stub_env(server))
+    os.chdir(REPO_ROOT)
+
+    records = []
+    for name in args.scenario or SCENARIOS:
+        try:
+            records.extend(SCENARIOS[name](args.output))
+        except Exception as e:
+            records.append({"page": name, "step": "error", "wall_s": None, "exceptions": [repr(e)]})
+
+    with open(os.path.join(args.output, "latency.json"), "w") as f:
+        json.dump({"upstream_requests": server.stats, "reruns": records}, f, indent=2)
+
+    print(f"{'Page':<16} {'Step':<24} {'Wall (ms)':>10}  Slowest repo code")
+    print("-" * 90)
+    for r in records:
+        wall = f"{r['wall_s'] * 1000:>10.1f}" if r["wall_s"] is not None else f"{'-':>10}"
+        hotspots = r.get("repo_hotspots", [])[1:]  # [0] is the page module itself
+        slowest = hotspots[0]["function"] if hotspots else ""
+        flag = "  (exception)" if r["exceptions"] else ""
+        print(f"{r['page']:<16} {r['step']:<24} {wall}  {slowest}{flag}")
+    print(f"\nUpstream requests: {server.stats}")
+    print(f"Profiles and latency.json written to {args.output}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Load test for the wind scoring service.
+
+Starts the service (python -m src.scoring_service) in a subprocess for each
+batching configuration, fires single-point GET /score requests from many
+concurrent keep-alive clients, and reports p50/p99 latency, requests/second
+and the mean micro-batch size the server formed. The first configuration
+(max batch 1) is the unbatched baseline.
+
+Usage (from the repo root):
+    python benchmarks/scoring_load.py --proxy
+    python benchmarks/scoring_load.py --proxy --clients 64 --requests 20000 --max-wait-ms 0,2,10
+    python benchmarks/scoring_load.py --url http://127.0.0.1:8765    # an already running service
+"""
+import argparse
+import http.client
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from urllib.parse import urlparse
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def start_service(max_batch, max_wait_ms, proxy):
+    """Run the service on a free port; returns (process, base url)"""
+
+    command = [sys.executable, "-m", "src.scoring_service", "--port", "0",
+               "--max-batch", str(max_batch), "--max-wait-ms", str(max_wait_ms)]
+    if proxy:
+        command.append("--proxy")
+    process = subprocess.Popen(command, cwd=REPO_ROOT, stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()
+    if " on " not in line:
+        process.kill()
+        raise RuntimeError(f"Scoring service did not start: {line or process.wait()}")
+    return process, line.rsplit(" on ", 1)[1].strip()
+
+
+def get_json(url, path):
+    connection = http.client.HTTPConnection(urlparse(url).netloc, timeout=60)
+    try:
+        connection.request("GET", path)
+        response = connection.getresponse()
+        body = response.read()
+        if response.status != 200:
+            raise RuntimeError(f"GET {path}: HTTP {response.status} {body[:200]!r}")
+        return json.loads(body)
+    finally:
+        connection.close()
+
+
+def run_load(url, clients, total_requests, seed=0):
+    """
+    Each client sends its share of requests back to back over one connection.
+
+    Returns:
+        (latencies in seconds, wall seconds, failed requests)
+    """
+
+    rng = np.random.default_rng(seed)
+    lats = rng.uniform(25.0, 49.0, total_requests)
+    lons = rng.uniform(-124.0, -67.0, total_requests)
+    latencies = np.zeros(total_requests)
+    failures = []
+    barrier = threading.Barrier(clients)
+
+    host = urlparse(url).netloc
+
+    def client(i):
+        # http.client rather than requests: the client must be cheaper than the server
+        connection = http.client.HTTPConnection(host, timeout=30)
+        barrier.wait()
+        for j in range(i, total_requests, clients):
+            start = time.perf_counter()
+            connection.request("GET", f"/score?lat={lats[j]:.5f}&lon={lons[j]:.5f}")
+            response = connection.getresponse()
+            response.read()
+            latencies[j] = time.perf_counter() - start
+            if response.status != 200:
+                failures.append(response.status)
+        connection.close()
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return latencies, time.perf_counter() - start, len(failures)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=32, help="Concurrent clients")
+    parser.add_argument("--requests", type=int, default=5000, help="Requests per configuration")
+    parser.add_argument("--max-wait-ms", default="0,5", help="Comma-separated latency budgets to compare")
+    parser.add_argument("--max-batch", type=int, default=512)
+    parser.add_argument("--proxy", action="store_true", help="Serve the power proxy (no trained model needed)")
+    parser.add_argument("--url", help="Load-test a running service instead of starting one")
+    args = parser.parse_args()
+
+    if args.url:
+        configs = [(args.url.rstrip("/"), None)]
+    else:
+        budgets = [float(v) for v in args.max_wait_ms.split(",")]
+        configs = [(None, (1, 0.0))] + [(None, (args.max_batch, budget)) for budget in budgets]
+
+    print(f"{args.clients} clients, {args.requests} single-point requests per configuration\n")
+    print(f"{'Configuration':<28} {'p50 (ms)':>9} {'p99 (ms)':>9} {'req/s':>9} {'Mean batch':>11} {'Failed':>7}")
+    print("-" * 78)
+
+    for url, config in configs:
+        process = None
+        if config is not None:
+            process, url = start_service(*config, proxy=args.proxy)
+            label = "unbatched" if config[0] == 1 else f"batch<={config[0]}, wait {config[1]:g} ms"
+        else:
+            label = url
+
+        try:
+            # One request first so model loading and connection setup are not timed
+            get_json(url, "/score?lat=35.0&lon=-100.0")
+            latencies, wall, failed = run_load(url, args.clients, args.requests)
+            batching = get_json(url, "/health")["batching"]
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait()
+
+        p50, p99 = np.percentile(latencies, [50, 99]) * 1000.0
+        print(f"{label:<28} {p50:>9.2f} {p99:>9.2f} {args.requests / wall:>9.0f} "
+              f"{batching['mean_batch']:>11.1f} {failed:>7}")
+
+
+if __name__ == "__main__":
+    main()
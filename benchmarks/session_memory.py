@@ -0,0 +1,144 @@
+"""
+Per-session memory of the Wind page under many concurrent sessions.
+
+Opens N headless sessions of pages/Wind.py with Streamlit's AppTest (each
+has its own session state, as a browser tab would), presses Generate and
+changes the sort in every one, and keeps them all alive. At checkpoints it
+reports process RSS and, per session, the bytes its session state holds on
+its own - values that are not shared objects from the process-wide caches.
+
+RSS should stay flat as sessions are added; the remaining growth per
+session is mostly AppTest's own bookkeeping (element trees, script runner).
+
+Usage (from the repo root):
+    python benchmarks/session_memory.py
+    python benchmarks/session_memory.py --sessions 100 --checkpoints 1,10,50,100
+"""
+import argparse
+import gc
+import os
+import resource
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src import services  # noqa: E402
+from src.memo import LRUCache  # noqa: E402
+from stub_servers import start_stub_server, stub_env  # noqa: E402
+
+
+def rss_bytes():
+    """Current resident set size (peak RSS where /proc is unavailable)"""
+
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        scale = 1 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+def shared_ids():
+    """ids of every value held in the process-wide memo caches, and of their members"""
+
+    ids = set()
+    for instance in list(services._instances.values()):
+        if isinstance(instance, LRUCache):
+            for value in list(instance._data.values()):
+                ids.add(id(value))
+                if isinstance(value, (tuple, list)):
+                    ids.update(id(v) for v in value)
+                elif isinstance(value, dict):
+                    ids.update(id(v) for v in value.values())
+    return ids
+
+
+def owned_bytes(value, shared, seen=None):
+    """Approximate deep size of value, not counting shared objects"""
+
+    seen = set() if seen is None else seen
+    if id(value) in shared or id(value) in seen:
+        return 0
+    seen.add(id(value))
+
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        size = value.memory_usage(deep=True)
+        return int(size.sum() if isinstance(size, pd.Series) else size)
+    if isinstance(value, np.ndarray):
+        return value.nbytes if value.base is None else 0
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(owned_bytes(k, shared, seen) + owned_bytes(v, shared, seen)
+                                          for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(owned_bytes(v, shared, seen) for v in value)
+    return sys.getsizeof(value)
+
+
+def session_values(app):
+    state = app.session_state
+    return state.to_dict() if hasattr(state, "to_dict") else dict(state.filtered_state)
+
+
+def open_session(AppTest, sort_by):
+    app = AppTest.from_file(os.path.join(REPO_ROOT, "pages", "Wind.py"), default_timeout=120)
+    app.run()
+    next(b for b in app.button if b.label.startswith("GENERATE")).click().run()
+    next(s for s in app.selectbox if s.label == "Top 5 locations by").set_value(sort_by).run()
+    if app.exception:
+        raise RuntimeError(f"Wind page failed: {app.exception[0].message}")
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=100, help="Concurrent sessions to open")
+    parser.add_argument("--checkpoints", default="1,10,25,50,100", help="Session counts to report at")
+    args = parser.parse_args()
+
+    from streamlit.testing.v1 import AppTest
+
+    server = start_stub_server()
+    os.environ.update(stub_env(server))
+    os.chdir(REPO_ROOT)
+
+    checkpoints = sorted({int(c) for c in args.checkpoints.split(",") if 0 < int(c) <= args.sessions} | {args.sessions})
+    sorts = ["Revenue", "ROI", "Payback Period", "Profit", "Energy"]
+
+    print(f"{'Sessions':>8} {'RSS (MB)':>9} {'Δ RSS/session (kB)':>19} {'Owned/session (kB)':>19} "
+          f"{'Shared (kB)':>12} {'s/session':>10}")
+    print("-" * 84)
+
+    apps = []
+    base_rss = None
+    start = time.perf_counter()
+    for n in range(1, args.sessions + 1):
+        apps.append(open_session(AppTest, sorts[n % len(sorts)]))
+        if n not in checkpoints:
+            continue
+
+        gc.collect()
+        rss = rss_bytes()
+        shared = shared_ids()
+        owned = [sum(owned_bytes(v, shared) for v in session_values(app).values()) for app in apps]
+        shared_size = sum(owned_bytes(services._instances[k]._data, set()) for k in list(services._instances)
+                          if isinstance(services._instances[k], LRUCache))
+
+        if base_rss is None:
+            base_rss, base_n = rss, n
+            growth = 0.0
+        else:
+            growth = (rss - base_rss) / (n - base_n) / 1024
+        print(f"{n:>8} {rss / 2**20:>9.1f} {growth:>19.1f} {np.mean(owned) / 1024:>19.2f} "
+              f"{shared_size / 1024:>12.1f} {(time.perf_counter() - start) / n:>10.2f}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Local stand-ins for the NREL, Nominatim and OpenAI APIs.
+
+One threaded HTTP/1.1 server answers all three with canned but
+coordinate-dependent responses, so pages can be exercised offline. Point
+the app at it with the environment returned by `stub_env(server)`.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    # Keep-alive so connection reuse by clients is visible in the stats
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.record("connections")
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, payload, status=200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _throttle(self, path):
+        """Simulated upstream latency and a per-second rate limit per endpoint"""
+
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        return self.server.over_rate_limit(path)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        self.server.record("requests")
+
+        if self._throttle(url.path):
+            self.server.record("rate_limited")
+            self._send_json({"error": "rate limited"}, status=429)
+            return
+
+        if url.path.endswith("/solar_resource/v1.json"):
+            lat = float(query.get("lat", 35))
+            # Sunnier towards the south-west, roughly like real US GHI
+            ghi = round(min(7.0, max(3.0, 7.5 - abs(lat - 25) * 0.12)), 2)
+            self._send_json({"outputs": {"avg_ghi": {"annual": ghi}}})
+        elif url.path.startswith("/reverse"):
+            lat = float(query.get("lat", 0))
+            lon = float(query.get("lon", 0))
+            self._send_json({
+                "lat": str(lat), "lon": str(lon),
+                "display_name": "Stub State, United States",
+                "address": {"state": f"Stub State {round(lat)}", "country": "United States"}
+            })
+        elif url.path.startswith("/search"):
+            self._send_json([{
+                "lat": "30.2672", "lon": "-97.7431",
+                "display_name": query.get("q", "Stub City")
+            }])
+        else:
+            self._send_json({"error": "not found"}, status=404)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        self.server.record("requests")
+
+        if self._throttle(self.path):
+            self.server.record("rate_limited")
+            self._send_json({"error": {"message": "rate limited"}}, status=429)
+            return
+
+        if self.path.endswith("/chat/completions"):
+            self._send_json({
+                "id": "chatcmpl-stub",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model", "stub"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "- Stub response for benchmarking"},
+                    "finish_reason": "stop"
+                }],
+                "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2}
+            })
+        else:
+            self._send_json({"error": "not found"}, status=404)
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency=0.0, rate_limit=None):
+        super().__init__(address, StubHandler)
+        self.latency = latency
+        self.rate_limit = rate_limit    # requests per second per endpoint, None = unlimited
+        self.stats = {"connections": 0, "requests": 0, "rate_limited": 0}
+        self._lock = threading.Lock()
+        self._windows = {}
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def record(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def over_rate_limit(self, path):
+        if self.rate_limit is None:
+            return False
+        second = int(time.time())
+        endpoint = path.split("?")[0]
+        with self._lock:
+            window_second, count = self._windows.get(endpoint, (second, 0))
+            if window_second != second:
+                window_second, count = second, 0
+            count += 1
+            self._windows[endpoint] = (window_second, count)
+            return count > self.rate_limit
+
+    def reset_stats(self):
+        with self._lock:
+            for key in self.stats:
+                self.stats[key] = 0
+            self._windows.clear()
+
+
+def start_stub_server(host="127.0.0.1", port=0, latency=0.0, rate_limit=None):
+    """Start the stub server on a background thread and return it"""
+
+    server = StubServer((host, port), latency=latency, rate_limit=rate_limit)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def stub_env(server):
+    """Environment variables that point the app's services at the stub"""
+
+    host, port = server.server_address[:2]
+    return {
+        "NREL_API_KEY": "stub",
+        "NREL_API_BASE": server.url,
+        "NOMINATIM_DOMAIN": f"{host}:{port}",
+        "NOMINATIM_SCHEME": "http",
+        "OPENAI_API_KEY": "stub",
+        "OPENAI_BASE_URL": f"{server.url}/v1",
+        # The stub has no usage policy to respect
+        "NOMINATIM_RATE_LIMIT": "1000",
+        "NREL_RATE_LIMIT": "1000",
+    }
@@ -1,13 +1,19 @@
-import pandas as pd
+import argparse
+import json
+import os
 
-# Read the CSV
-df = pd.read_csv("../renewable_energies/uscities.csv")
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 
-# Keep only the first 100 rows
-df = df.head(100)
+# Paths are resolved from the repo root so the script runs from any directory
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(REPO_ROOT, "renewable_energies")
 
-# Select only the columns you need
-df = df[["city", "state_name", "lat", "lng"]]
+DEFAULT_INPUT = os.path.join(DATA_DIR, "uscities.csv")
+DEFAULT_OUTPUT = os.path.join(DATA_DIR, "cleaned_locations_with_region.parquet")
+DEFAULT_INDEX = os.path.join(DATA_DIR, "cleaned_locations_region_index.json")
 
 # Define U.S. regions with states
 regions = {
@@ -22,7 +28,8 @@ regions = {
     "South": [
         "Delaware", "Maryland", "Virginia", "West Virginia",
         "North Carolina", "South Carolina", "Georgia", "Florida", "Kentucky",
-        "Tennessee", "Mississippi", "Alabama", "Oklahoma", "Texas", "Arkansas", "Louisiana"
+        "Tennessee", "Mississippi", "Alabama", "Oklahoma", "Texas", "Arkansas", "Louisiana",
+        "District of Columbia"  # DC treated as South
     ],
     "West": [
         "Idaho", "Montana", "Wyoming", "Nevada", "Utah", "Colorado", "Arizona",
@@ -30,23 +37,102 @@ regions = {
     ]
 }
 
-# Function to assign region
-def assign_region(state_name):
-    if state_name == "District of Columbia":
-        return "South"  # DC treated as South
-    for region, states in regions.items():
-        if state_name in states:
-            return region
-    return None  # Unknown regions will be marked as None
+# Flat state -> region lookup table (one hash lookup per row instead of scanning lists)
+STATE_TO_REGION = {state: region for region, states in regions.items() for state in states}
+REGION_DTYPE = pd.CategoricalDtype(sorted(regions))
+STATE_DTYPE = pd.CategoricalDtype(sorted(STATE_TO_REGION))
+
+COLUMNS = ["city", "state_name", "lat", "lng"]
+DTYPES = {"city": "string", "state_name": "string", "lat": "float32", "lng": "float32"}
+
+
+def clean_chunk(chunk):
+    """Assign regions to one chunk of uscities rows and drop unknown states"""
+
+    chunk = chunk.assign(Region=chunk["state_name"].map(STATE_TO_REGION))
+    # Remove rows where region is unknown (e.g. Puerto Rico)
+    chunk = chunk.dropna(subset=["Region"])
+
+    return chunk.astype({"state_name": STATE_DTYPE, "Region": REGION_DTYPE})
+
+
+def clean_cities(input_path=DEFAULT_INPUT, chunksize=10000, limit=None):
+    """
+    Read uscities.csv in chunks and return the typed frame.
+
+    Rows stay in source (population) order; source_order records each
+    row's position so readers of the region-grouped Parquet can restore it.
+    """
+
+    cleaned = []
+    rows_read = 0
+    for chunk in pd.read_csv(input_path, usecols=COLUMNS, dtype=DTYPES, chunksize=chunksize):
+        if limit is not None:
+            chunk = chunk.head(limit - rows_read)
+        chunk = chunk.assign(source_order=np.arange(rows_read, rows_read + len(chunk), dtype=np.int32))
+        rows_read += len(chunk)
+        cleaned.append(clean_chunk(chunk))
+        if limit is not None and rows_read >= limit:
+            break
+
+    return pd.concat(cleaned, ignore_index=True)
+
+
+def write_outputs(df, output_path=DEFAULT_OUTPUT, index_path=DEFAULT_INDEX):
+    """
+    Write the cleaned cities as Parquet with one row group per region, plus
+    a JSON index of each region's row range and row group.
+
+    Only the file is grouped by region; within a group rows keep their
+    population order.
+    """
+
+    index = {}
+    writer = None
+    start = 0
+    try:
+        for row_group, (region, group) in enumerate(df.groupby("Region", observed=True, sort=True)):
+            table = pa.Table.from_pandas(group, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(output_path, table.schema)
+            writer.write_table(table)
+            index[region] = {
+                "row_group": row_group,
+                "start": start,
+                "stop": start + len(group),
+                "states": sorted(group["state_name"].unique().tolist())
+            }
+            start += len(group)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    with open(index_path, "w") as f:
+        json.dump(index, f, indent=2)
+
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Clean uscities.csv into a region-indexed Parquet file")
+    parser.add_argument("--input", default=DEFAULT_INPUT, help="Path to uscities.csv")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Parquet output path")
+    parser.add_argument("--index", default=DEFAULT_INDEX, help="Per-region index output path")
+    parser.add_argument("--chunksize", type=int, default=10000, help="Rows read per chunk")
+    parser.add_argument("--limit", type=int, default=None, help="Only process the first N cities")
+    parser.add_argument("--csv", default=None, help="Also write a CSV copy to this path")
+    args = parser.parse_args()
+
+    df = clean_cities(args.input, chunksize=args.chunksize, limit=args.limit)
+    index = write_outputs(df, args.output, args.index)
 
-# Apply region mapping
-df["Region"] = df["state_name"].apply(assign_region)
+    if args.csv:
+        df.to_csv(args.csv, index=False)
 
-# Remove rows where region is unknown
-df = df.dropna(subset=["Region"])
+    print(f"Wrote {len(df)} cities to {args.output}")
+    for region, entry in index.items():
+        print(f"  {region}: {entry['stop'] - entry['start']} cities")
 
-# Optional: save the new CSV
-df.to_csv("../renewable_energies/cleaned_locations_with_region_new.csv", index=False)
 
-# Check the first rows
-print(df.head(10))
\ No newline at end of file
+if __name__ == "__main__":
+    main()
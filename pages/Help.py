@@ -1,14 +1,8 @@
 import streamlit as st
-from openai import OpenAI
-from dotenv import load_dotenv
-import os
 
-# Load environment variables
-load_dotenv()
-api_key = os.getenv("OPENAI_API_KEY")
-
-# Initialize OpenAI client
-client = OpenAI(api_key=api_key)
+# OpenAI client is created on the first question, not at page import
+from src.services import get_openai_client
+from src.tracing import render_debug_panel, span
 
 # Custom styling to match your other pages
 st.markdown("""
@@ -73,15 +67,19 @@ if st.button("Ask the Assistant"):
     else:
         with st.spinner("Contacting the assistant..."):
             try:
-                response = client.chat.completions.create(
-                    model="gpt-4o",  # Use gpt-4o for better answers
-                    messages=[
-                        {"role": "system", "content": "You are an expert assistant helping users evaluate renewable energy opportunities. Answer questions related to location, climate, energy infrastructure, regulations, or environmental impact in a clear and helpful way."},
-                        {"role": "user", "content": user_prompt}
-                    ]
-                )
+                client = get_openai_client()
+                with span("openai.chat"):
+                    response = client.chat.completions.create(
+                        model="gpt-4o",  # Use gpt-4o for better answers
+                        messages=[
+                            {"role": "system", "content": "You are an expert assistant helping users evaluate renewable energy opportunities. Answer questions related to location, climate, energy infrastructure, regulations, or environmental impact in a clear and helpful way."},
+                            {"role": "user", "content": user_prompt}
+                        ]
+                    )
                 message = response.choices[0].message.content
                 st.markdown(f"<div class='chat-response'>{message}</div>", unsafe_allow_html=True)
 
             except Exception as e:
                 st.error(f"❌ Error: {e}")
+
+render_debug_panel()
@@ -1,20 +1,34 @@
+import os
+
 import streamlit as st
-import folium
-from streamlit_folium import st_folium
-from geopy.geocoders import Nominatim
 
-from dotenv import load_dotenv
-from openai import OpenAI
-import os
+# Heavy clients and modules (OpenAI, Nominatim, folium) are created on first use
+from src.gazetteer import get_gazetteer
+from src.grid_store import grid_bounds, grid_path_for, load_candidate_grid
+from src.portfolio import haversine_km
+from src.services import geocode, get_openai_client, lazy_import
+from src.tracing import render_debug_panel, span
+
+WIND_CANDIDATES_PATH = "renewable_energies/wind/all_candidate_locations.csv"
+
 
-# Load .env for API key
-load_dotenv()
+def nearby_wind_sites(lat, lon, radius_km=50):
+    """Wind candidate sites within radius_km, from the memory-mapped candidate grid"""
 
-# Get API key
-api_key = os.getenv("OPENAI_API_KEY")
+    if not (os.path.exists(WIND_CANDIDATES_PATH) or os.path.exists(grid_path_for(WIND_CANDIDATES_PATH))):
+        return None
 
-# Initialize OpenAI client
-client = OpenAI(api_key=api_key)
+    sites = load_candidate_grid(WIND_CANDIDATES_PATH)
+
+    # The grid header holds its bounds, so far-away locations skip the distance check
+    bounds = grid_bounds(WIND_CANDIDATES_PATH)
+    margin = radius_km / 50.0  # degrees; generous for longitude at US latitudes
+    if bounds and not (bounds["lat_min"] - margin <= lat <= bounds["lat_max"] + margin
+                       and bounds["lon_min"] - margin <= lon <= bounds["lon_max"] + margin):
+        return sites.iloc[0:0]
+
+    distance = haversine_km(lat, lon, sites["lat"].to_numpy(), sites["lon"].to_numpy())
+    return sites[distance <= radius_km].assign(distance_km=distance[distance <= radius_km])
 
 
 
@@ -51,23 +65,47 @@ if "latitude" not in st.session_state or "longitude" not in st.session_state:
         with col1:
             city = st.text_input("City", placeholder="e.g., Austin")
         with col2:
-            state = st.text_input("State", placeholder="e.g., Texas")
+            state = st.text_input("State", placeholder="e.g., Texas or TX")
         with col3:
             search_button = st.button("Search", use_container_width=True, type="primary")
         
-        if search_button and city and state:
-            try:
-                geocoder = Nominatim(user_agent="renewweb_sitemap")
-                address = f"{city}, {state}, USA"
-                location = geocoder.geocode(address)
-                if location:
-                    st.session_state.latitude = location.latitude
-                    st.session_state.longitude = location.longitude
-                    st.session_state.location_name = f"{city}, {state}"
-                else:
-                    st.error(f"Could not find: {city}, {state}")
-            except Exception as e:
-                st.error(f"Error: {str(e)}")
+        # Local gazetteer: exact match, else autocomplete/typo suggestions
+        gazetteer = get_gazetteer()
+        match = gazetteer.lookup(city, state) if city else None
+        choice = None
+        if city and match is None:
+            suggestions = gazetteer.search(city, state or None, limit=8)
+            if suggestions:
+                # Nothing is picked by default, so an unknown place still goes to the online geocoder
+                choice = st.selectbox(
+                    "Did you mean",
+                    options=[None] + suggestions,
+                    format_func=lambda s: ("None of these – search online" if s is None
+                                           else f"{s['city']}, {s['state']}")
+                )
+        
+        if search_button and city:
+            found = match or choice
+            if found:
+                st.session_state.latitude = found["lat"]
+                st.session_state.longitude = found["lon"]
+                st.session_state.location_name = f"{found['city']}, {found['state']}"
+            elif state:
+                # Not in the gazetteer: fall back to the online geocoder
+                try:
+                    address = f"{city}, {state}, USA"
+                    with span("geocode.search"):
+                        location = geocode(address)
+                    if location:
+                        st.session_state.latitude = location.latitude
+                        st.session_state.longitude = location.longitude
+                        st.session_state.location_name = f"{city}, {state}"
+                    else:
+                        st.error(f"Could not find: {city}, {state}")
+                except Exception as e:
+                    st.error(f"Could not find {city}, {state} offline, and the online geocoder failed: {str(e)}")
+            else:
+                st.error(f"Could not find: {city}")
 
     else:  # Coordinates input
         with col1:
@@ -96,12 +134,23 @@ if latitude is not None and longitude is not None:
     st.divider()
     st.subheader("Power Plant Site Location")
     
+    folium = lazy_import("folium")
+    st_folium = lazy_import("streamlit_folium").st_folium
     m = folium.Map(location=[latitude, longitude], zoom_start=10, tiles="OpenStreetMap")
     folium.Marker(location=[latitude, longitude], popup=f"Optimal Site: {location_name}",
                   tooltip=location_name, icon=folium.Icon(color="green", icon="star", prefix="fa")).add_to(m)
     folium.Circle(location=[latitude, longitude], radius=50000, color="green", fill=True,
                   fillColor="green", fillOpacity=0.1, popup="50km potential development area").add_to(m)
     
+    # Wind candidate sites inside the development area
+    with span("map.wind_candidates"):
+        wind_sites = nearby_wind_sites(latitude, longitude)
+    if wind_sites is not None:
+        for _, site in wind_sites.iterrows():
+            folium.CircleMarker(location=[float(site["lat"]), float(site["lon"])], radius=6, color="#047857",
+                                fill=True, fillOpacity=0.7,
+                                tooltip=f"Wind candidate: {site['mean_wind_speed']:.1f} m/s mean, {site['distance_km']:.0f} km away").add_to(m)
+    
     st_folium(m, use_container_width=True, height=800)
     st.divider()
 
@@ -114,14 +163,18 @@ if latitude is not None and longitude is not None:
             "Include conside and numerical and short bulltets for these 5 these topics, Biodiversity Impact,Water Usage & Impact, Carbon Footprint / Emission Reduction Potential,Land Use & Ecosystem Disturbance,Renewable Integration & Energy Efficiency ."
         )
         try:
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",  # Fast, cheap model for testing
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant."},
-                    {"role": "user", "content": prompt},
-                ],
-            )
+            client = get_openai_client()
+            with span("openai.chat"):
+                response = client.chat.completions.create(
+                    model="gpt-4o-mini",  # Fast, cheap model for testing
+                    messages=[
+                        {"role": "system", "content": "You are a helpful assistant."},
+                        {"role": "user", "content": prompt},
+                    ],
+                )
             st.write("**Response:**")
             st.write(response.choices[0].message.content)
         except Exception as e:
-            st.error(f"❌ Error: {e}")
\ No newline at end of file
+            st.error(f"❌ Error: {e}")
+
+render_debug_panel()
@@ -1,59 +1,31 @@
 import streamlit as st
 import pandas as pd
-import requests
-import time
 import os
-from dotenv import load_dotenv
-# Load .env file
-load_dotenv()
-
-
-def calculate_solar_financials(irr, panels,
-                               panel_area=1.7, panel_efficiency=0.18,
-                               electricity_rate=0.12,
-                               panel_unit_cost=250, install_unit_cost=250,
-                               maintenance_cost=15,
-                               lifetime_years=25, discount_rate=0.05):
-
-    # Energy per panel
-    annual_energy_per_panel = irradiance * panel_area * panel_efficiency * 365  # kWh/year
-    total_annual_energy = annual_energy_per_panel * num_panels
-
-    # Revenue
-    annual_revenue = total_annual_energy * electricity_rate
-
-    # Costs
-    total_initial_cost = num_panels * (panel_cost + install_cost)
-    total_maintenance = num_panels * maintenance_cost
-    annual_net_savings = annual_revenue - total_maintenance
-
-    # Payback Period
-    payback_period = total_initial_cost / annual_net_savings if annual_net_savings > 0 else None
-
-    # ROI %
-    roi_percent = (annual_net_savings / total_initial_cost) * 100 if total_initial_cost > 0 else 0
+import time
 
-    return {
-        "Annual Energy (kWh)": total_annual_energy,
-        "Annual Revenue ($)": annual_revenue,
-        "Net Annual Savings ($)": annual_net_savings,
-        "Total Initial Cost ($)": total_initial_cost,
-        "Payback Period (years)": payback_period,
-        "ROI (%)": roi_percent
-    }
+from src.data_prep import load_city_locations
+from src.export import render_export
+from src.jobs import NO_DATA, get_job, job_id_for, retryable_keys, submit_job
+from src.region_summary import IRRADIANCE_COLUMN, cached_results, city_key, refresh_summaries
+from src.services import get_env
+from src.solar_production import calculate_solar_financials, fetch_annual_ghi, simulated_energy_per_panel, site_id
+from src.solar_surface import (MIN_SURFACE_SAMPLES, SURFACE_PATH, build_surface, collect_samples, estimate_ghi,
+                                sample_job_id, sample_lattice, surface_info)
+from src.tracing import render_debug_panel, span, traced
 
 st.title("Top 5 US Locations for Solar Energy")
 
-# --- LOAD CITIES FROM CSV ---
+# --- LOAD CITIES ---
 @st.cache_data
-def load_cities_from_csv(file_path):
-    """Load cities from CSV file"""
+@traced("data.load_cities")
+def load_cities():
+    """Load cities (full Parquet dataset when built, CSV sample otherwise)"""
     try:
-        df = pd.read_csv(file_path)
-        st.success(f"✅ Loaded {len(df)} cities from CSV")
+        df = load_city_locations()
+        st.success(f"✅ Loaded {len(df)} cities")
         return df
     except Exception as e:
-        st.error(f"❌ Error loading CSV: {e}")
+        st.error(f"❌ Error loading cities: {e}")
         return None
 
 # Ask user for budget
@@ -66,14 +38,14 @@ budget = st.number_input(
 )
 
 # Get API key
-api_key = os.getenv("NREL_API_KEY")
+api_key = get_env("NREL_API_KEY")
+nrel_api_base = get_env("NREL_API_BASE", "https://developer.nrel.gov")
 
 if not api_key:
     st.error("API key not found! Please check your .env file.")
 
-# Load the CSV
-csv_path = "renewable_energies/cleaned_locations_with_region_new.csv"
-cities_df = load_cities_from_csv(csv_path)
+# Load the cities
+cities_df = load_cities()
 
 if cities_df is not None:
     # --- GROUP BY REGION ---
@@ -99,6 +71,76 @@ if cities_df is not None:
 
     st.write(f"### Cities in {region_selected}: {len(selected_cities_df)} locations")
 
+    # Region rankings materialized from earlier analyses, shown before any API call
+    with span("solar.region_summary"):
+        summary = refresh_summaries(cities_df)
+    region_summary = summary["regions"].get(region_selected)
+    if region_summary and region_summary["cached"]:
+        st.subheader(f"📊 {region_selected} at a glance")
+        st.caption(f"Irradiance already known for {region_summary['cached']} of {region_summary['cities']} cities")
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Median GHI", f"{region_summary['p50']:.2f} kWh/m²/day")
+        col2.metric("90th Percentile", f"{region_summary['p90']:.2f} kWh/m²/day")
+        col3.metric("Best", f"{region_summary['max']:.2f} kWh/m²/day")
+        best_df = pd.DataFrame(region_summary["best"]).rename(columns={"irradiance": IRRADIANCE_COLUMN})
+        st.dataframe(best_df, width='stretch', hide_index=True)
+
+    # National GHI surface interpolated from a sparse lattice of API samples
+    sample_items = sample_lattice()
+    sample_job = get_job(sample_job_id(sample_items, nrel_api_base))
+    sample_count = None
+    if sample_job is not None and sample_job["status"] == "done" and (
+            not os.path.exists(SURFACE_PATH) or os.path.getmtime(SURFACE_PATH) < sample_job["updated"]):
+        samples = collect_samples(summary)
+        sample_count = len(samples)
+        # A failed sampling run (e.g. a bad API key) leaves too few points to interpolate
+        if sample_count >= MIN_SURFACE_SAMPLES:
+            with span("solar.build_surface"):
+                build_surface(samples)
+
+    def fetch_point(item):
+        with span("api.nrel_solar_resource"):
+            ghi = fetch_annual_ghi(item['lat'], item['lon'], api_key, nrel_api_base)
+        if ghi is None:
+            return None
+        return {'Latitude': item['lat'], 'Longitude': item['lon'], IRRADIANCE_COLUMN: ghi}
+
+    surface_running = sample_job is not None and sample_job["status"] in ("pending", "running")
+    with st.expander("🗺️ National solar surface"):
+        info = surface_info()
+        if info is not None:
+            st.caption(f"Interpolated from {info['source']} at {info['resolution']['lat']:.2f}° resolution. "
+                       "Every city below is scored from it without an API call.")
+        else:
+            st.caption(f"Sample GHI at {len(sample_items)} points across the country (instead of one call per city) "
+                       "and interpolate the rest, so any city can be scored instantly.")
+        if sample_count is not None and sample_count < MIN_SURFACE_SAMPLES:
+            st.warning(f"Sampling returned GHI for only {sample_count} points, too few for a surface. "
+                       "Check the NREL API key and sample again.")
+        if surface_running:
+            st.progress(sample_job["completed"] / sample_job["total"] if sample_job["total"] else 1.0)
+            st.caption(f"{sample_job['completed']}/{sample_job['total']} points sampled")
+        elif st.button("Build surface" if info is None else "Rebuild surface"):
+            sampled = sample_job is not None and sample_job["status"] == "done"
+            samples = collect_samples(summary) if sampled and not retryable_keys(sample_job) else None
+            if samples is not None and len(samples) >= MIN_SURFACE_SAMPLES:
+                build_surface(samples)
+            else:
+                # Retry the points that failed, or sample from scratch if the last run found nothing
+                submit_job(sample_job_id(sample_items, nrel_api_base), sample_items, fetch_point,
+                           restart=sampled and not sample_job["results"])
+                surface_running = True
+
+    # Rank the region by the surface so API calls go to the most promising cities
+    estimates = estimate_ghi(selected_cities_df['lat'], selected_cities_df['lng'])
+    if estimates is not None:
+        selected_cities_df = selected_cities_df.assign(**{
+            "Estimated GHI (kWh/m²/day)": estimates[0].round(2),
+            "Estimate Error (±)": estimates[1].round(2)
+        }).sort_values("Estimated GHI (kWh/m²/day)", ascending=False, na_position="last")
+        st.subheader(f"🔭 Best estimated cities in {region_selected}")
+        st.dataframe(selected_cities_df.head(10), width='stretch', hide_index=True)
+
     # Optional: Let user limit number of cities to check (to save API calls)
     max_cities = st.slider(
         "Maximum cities to analyze (to avoid rate limits)",
@@ -114,58 +156,74 @@ if cities_df is not None:
     with st.expander(f"View {len(selected_cities_df)} selected cities"):
         st.dataframe(selected_cities_df)
 
-    if st.button("Analyze Location & ROI"):
-        st.write("Fetching data from NREL API...")
-
-        results = []
-        progress = st.progress(0)
-
-        # Iterate through CSV rows
-        for idx, row in selected_cities_df.iterrows():
-            try:
-
-                city = row['city']
-                state = row['state_name'] if 'state_name' in row else ''
-                lat = row['lat']
-                lon = row['lng']
-
-                city_label = f"{city}, {state}" if state else city
-
-                url = "https://developer.nrel.gov/api/solar/solar_resource/v1.json"
-                params = {
-                    'api_key': api_key,
-                    'lat': lat,
-                    'lon': lon
-                }
-
-                response = requests.get(url, params=params)
-                data = response.json()
-
-                if 'outputs' in data:
-                    ghi = data['outputs']['avg_ghi']['annual']
-                    results.append({
-                        'City': city,
-                        'State': state,
-                        'Solar Irradiance (kWh/m²/day)': float(ghi),
-                        'Latitude': lat,
-                        'Longitude': lon
-                    })
-                    st.write(f"✅ {city_label}: {ghi} kWh/m²/day")
-                else:
-                    st.warning(f"⚠️ No data for {city_label}")
-
-                for i, (_, city_row) in enumerate(selected_cities_df.iterrows()):
-                    city = city_row['city']
-                    state = city_row['state_name'] if 'state_name' in city_row else ''
-                    lat = city_row['lat']
-                    lon = city_row['lng']
-
-                    # Update progress
-                    progress.progress((i + 1) / len(selected_cities_df))
-                time.sleep(0.2)  # Avoid rate limiting
-
-            except Exception as e:
-                st.error(f"❌ Error fetching: {e}")
+    # The analysis runs as a background job keyed by the selected cities, so widget
+    # interactions (or reopening the page) pick the same job up instead of refetching
+    city_items = [
+        {
+            'key': f"{row['city']}|{row['state_name'] if 'state_name' in row else ''}",
+            'city': row['city'],
+            'state': row['state_name'] if 'state_name' in row else '',
+            'lat': float(row['lat']),
+            'lon': float(row['lng'])
+        }
+        for _, row in selected_cities_df.iterrows()
+    ]
+
+    # Only cities without a cached GHI (and not known to lack data) go to the API
+    cached = cached_results(summary, [item['key'] for item in city_items])
+    no_data = set(summary["no_data"])
+    missing_items = [item for item in city_items if item['key'] not in cached and item['key'] not in no_data]
+    # Keyed by the whole selection, not just the missing cities: those shrink as finished
+    # results reach the summary, and the job (with its errors) must still be found then
+    job_id = job_id_for("solar", {"cities": [item['key'] for item in city_items], "api_base": nrel_api_base})
+
+    def fetch_city(item):
+        with span("api.nrel_solar_resource"):
+            ghi = fetch_annual_ghi(item['lat'], item['lon'], api_key, nrel_api_base)
+        if ghi is None:
+            return None
+        return {
+            'City': item['city'],
+            'State': item['state'],
+            'Solar Irradiance (kWh/m²/day)': ghi,
+            'Latitude': item['lat'],
+            'Longitude': item['lon']
+        }
+
+    if st.button("Analyze Location & ROI") and missing_items:
+        submit_job(job_id, missing_items, fetch_city)
+
+    job = get_job(job_id)
+    if job is not None and job["status"] == "interrupted":
+        # The server restarted mid-analysis: continue from the cities already fetched
+        submit_job(job_id, missing_items, fetch_city)
+        job = get_job(job_id)
+
+    # Fully cached selections are shown straight away
+    if job is not None or not missing_items:
+        # Finished jobs are also in the summary: take each city from the cache when it is there
+        job_results = job["results"] if job is not None else []
+        job_errors = job["errors"] if job is not None else []
+        results = list(cached.values()) + [r for r in job_results if city_key(r['City'], r['State']) not in cached]
+        errors = [{'key': item['key'], 'error': NO_DATA} for item in city_items if item['key'] in no_data]
+        errors += [e for e in job_errors if e['key'] not in cached and e['key'] not in no_data]
+        running = job is not None and job["status"] in ("pending", "running")
+
+        if running:
+            st.write("Fetching data from NREL API...")
+        if job is not None:
+            from_cache = len(set(cached) - set(job["done_keys"]))
+            st.progress(job["completed"] / job["total"] if job["total"] else 1.0)
+            st.caption(f"{job['completed']}/{job['total']} cities fetched, {from_cache} from cache")
+        else:
+            st.caption(f"All {len(city_items)} cities served from cache")
+
+        with st.expander(f"Fetch log ({len(results)} with data, {len(errors)} without)"):
+            for r in results:
+                st.write(f"✅ {r['City']}, {r['State']}: {r['Solar Irradiance (kWh/m²/day)']} kWh/m²/day")
+            for e in errors:
+                label = e['key'].replace('|', ', ') if e['key'] else "Analysis"
+                st.warning(f"⚠️ No data for {label}: {e['error']}")
 
         if results:
             df = pd.DataFrame(results)
@@ -183,7 +241,13 @@ if cities_df is not None:
             total_cost_per_panel = panel_cost + install_cost
 
             top5 = df.head(5)
-            for _, row in top5.iterrows():
+
+            # Hourly simulation (temperature derating, inverter clipping) where a local TMY file exists
+            top5_sites = [site_id(row['City'], row['State']) for _, row in top5.iterrows()]
+            with span("solar.simulation", sites=len(top5_sites)):
+                simulated_energy = simulated_energy_per_panel(top5_sites)
+
+            for (_, row), site in zip(top5.iterrows(), top5_sites):
                 city = row['City']
                 state = row['State']
                 irradiance = row['Solar Irradiance (kWh/m²/day)']
@@ -193,11 +257,16 @@ if cities_df is not None:
                 if num_panels < 1:
                     num_panels = 1
 
-                financials = calculate_solar_financials(irradiance, num_panels)
+                financials = calculate_solar_financials(
+                    irradiance, num_panels,
+                    panel_cost=panel_cost, install_cost=install_cost,
+                    annual_energy_per_panel=simulated_energy.get(site)
+                )
                 roi_results.append({
                     "City": city,
                     "Number of Panels": int(num_panels),
                     "State": state,
+                    "Energy Model": "Hourly TMY" if site in simulated_energy else "Annual GHI",
                     **financials
                 })
 
@@ -210,51 +279,22 @@ if cities_df is not None:
             st.success(
                 f"Best Location for a ${budget} Budget: **{best['City']}**, **{best['State']}** with {int(best['Number of Panels'])} panels")
 
-            # Download results
-            st.download_button(
-                label="📥 Download Results as CSV",
-                data=roi_df.to_csv(index=False).encode('utf-8'),
-                file_name=f'solar_roi_analysis_{region_selected}.csv',
-                mime='text/csv',
-            )
-        else:
+            # Download results (filtered / column-selected, streamed in chunks)
+            render_export(roi_df, f"solar_roi_analysis_{region_selected}", key="solar_export")
+        elif not running:
             st.error("No data retrieved. Check your API key or try fewer cities.")
 
+        # Poll the job until it finishes; results above update as cities arrive
+        if running:
+            time.sleep(1)
+            st.rerun()
+
+    # Keep polling while the surface is being sampled
+    if surface_running:
+        time.sleep(1)
+        st.rerun()
+
 else:
-    st.error("Could not load cities CSV file. Please check the file path.")
-
-
-# Add the calculate_solar_financials function
-def calculate_solar_financials(irradiance, num_panels,
-                               panel_area=1.7, panel_efficiency=0.18,
-                               electricity_rate=0.12,
-                               panel_cost=250, install_cost=250,
-                               maintenance_cost=15,
-                               lifetime_years=25, discount_rate=0.05):
-    # Energy per panel
-    annual_energy_per_panel = irradiance * panel_area * panel_efficiency * 365  # kWh/year
-    total_annual_energy = annual_energy_per_panel * num_panels
-
-    # Revenue
-    annual_revenue = total_annual_energy * electricity_rate
-
-    # Costs
-    total_initial_cost = num_panels * (panel_cost + install_cost)
-    total_maintenance = num_panels * maintenance_cost
-    annual_net_savings = annual_revenue - total_maintenance
-
-    # Payback Period
-    payback_period = total_initial_cost / annual_net_savings if annual_net_savings > 0 else None
-
-    # ROI %
-    roi_percent = (annual_net_savings / total_initial_cost) * 100 if total_initial_cost > 0 else 0
-
-    return {
-        "Annual Energy (kWh)": total_annual_energy,
-        "Annual Revenue ($)": annual_revenue,
-        "Net Annual Savings ($)": annual_net_savings,
-        "Total Initial Cost ($)": total_initial_cost,
-        "Payback Period (years)": payback_period,
-        "ROI (%)": roi_percent
-    }
+    st.error("Could not load cities. Please check the data files.")
 
+render_debug_panel()
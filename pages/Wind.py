@@ -1,8 +1,16 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 import os
-from geopy.geocoders import Nominatim
+
+from src.export import render_export
+from src.grid_store import grid_path_for, load_candidate_grid
+from src.memo import dataset_version, get_cache
+from src.services import lazy_import, reverse_geocode
+from src.tracing import render_debug_panel, span, traced
+
+from src.portfolio import optimize_portfolio
+from src.site_selection import diverse_top_k
+from src.wind_production import site_production, calculate_wind_metrics
 
 # Custom styling
 st.markdown("""
@@ -61,21 +69,36 @@ st.markdown("""
 
 st.divider()
 
-# Load wind turbine data
-@st.cache_data
+WIND_CSV_PATH = "renewable_energies/wind/optimal_wind_turbine_locations.csv"
+WIND_CANDIDATES_PATH = "renewable_energies/wind/all_candidate_locations.csv"
+
+# Computed results and top/bottom views, shared by all sessions and keyed by every input
+wind_results_cache = get_cache("wind_results", maxsize=32)
+wind_views_cache = get_cache("wind_views", maxsize=128)
+wind_portfolio_cache = get_cache("wind_portfolio", maxsize=32)
+
+# Load wind turbine data (memory-mapped binary grid, shared by every session and process)
+@traced("data.load_wind")
 def load_wind_data():
-    csv_path = "renewable_energies/wind/optimal_wind_turbine_locations.csv"
-    if os.path.exists(csv_path):
-        return pd.read_csv(csv_path)
+    csv_path = WIND_CSV_PATH
+    if os.path.exists(csv_path) or os.path.exists(grid_path_for(csv_path)):
+        return load_candidate_grid(csv_path)
     else:
         st.error(f"Wind data file not found at {csv_path}")
         return None
 
+# Full candidate grid for portfolio selection
+@traced("data.load_wind_candidates")
+def load_candidate_data():
+    if os.path.exists(WIND_CANDIDATES_PATH) or os.path.exists(grid_path_for(WIND_CANDIDATES_PATH)):
+        return load_candidate_grid(WIND_CANDIDATES_PATH)
+    return None
+
 @st.cache_data(show_spinner="Loading locations...")
 def get_location_name(lat, lon):
     try:
-        geocoder = Nominatim(user_agent="renewweb_analyzer")
-        location = geocoder.reverse(f"{lat}, {lon}", language='en', timeout=10)
+        with span("geocode.reverse"):
+            location = reverse_geocode(f"{lat}, {lon}", language='en', timeout=10)
         if location and location.raw.get('address'):
             address = location.raw['address']
             state = address.get('state', None)
@@ -141,93 +164,74 @@ efficiency_value = st.slider(
     "Turbine Efficiency (%)",
     min_value=10,
     max_value=100,
-    value=50,
+    value=90,
     step=1,
-    help="Select the efficiency rating of the turbines (10-100%)"
+    help="Share of the power-curve output actually delivered after availability and electrical losses (10-100%). "
+         "The power curve already accounts for each site's wind, so this is not the capacity factor: "
+         "about 97% availability and 5-7% wake and electrical losses give the 90% default."
 )
 efficiency = f"{efficiency_value}%"
     
 st.divider()
     
+# Sessions keep only their parameters; the grid and every result frame are shared, read-only
 if st.button("GENERATE REVENUE CALCULATIONS", use_container_width=True, type="primary"):
-    wind_df = load_wind_data()
     st.session_state.renewable_source = "Wind"
     st.session_state.cost_per_unit = cost_per_unit
     st.session_state.num_units = num_units
     st.session_state.efficiency = efficiency
-    st.session_state.wind_df = wind_df
     st.session_state.show_results = True
 
 # Display results if generated
 if "show_results" in st.session_state and st.session_state.show_results:
-    wind_df = st.session_state.wind_df
+    wind_df = load_wind_data()
     if wind_df is not None:
         st.divider()
         st.subheader("Revenue Analysis Results")
         
-        # Extract efficiency as decimal
-        efficiency_num = int(st.session_state.efficiency.replace('%', '')) / 100
-        capacity_factor = efficiency_num
+        # Extract efficiency as decimal (availability and losses on top of the power curve)
+        availability = int(st.session_state.efficiency.replace('%', '')) / 100
         
         # Constants for calculations
         turbine_capacity_mw = 2.0  # MW per turbine
-        annual_hours = 8760
         energy_price = 0.05  # $/kWh
         om_cost_per_mw_year = 45000  # $/MW/year
         
+        # Everything that affects the metrics; view-only changes (sort, range) reuse the cached frame
+        results_key = (
+            dataset_version(WIND_CSV_PATH),
+            st.session_state.cost_per_unit,
+            st.session_state.num_units,
+            st.session_state.efficiency,
+            turbine_capacity_mw,
+            energy_price,
+            om_cost_per_mw_year
+        )
         
+        def compute_results():
+            # Annual energy from the turbine power curve over each site's wind distribution
+            with span("wind.metrics", sites=len(wind_df)):
+                production = site_production(wind_df)
+                metrics = calculate_wind_metrics(
+                    production,
+                    st.session_state.num_units,
+                    st.session_state.cost_per_unit,
+                    availability=availability,
+                    turbine_capacity_mw=turbine_capacity_mw,
+                    energy_price=energy_price,
+                    om_cost_per_mw_year=om_cost_per_mw_year
+                )
         
+            # Location names are only looked up for the sites that get displayed
+            df_results = pd.DataFrame({
+                'Location': [f"({lat:.2f}, {lon:.2f})" for lat, lon in zip(wind_df['lat'], wind_df['lon'])],  # Placeholder
+                'lat': wind_df['lat'],
+                'lon': wind_df['lon'],
+            })
+            df_results = pd.concat([df_results, metrics], axis=1)
+            return df_results
         
-        def calculate_wind_metrics(row, num_turbines, capacity_factor, cost_per_unit_millions):
-            total_capacity_mw = float(num_turbines) * float(turbine_capacity_mw)
-
-            # Use wind quality as a multiplier — you can choose either:
-    
-            # Option A: Based on mean wind speed (cubed is more realistic for turbines)
-            wind_multiplier = (float(row['mean_wind_speed']) / 8.0) ** 3  # Normalize to 8 m/s
-
-            # Option B: Based on power_potential (already in a relevant scale)
-            # wind_multiplier = float(row['power_potential']) / 600.0  # Normalize around median
-
-            annual_energy_kwh = (
-                float(num_turbines)
-                * float(turbine_capacity_mw)
-                * float(annual_hours)
-                * float(capacity_factor)
-                * wind_multiplier
-                * 1000.0
-            )
-
-            annual_revenue = float(annual_energy_kwh) * float(energy_price)
-            om_cost = float(total_capacity_mw) * float(om_cost_per_mw_year)
-            annual_profit = annual_revenue - om_cost
-            total_cost = float(cost_per_unit_millions) * 1e6 * float(num_turbines)
-    
-            roi_percent = (annual_profit / total_cost * 100.0) if total_cost > 0 else 0
-            payback_years = (total_cost / annual_profit) if annual_profit > 0 else float('inf')
-
-            return {
-             'Annual Energy (MWh)': annual_energy_kwh / 1e6,
-                'Annual Revenue ($M)': annual_revenue / 1e6,
-                'Annual Profit ($M)': annual_profit / 1e6,
-                'ROI (%)': roi_percent,
-                'Payback (years)': payback_years
-            }
-
-
-        # Calculate metrics for all locations (without location names initially)
-        results = []
-        for idx, row in wind_df.iterrows():
-            metrics = calculate_wind_metrics(row, st.session_state.num_units, capacity_factor, st.session_state.cost_per_unit)
-            result_row = {
-                'Location': f"({row['lat']:.2f}, {row['lon']:.2f})",  # Placeholder
-                'lat': row['lat'],
-                'lon': row['lon'],
-                **metrics
-            }
-            results.append(result_row)
-        
-        df_results = pd.DataFrame(results)
+        df_results = wind_results_cache.get_or_compute(results_key, compute_results)
         
         # Sort by Annual Revenue for initial display metrics
         df_top5_initial = df_results.nlargest(5, 'Annual Revenue ($M)').reset_index(drop=True)
@@ -265,6 +269,20 @@ if "show_results" in st.session_state and st.session_state.show_results:
         
         sort_column, use_smallest = sort_mapping[sort_by]
         
+        # Adjacent grid cells usually belong to the same ridge; spacing keeps the list diverse
+        spacing_options = {
+            "At least 50 km apart": 50.0,
+            "At least 100 km apart": 100.0,
+            "At least 25 km apart": 25.0,
+            "Best cells (may be adjacent)": 0.0
+        }
+        spacing = st.selectbox(
+            "Site spacing",
+            options=list(spacing_options),
+            help="Pick sites from separate wind peaks instead of neighbouring cells"
+        )
+        min_separation_km = spacing_options[spacing]
+        
         # Range filtering based on selected metric
         st.subheader(f"Filter by {sort_by} Range (Optional)")
         
@@ -278,40 +296,55 @@ if "show_results" in st.session_state and st.session_state.show_results:
         
         st.divider()
         
-        # Apply range filter if specified
-        df_filtered = df_results.copy()
+        def compute_views():
+            # Apply range filter if specified (filters make new frames; the shared results stay untouched)
+            df_filtered = df_results
         
-        if min_val is not None:
-            df_filtered = df_filtered[df_filtered[sort_column] >= min_val]
-        if max_val is not None:
-            df_filtered = df_filtered[df_filtered[sort_column] <= max_val]
+            if min_val is not None:
+                df_filtered = df_filtered[df_filtered[sort_column] >= min_val]
+            if max_val is not None:
+                df_filtered = df_filtered[df_filtered[sort_column] <= max_val]
         
-        # Sort and get top 5 and bottom 5
-        if use_smallest:
-            df_top5 = df_filtered.nsmallest(5, sort_column).reset_index(drop=True)
-            df_bottom5 = df_filtered.nlargest(5, sort_column).reset_index(drop=True)
-        else:
-            # Pre-sort
-            df_sorted_top = df_filtered.sort_values(by=sort_column, ascending=use_smallest).reset_index(drop=True)
-            df_sorted_bottom = df_filtered.sort_values(by=sort_column, ascending=not use_smallest).reset_index(drop=True)
+            # Sort and get top 5 and bottom 5
+            if min_separation_km > 0:
+                # Local peaks at least min_separation_km apart, with spares for failed geocodes
+                df_sorted_top = diverse_top_k(df_filtered, sort_column, k=15, min_separation_km=min_separation_km,
+                                              ascending=use_smallest).reset_index(drop=True)
+                df_sorted_bottom = diverse_top_k(df_filtered, sort_column, k=15, min_separation_km=min_separation_km,
+                                                 ascending=not use_smallest).reset_index(drop=True)
+                df_top5 = get_valid_locations(df_sorted_top, count=5)
+                df_bottom5 = get_valid_locations(df_sorted_bottom, count=5)
+            elif use_smallest:
+                df_top5 = df_filtered.nsmallest(5, sort_column).reset_index(drop=True)
+                df_bottom5 = df_filtered.nlargest(5, sort_column).reset_index(drop=True)
+            else:
+                # Pre-sort
+                df_sorted_top = df_filtered.sort_values(by=sort_column, ascending=use_smallest).reset_index(drop=True)
+                df_sorted_bottom = df_filtered.sort_values(by=sort_column, ascending=not use_smallest).reset_index(drop=True)
 
-            # Get only valid location rows (up to 5)
-            df_top5 = get_valid_locations(df_sorted_top, count=5)
-            df_bottom5 = get_valid_locations(df_sorted_bottom, count=5)
-        
-        # NOW get location names only for the top 5 and bottom 5 using EXACT coordinates
-        for idx in df_top5.index:
-            exact_lat = df_top5.at[idx, 'lat']
-            exact_lon = df_top5.at[idx, 'lon']
-            location_name, _ = get_location_name(exact_lat, exact_lon)
-            df_top5.at[idx, 'Location'] = location_name if location_name else f"({exact_lat:.2f}, {exact_lon:.2f})"
+                # Get only valid location rows (up to 5)
+                df_top5 = get_valid_locations(df_sorted_top, count=5)
+                df_bottom5 = get_valid_locations(df_sorted_bottom, count=5)
+        
+            # NOW get location names only for the top 5 and bottom 5 using EXACT coordinates
+            for idx in df_top5.index:
+                exact_lat = df_top5.at[idx, 'lat']
+                exact_lon = df_top5.at[idx, 'lon']
+                location_name, _ = get_location_name(exact_lat, exact_lon)
+                df_top5.at[idx, 'Location'] = location_name if location_name else f"({exact_lat:.2f}, {exact_lon:.2f})"
 
         
-        for idx in df_bottom5.index:
-            exact_lat = df_bottom5.at[idx, 'lat']
-            exact_lon = df_bottom5.at[idx, 'lon']
-            location_name, _ = get_location_name(exact_lat, exact_lon)
-            df_bottom5.at[idx, 'Location'] = location_name if location_name else f"({exact_lat:.2f}, {exact_lon:.2f})"
+            for idx in df_bottom5.index:
+                exact_lat = df_bottom5.at[idx, 'lat']
+                exact_lon = df_bottom5.at[idx, 'lon']
+                location_name, _ = get_location_name(exact_lat, exact_lon)
+                df_bottom5.at[idx, 'Location'] = location_name if location_name else f"({exact_lat:.2f}, {exact_lon:.2f})"
+            return df_top5, df_bottom5
+        
+        # Annotated (geocoded) top/bottom frames per results + sort + range
+        df_top5, df_bottom5 = wind_views_cache.get_or_compute(
+            results_key + (sort_column, min_val, max_val, min_separation_km), compute_views
+        )
         
         if len(df_top5) == 0:
             st.warning("No locations found for the selected range")
@@ -324,6 +357,7 @@ if "show_results" in st.session_state and st.session_state.show_results:
             for idx, row in df_top5.iterrows():
                 with st.expander(f"{idx+1}. {row['Location']} - ${row['Annual Revenue ($M)']:.5f}M Revenue / {row['ROI (%)']:.5f}% ROI"):
                     st.markdown(f"<p style='font-size: 1.15rem;'><strong>Annual Energy:</strong> {row['Annual Energy (MWh)']:,.5f} MWh/yr</p>", unsafe_allow_html=True)
+                    st.markdown(f"<p style='font-size: 1.15rem;'><strong>Capacity Factor:</strong> {row['Capacity Factor (%)']:.1f}%</p>", unsafe_allow_html=True)
                     st.markdown(f"<p style='font-size: 1.15rem;'><strong>Annual Revenue:</strong> ${row['Annual Revenue ($M)']:.5f}M</p>", unsafe_allow_html=True)
                     st.markdown(f"<p style='font-size: 1.15rem;'><strong>Annual Profit:</strong> ${row['Annual Profit ($M)']:.5f}M</p>", unsafe_allow_html=True)
                     st.markdown(f"<p style='font-size: 1.15rem;'><strong>ROI:</strong> {row['ROI (%)']:.5f}%</p>", unsafe_allow_html=True)
@@ -348,6 +382,7 @@ if "show_results" in st.session_state and st.session_state.show_results:
             for idx, row in df_bottom5.iterrows():
                 with st.expander(f"{idx+1}. {row['Location']} - ${row['Annual Revenue ($M)']:.5f}M Revenue / {row['ROI (%)']:.5f}% ROI"):
                     st.markdown(f"<p style='font-size: 1.15rem;'><strong>Annual Energy:</strong> {row['Annual Energy (MWh)']:,.5f} MWh/yr</p>", unsafe_allow_html=True)
+                    st.markdown(f"<p style='font-size: 1.15rem;'><strong>Capacity Factor:</strong> {row['Capacity Factor (%)']:.1f}%</p>", unsafe_allow_html=True)
                     st.markdown(f"<p style='font-size: 1.15rem;'><strong>Annual Revenue:</strong> ${row['Annual Revenue ($M)']:.5f}M</p>", unsafe_allow_html=True)
                     st.markdown(f"<p style='font-size: 1.15rem;'><strong>Annual Profit:</strong> ${row['Annual Profit ($M)']:.5f}M</p>", unsafe_allow_html=True)
                     st.markdown(f"<p style='font-size: 1.15rem;'><strong>ROI:</strong> {row['ROI (%)']:.5f}%</p>", unsafe_allow_html=True)
@@ -369,22 +404,124 @@ if "show_results" in st.session_state and st.session_state.show_results:
             # Visualization with TOP 5 only
             st.subheader(f"Top 5 {sort_by} Comparison by Location")
             
-            fig = px.bar(
-                df_top5,
-                x="Location",
-                y=sort_column,
-                color="ROI (%)",
-                color_continuous_scale="Greens",
-                title=f"Top 5 by {sort_by}",
-                labels={sort_column: sort_column},
-                height=600  # Increased from default ~450 to 600
-            )
+            with span("render.chart"):
+                px = lazy_import("plotly.express")
+                fig = px.bar(
+                    df_top5,
+                    x="Location",
+                    y=sort_column,
+                    color="ROI (%)",
+                    color_continuous_scale="Greens",
+                    title=f"Top 5 by {sort_by}",
+                    labels={sort_column: sort_column},
+                    height=600  # Increased from default ~450 to 600
+                )
             
-            # Make bars thicker and improve layout
-            fig.update_traces(width=0.6)
-            fig.update_layout(
-                xaxis_tickangle=-45,
-                margin=dict(b=100)
-            )
+                # Make bars thicker and improve layout
+                fig.update_traces(width=0.6)
+                fig.update_layout(
+                    xaxis_tickangle=-45,
+                    margin=dict(b=100)
+                )
             
-            st.plotly_chart(fig, use_container_width=True)
\ No newline at end of file
+                st.plotly_chart(fig, use_container_width=True)
+        
+        st.divider()
+        
+        # Every site's metrics, not just the top and bottom 5
+        render_export(df_results, "wind_site_results", key="wind_export")
+        
+        st.divider()
+        
+        # Portfolio: which set of sites to build for a total budget
+        st.subheader("Build a Portfolio")
+        st.caption(f"Each site gets {st.session_state.num_units} turbines. "
+                   "Sites are chosen from the full candidate grid.")
+        
+        site_cost = st.session_state.cost_per_unit * st.session_state.num_units
+        
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            portfolio_budget = st.number_input(
+                "Total Budget ($M)",
+                min_value=float(site_cost),
+                value=float(site_cost * 10),
+                step=float(site_cost),
+                help="Capital available for all sites together"
+            )
+        
+        with col2:
+            min_spacing_km = st.number_input(
+                "Minimum Spacing (km)",
+                min_value=0,
+                max_value=1000,
+                value=50,
+                step=10,
+                help="No two chosen sites may be closer than this"
+            )
+        
+        with col3:
+            portfolio_goal = st.selectbox(
+                "Maximize",
+                options=["Profit", "Energy"],
+                help="Portfolio objective"
+            )
+        
+        goal_column = sort_mapping[portfolio_goal][0]
+        portfolio_key = results_key + (
+            dataset_version(WIND_CANDIDATES_PATH), portfolio_budget, min_spacing_km, goal_column
+        )
+        
+        if st.button("OPTIMIZE PORTFOLIO", use_container_width=True):
+            candidates = load_candidate_data()
+            if candidates is None:
+                st.error(f"Candidate grid not found at {WIND_CANDIDATES_PATH}")
+            else:
+                def compute_portfolio():
+                    with span("wind.portfolio", sites=len(candidates)):
+                        metrics = calculate_wind_metrics(
+                            site_production(candidates),
+                            st.session_state.num_units,
+                            st.session_state.cost_per_unit,
+                            availability=availability,
+                            turbine_capacity_mw=turbine_capacity_mw,
+                            energy_price=energy_price,
+                            om_cost_per_mw_year=om_cost_per_mw_year
+                        )
+                        return optimize_portfolio(
+                            pd.concat([candidates[['lat', 'lon']], metrics], axis=1),
+                            budget=portfolio_budget,
+                            site_cost=site_cost,
+                            value_col=goal_column,
+                            min_spacing_km=min_spacing_km
+                        )
+                
+                wind_portfolio_cache.get_or_compute(portfolio_key, compute_portfolio)
+                st.session_state.wind_portfolio_key = portfolio_key
+        
+        # Only show a portfolio that matches the current inputs
+        portfolio = None
+        if st.session_state.get("wind_portfolio_key") == portfolio_key:
+            portfolio = wind_portfolio_cache.get(portfolio_key)
+        if portfolio is not None:
+            chosen = portfolio["sites"]
+            if len(chosen) == 0:
+                st.warning("No site fits the budget with a positive return")
+            else:
+                unit = "$M/yr" if portfolio_goal == "Profit" else "MWh/yr"
+                
+                st.metric("Sites Selected", len(chosen))
+                st.metric("Capital Used", f"${portfolio['total_cost']:.1f}M of ${portfolio_budget:.1f}M")
+                st.metric(f"Portfolio {portfolio_goal}", f"{portfolio['total_value']:,.2f} {unit}")
+                st.caption(f"Within {portfolio['gap'] * 100:.1f}% of the best possible without spacing limits. "
+                           "Marginal value: what is lost if the site is dropped and the best replacement built instead.")
+                
+                st.dataframe(
+                    chosen[['lat', 'lon', 'Annual Energy (MWh)', 'Annual Profit ($M)', 'ROI (%)', 'Marginal Value']].round(3),
+                    use_container_width=True,
+                    hide_index=True
+                )
+                render_export(chosen, "wind_portfolio", key="wind_portfolio_export")
+
+render_debug_panel()
@@ -1,5 +1,13 @@
+import bisect
+
+import numpy as np
 import pandas as pd
 
+from src.hybrid import hybrid_candidates
+from src.hydro import hydro_candidates
+from src.tracing import traced
+
+@traced("calc.optimal_config")
 def calculate_optimal_config(params):
     """
     Calculate optimal configuration based on user-specified parameters.
@@ -41,6 +49,23 @@ def calculate_optimal_config(params):
         # Get alternatives
         alternatives = get_alternatives(locations_db, facilities_db, best_config)
         
+        # Non-dominated configurations over the chosen objectives
+        objectives = params.get("objectives") or DEFAULT_OBJECTIVES
+        frontier = pareto_frontier(build_config_table(locations_db, facilities_db), objectives)
+        
+        # Co-located solar and wind resource, only for hybrid plants
+        hybrid_sites = []
+        if best_config["type"] == "Hybrid (Solar+Wind)":
+            hybrid = hybrid_candidates(max_distance_km=params.get("hybrid_max_distance_km") or 50.0)
+            hybrid_sites = hybrid.head(5).to_dict("records") if len(hybrid) else []
+        
+        # Screened river reaches, only for hydro plants; the screening itself is run
+        # offline (python -m src.hydro) rather than inside a request
+        hydro_sites = []
+        if best_config["type"] == "Hydro Plant":
+            hydro = hydro_candidates(screen=False)
+            hydro_sites = hydro.head(5).to_dict("records") if len(hydro) else []
+        
         # Format recommendations
         recommendations = {
             "location": best_config["location"],
@@ -50,7 +75,10 @@ def calculate_optimal_config(params):
             "roi_timeline": calculate_roi(best_config["cost"], best_config["potential_revenue"]),
             "co2_reduction": best_config["co2_reduction"],
             "alternatives": alternatives,
-            "recommendations": generate_recommendations(params, best_config)
+            "pareto_frontier": frontier.to_dict("records"),
+            "hybrid_sites": hybrid_sites,
+            "hydro_sites": hydro_sites,
+            "recommendations": generate_recommendations(params, best_config, hybrid_sites, hydro_sites)
         }
         
         return recommendations
@@ -60,6 +88,7 @@ def calculate_optimal_config(params):
         return get_default_recommendation()
 
 
+@traced("calc.score_and_rank")
 def score_and_rank(locations, facilities):
     """Score and rank configurations based on multiple factors"""
     
@@ -115,6 +144,193 @@ def score_and_rank(locations, facilities):
     return best.to_dict()
 
 
+# Objectives for the Pareto frontier: column -> "min" or "max"
+DEFAULT_OBJECTIVES = {
+    "cost": "min",
+    "potential_revenue": "max",
+    "irradiance": "max",
+    "weather_stability": "max",
+    "co2_reduction": "max"
+}
+
+
+def build_config_table(locations, facilities):
+    """All location x facility pairs with their objective columns and match score"""
+    
+    configs = locations.merge(facilities, how="cross")
+    configs["score"] = (
+        (configs["irradiance"] / 6.0) * 0.3 +
+        (1 - (configs["cost"] / 5000000)) * 0.25 +
+        (configs["potential_revenue"] / 1000000) * 0.25 +
+        (configs["weather_stability"] / 100) * 0.2
+    ) * 100
+    
+    return configs
+
+
+def pareto_frontier(configs, objectives=None, chunk_size=2048):
+    """
+    Non-dominated rows of `configs`.
+    
+    Args:
+        configs: DataFrame with one column per objective
+        objectives: dict of column -> "min" or "max" (defaults to DEFAULT_OBJECTIVES)
+    
+    Uses an O(n log n) sweep for 2 and 3 objectives and a chunked,
+    vectorized skyline for more. Rows identical in every objective are
+    all kept.
+    
+    Returns:
+        the frontier rows, in their original order
+    """
+    
+    objectives = objectives or DEFAULT_OBJECTIVES
+    if len(configs) == 0:
+        return configs
+    
+    # Minimisation matrix: negate the objectives to maximise
+    signs = np.array([1.0 if objectives[col] == "min" else -1.0 for col in objectives])
+    points = configs[list(objectives)].to_numpy(dtype=np.float64) * signs
+    
+    # Duplicates never dominate each other, so solve on the unique points
+    unique, inverse = _unique_rows(points)
+    
+    # Cheap vectorized pass first: most rows are dominated by one of a few strong points
+    if unique.shape[1] > 2:
+        candidates = np.flatnonzero(_prefilter(unique))
+    else:
+        candidates = np.arange(len(unique))
+    reduced = unique[candidates]
+    
+    if reduced.shape[1] == 1:
+        reduced_keep = reduced[:, 0] == reduced[:, 0].min()
+    elif reduced.shape[1] == 2:
+        reduced_keep = _frontier_2d(reduced)
+    elif reduced.shape[1] == 3:
+        reduced_keep = _frontier_3d(reduced)
+    else:
+        reduced_keep = _skyline(reduced, chunk_size)
+    
+    keep = np.zeros(len(unique), dtype=bool)
+    keep[candidates[reduced_keep]] = True
+    
+    return configs[keep[inverse]]
+
+
+def _unique_rows(points):
+    """Lexicographically sorted unique rows and the row -> unique index mapping"""
+    
+    order = np.lexsort(points.T[::-1])
+    sorted_points = points[order]
+    new_row = np.ones(len(points), dtype=bool)
+    new_row[1:] = (sorted_points[1:] != sorted_points[:-1]).any(axis=1)
+    
+    inverse = np.empty(len(points), dtype=np.intp)
+    inverse[order] = np.cumsum(new_row) - 1
+    
+    return sorted_points[new_row], inverse
+
+
+def _prefilter(points, n_pivots=32):
+    """Mask of points not dominated by any of the pivots with the smallest coordinate sums"""
+    
+    if len(points) <= n_pivots:
+        return np.ones(len(points), dtype=bool)
+    
+    pivots = points[np.argpartition(points.sum(axis=1), n_pivots)[:n_pivots]]
+    alive = np.ones(len(points), dtype=bool)
+    
+    # One column at a time keeps every pass a flat, cache-friendly comparison
+    for pivot in pivots:
+        no_worse = np.ones(len(points), dtype=bool)
+        better = np.zeros(len(points), dtype=bool)
+        for j, value in enumerate(pivot):
+            no_worse &= points[:, j] >= value
+            better |= points[:, j] > value
+        alive &= ~(no_worse & better)
+    
+    return alive
+
+
+def _frontier_2d(points):
+    """Sweep in x order keeping points that improve the best y seen so far"""
+    
+    # Unique rows arrive sorted lexicographically (x, then y)
+    best_y = np.minimum.accumulate(points[:, 1])
+    keep = np.empty(len(points), dtype=bool)
+    keep[0] = True
+    keep[1:] = points[1:, 1] < best_y[:-1]
+    
+    return keep
+
+
+def _frontier_3d(points):
+    """
+    Kung's sweep: in (x, y, z) order a point is dominated iff an earlier one
+    has y' <= y and z' <= z. Earlier points are kept as a (y, z) staircase.
+    """
+    
+    keep = np.zeros(len(points), dtype=bool)
+    stair_y = []   # ascending
+    stair_z = []   # strictly descending
+    
+    for i, (_, y, z) in enumerate(points.tolist()):
+        pos = bisect.bisect_right(stair_y, y)
+        if pos > 0 and stair_z[pos - 1] <= z:
+            continue
+        keep[i] = True
+        
+        # Drop staircase points the new one dominates in (y, z)
+        end = pos
+        while end < len(stair_y) and stair_z[end] >= z:
+            end += 1
+        stair_y[pos:end] = [y]
+        stair_z[pos:end] = [z]
+    
+    return keep
+
+
+def _skyline(points, chunk_size=2048):
+    """
+    Sort-filter skyline for any number of objectives.
+    
+    Points are visited in order of their coordinate sum, so a point can only
+    be dominated by points already accepted. Each chunk is checked against
+    the current skyline and against itself with vectorized comparisons.
+    """
+    
+    order = np.argsort(points.sum(axis=1), kind="stable")
+    keep = np.zeros(len(points), dtype=bool)
+    skyline = np.empty((0, points.shape[1]))
+    
+    for start in range(0, len(order), chunk_size):
+        idx = order[start:start + chunk_size]
+        chunk = points[idx]
+        
+        # Dominated by an accepted point?
+        alive = np.ones(len(chunk), dtype=bool)
+        for s in range(0, len(skyline), chunk_size):
+            sky = skyline[s:s + chunk_size]
+            dominated = (
+                (sky[None, :, :] <= chunk[:, None, :]).all(axis=2) &
+                (sky[None, :, :] < chunk[:, None, :]).any(axis=2)
+            ).any(axis=1)
+            alive &= ~dominated
+        
+        # Dominated within the chunk?
+        cand = chunk[alive]
+        dominated = (
+            (cand[None, :, :] <= cand[:, None, :]).all(axis=2) &
+            (cand[None, :, :] < cand[:, None, :]).any(axis=2)
+        ).any(axis=1)
+        
+        accepted = np.flatnonzero(alive)[~dominated]
+        keep[idx[accepted]] = True
+        skyline = np.vstack([skyline, chunk[accepted]])
+    
+    return keep
+
+
 def get_alternatives(locations, facilities, best_config, top_n=3):
     """Get top alternative configurations"""
     
@@ -139,7 +355,7 @@ def get_alternatives(locations, facilities, best_config, top_n=3):
     return alternatives
 
 
-def generate_recommendations(params, best_config):
+def generate_recommendations(params, best_config, hybrid_sites=None, hydro_sites=None):
     """Generate text recommendations based on config"""
     
     location = best_config.get("location", "West Texas")
@@ -156,6 +372,28 @@ def generate_recommendations(params, best_config):
         "Construction timeline: 18-24 months from start to operation"
     ]
     
+    if facility_type == "Hybrid (Solar+Wind)" and hybrid_sites:
+        site = hybrid_sites[0]
+        # Needs hourly wind and solar series for the site; the candidate grid has annual means only
+        complement = site.get("complementarity")
+        if complement is not None and pd.notna(complement):
+            complement_note = f" ({complement * 100:.0f}% solar/wind complementarity)"
+        else:
+            complement_note = " (solar/wind complementarity not assessed: no hourly wind data for this site)"
+        recs.insert(3, (
+            f"Best co-located site: ({site['lat']:.2f}, {site['lon']:.2f}) near {site['city']}, "
+            f"{site['combined_mwh']:,.0f} MWh/yr combined" + complement_note
+        ))
+    
+    if facility_type == "Hydro Plant" and hydro_sites:
+        site = hydro_sites[0]
+        river = f" on {site['name']}" if isinstance(site.get("name"), str) and site["name"] else ""
+        recs.insert(3, (
+            f"Best screened river reach{river}: ({site['lat']:.2f}, {site['lon']:.2f}), "
+            f"{site['power_potential']:,.0f} kW from {site['head_m']:.1f} m head and "
+            f"{site['flow_cms']:.1f} m³/s mean flow (~{site['annual_energy_mwh']:,.0f} MWh/yr)"
+        ))
+    
     return recs
 
 
@@ -297,5 +535,8 @@ def get_default_recommendation():
             "Expected Revenue: $650,000 annually",
             "Consider battery storage for grid stability and peak demand management",
             "Construction timeline: 18-24 months from start to operation"
-        ]
+        ],
+        "pareto_frontier": [],
+        "hybrid_sites": [],
+        "hydro_sites": []
     }
\ No newline at end of file
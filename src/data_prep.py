@@ -1,21 +1,63 @@
 # src/data_prep.py (Data Cleaning)
+import json
+import os
+
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pv
+import pyarrow.parquet as pq
+
+# Columns used downstream and their on-disk types
+SOLAR_COLUMNS = ["location", "irradiance", "temperature", "humidity", "power_output"]
+SOLAR_DTYPES = {
+    "location": "category",
+    "irradiance": "float32",
+    "temperature": "float32",
+    "humidity": "float32",
+    "power_output": "float32"
+}
+MEAN_COLUMNS = ["irradiance", "temperature", "humidity"]
+SUM_COLUMNS = ["power_output"]
+
 
 def load_solar_data(filepath="data/solar_data.csv"):
     """Load and clean solar data from Kaggle"""
     
-    df = pd.read_csv(filepath)
+    df = pd.read_csv(filepath, usecols=SOLAR_COLUMNS, dtype=SOLAR_DTYPES, engine="pyarrow")
     df = df.dropna()
     
     # Add location grouping if needed
     return df
 
 
+def iter_solar_chunks(filepath="data/solar_data.csv", block_size=64 << 20):
+    """
+    Stream a large solar CSV as typed DataFrame chunks.
+
+    Uses pyarrow's streaming CSV reader, so only one block (~64 MB of text
+    by default) is held in memory at a time.
+    """
+
+    reader = pv.open_csv(
+        filepath,
+        read_options=pv.ReadOptions(block_size=block_size),
+        convert_options=pv.ConvertOptions(
+            include_columns=SOLAR_COLUMNS,
+            column_types={col: pa.float32() for col in SOLAR_COLUMNS if col != "location"}
+        )
+    )
+
+    for batch in reader:
+        chunk = batch.to_pandas().dropna()
+        chunk["location"] = chunk["location"].astype("category")
+        yield chunk
+
+
 def add_location_data(df):
     """Add location-based features"""
     
     # Aggregate data by location
-    location_stats = df.groupby("location").agg({
+    location_stats = df.groupby("location", observed=True).agg({
         "irradiance": "mean",
         "temperature": "mean",
         "humidity": "mean",
@@ -23,3 +65,85 @@ def add_location_data(df):
     }).reset_index()
     
     return location_stats
+
+
+def add_location_data_streaming(chunks):
+    """
+    Same aggregation as add_location_data, accumulated chunk by chunk.
+
+    Only per-location running sums and counts are kept, so memory depends
+    on the number of locations rather than the number of rows. Sums are
+    accumulated in float64 and only the final stats are stored as float32.
+    """
+
+    totals = None
+    for chunk in chunks:
+        values = chunk[MEAN_COLUMNS + SUM_COLUMNS].astype("float64")
+        grouped = values.groupby(chunk["location"], observed=True)
+        partial = grouped.sum()
+        partial["count"] = grouped.size()
+        partial.index = partial.index.astype(str)
+        totals = partial if totals is None else totals.add(partial, fill_value=0)
+
+    if totals is None:
+        return pd.DataFrame(columns=SOLAR_COLUMNS)
+
+    location_stats = totals[SUM_COLUMNS].copy()
+    for col in MEAN_COLUMNS:
+        location_stats[col] = totals[col] / totals["count"]
+    location_stats.index.name = "location"
+
+    return location_stats[MEAN_COLUMNS + SUM_COLUMNS].astype("float32").reset_index()
+
+
+def aggregate_solar_file(filepath="data/solar_data.csv", cache_path=None):
+    """
+    Per-location stats for a solar CSV of any size, cached as Parquet.
+
+    The cache is reused while it is newer than the source file.
+    """
+
+    if cache_path is None:
+        cache_path = os.path.splitext(filepath)[0] + "_by_location.parquet"
+
+    if os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(filepath):
+        return pd.read_parquet(cache_path)
+
+    location_stats = add_location_data_streaming(iter_solar_chunks(filepath))
+    location_stats.to_parquet(cache_path, index=False)
+
+    return location_stats
+
+def load_city_locations(parquet_path="renewable_energies/cleaned_locations_with_region.parquet",
+                        index_path="renewable_energies/cleaned_locations_region_index.json",
+                        csv_path="renewable_energies/cleaned_locations_with_region_new.csv",
+                        region=None):
+    """
+    Load cleaned US cities with their region.
+
+    Reads the Parquet output of data_cleaning/city_cleaning_main.py when it
+    exists (only the selected region's row group if `region` is given),
+    otherwise falls back to the small CSV sample.
+    """
+
+    if not os.path.exists(parquet_path):
+        df = pd.read_csv(csv_path)
+        if region is not None:
+            df = df[df["Region"] == region]
+        return df
+
+    if region is not None and os.path.exists(index_path):
+        with open(index_path) as f:
+            index = json.load(f)
+        if region not in index:
+            return pd.read_parquet(parquet_path).head(0)
+        df = pq.ParquetFile(parquet_path).read_row_group(index[region]["row_group"]).to_pandas()
+        return df.drop(columns="source_order", errors="ignore")
+
+    df = pd.read_parquet(parquet_path)
+    if "source_order" in df.columns:
+        # The file is grouped by region; callers expect the most populous cities first
+        df = df.sort_values("source_order", kind="stable").drop(columns="source_order").reset_index(drop=True)
+    if region is not None:
+        df = df[df["Region"] == region]
+    return df
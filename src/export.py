@@ -0,0 +1,217 @@
+# src/export.py (Result Export)
+import contextlib
+import io
+import operator
+import os
+import re
+import threading
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import streamlit as st
+
+EXPORT_DIR = "renewable_energies/exports"
+CHUNK_ROWS = 100_000
+
+# Larger exports are written to EXPORT_DIR instead of being sent through the browser
+INLINE_MAX_CELLS = 2_000_000
+
+FILTER_OPS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+}
+
+FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "Parquet": ("parquet", "application/octet-stream"),
+}
+
+
+def iter_chunks(data, chunk_rows=CHUNK_ROWS):
+    """Row chunks of a DataFrame (as views), or pass an iterable of chunks through"""
+
+    if hasattr(data, "iloc"):
+        # An empty frame still yields one (empty) chunk, which carries the columns
+        for start in range(0, max(len(data), 1), chunk_rows):
+            yield data.iloc[start:start + chunk_rows]
+    else:
+        yield from data
+
+
+def select(chunks, columns=None, filters=None):
+    """
+    Apply filters and column selection to each chunk before it is serialised.
+
+    Args:
+        filters: list of (column, op, value) with op one of FILTER_OPS,
+                 e.g. [("ROI (%)", ">=", 10)]
+
+    Empty chunks are skipped, but when nothing matches one empty chunk is
+    still yielded so the output gets its CSV header or Parquet schema.
+    """
+
+    empty = None
+    matched = False
+    for chunk in chunks:
+        if filters:
+            mask = None
+            for column, op, value in filters:
+                condition = FILTER_OPS[op](chunk[column], value)
+                mask = condition if mask is None else mask & condition
+            chunk = chunk[mask]
+        if columns:
+            chunk = chunk[list(columns)]
+        if len(chunk):
+            matched = True
+            yield chunk
+        elif empty is None:
+            empty = chunk
+    if not matched and empty is not None:
+        yield empty
+
+
+def write_csv(chunks, sink):
+    """Write chunks as CSV to a path or binary file object; returns rows written"""
+
+    rows = 0
+    with _open_sink(sink) as f:
+        header = True
+        for chunk in chunks:
+            f.write(chunk.to_csv(index=False, header=header).encode("utf-8"))
+            header = False
+            rows += len(chunk)
+    return rows
+
+
+def write_parquet(chunks, sink):
+    """Write chunks as Parquet (one row group per chunk); returns rows written"""
+
+    rows = 0
+    writer = None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(sink, table.schema)
+            writer.write_table(table.cast(writer.schema))
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def _open_sink(sink):
+    """Open a path for writing, or use an already open file object as is"""
+
+    if isinstance(sink, (str, os.PathLike)):
+        return open(sink, "wb")
+    return contextlib.nullcontext(sink)
+
+
+def export_bytes(data, fmt="CSV", columns=None, filters=None):
+    """Whole export in memory, for download buttons (small results only)"""
+
+    chunks = select(iter_chunks(data), columns, filters)
+    buffer = io.BytesIO()
+    if fmt == "Parquet":
+        write_parquet(chunks, buffer)
+    else:
+        write_csv(chunks, buffer)
+    return buffer.getvalue()
+
+
+def export_file(data, name, fmt="CSV", columns=None, filters=None, export_dir=EXPORT_DIR):
+    """
+    Stream an export of any size to a server-side file.
+
+    Memory stays at one chunk. The file appears under its final name only
+    once complete.
+
+    Returns:
+        (path, rows written)
+    """
+
+    os.makedirs(export_dir, exist_ok=True)
+    extension = FORMATS[fmt][0]
+    safe_name = re.sub(r"[^A-Za-z0-9_.-]+", "_", name)
+    path = os.path.join(export_dir, f"{safe_name}_{time.strftime('%Y%m%d_%H%M%S')}.{extension}")
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+
+    chunks = select(iter_chunks(data), columns, filters)
+    if fmt == "Parquet":
+        rows = write_parquet(chunks, tmp_path)
+    else:
+        rows = write_csv(chunks, tmp_path)
+
+    if os.path.exists(tmp_path):
+        os.replace(tmp_path, path)
+    else:
+        # No chunks at all (an empty iterable): still produce an (empty) file
+        open(path, "wb").close()
+    return path, rows
+
+
+def render_export(df, name, key):
+    """
+    Export controls (columns, filter, format) and download for a result frame.
+
+    The download is serialised only when asked for ("Prepare"), and kept in
+    the session until the data or the export options change.
+    """
+
+    with st.expander("📥 Export Results"):
+        columns = st.multiselect("Columns", options=list(df.columns), default=list(df.columns), key=f"{key}_columns")
+
+        numeric = [c for c in df.columns if df[c].dtype.kind in "if"]
+        filters = []
+        if numeric:
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                filter_column = st.selectbox("Filter on", options=["(none)"] + numeric, key=f"{key}_filter_column")
+            if filter_column != "(none)":
+                with col2:
+                    minimum = st.number_input("Minimum", value=None, key=f"{key}_filter_min")
+                with col3:
+                    maximum = st.number_input("Maximum", value=None, key=f"{key}_filter_max")
+                if minimum is not None:
+                    filters.append((filter_column, ">=", minimum))
+                if maximum is not None:
+                    filters.append((filter_column, "<=", maximum))
+
+        fmt = st.radio("Format", options=list(FORMATS), horizontal=True, key=f"{key}_format")
+        extension, mime = FORMATS[fmt]
+
+        if not columns:
+            st.warning("Select at least one column")
+            return
+
+        if len(df) * len(columns) <= INLINE_MAX_CELLS:
+            view = (fmt, tuple(columns), tuple(filters), int(pd.util.hash_pandas_object(df).sum()))
+            prepared = st.session_state.get(f"{key}_prepared")
+            if prepared is None or prepared[0] != view:
+                prepared = None
+                if st.button(f"Prepare {fmt} export", key=f"{key}_prepare"):
+                    with st.spinner("Preparing export..."):
+                        prepared = (view, export_bytes(df, fmt, columns, filters))
+                st.session_state[f"{key}_prepared"] = prepared
+            if prepared is not None:
+                st.download_button(
+                    label=f"📥 Download {fmt}",
+                    data=prepared[1],
+                    file_name=f"{name}.{extension}",
+                    mime=mime,
+                    key=f"{key}_download"
+                )
+        else:
+            st.caption(f"{len(df):,} rows is too large to download in the browser; it is written on the server instead.")
+            if st.button(f"Write {fmt} export on server", key=f"{key}_server"):
+                with st.spinner("Writing export..."):
+                    path, rows = export_file(df, name, fmt, columns, filters)
+                st.success(f"Wrote {rows:,} rows to `{os.path.abspath(path)}`")
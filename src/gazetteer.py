@@ -0,0 +1,180 @@
+# src/gazetteer.py (Offline City Gazetteer)
+import bisect
+import re
+import unicodedata
+
+import numpy as np
+
+from src.data_prep import load_city_locations
+from src.memo import dataset_version, get_cache
+
+PARQUET_PATH = "renewable_energies/cleaned_locations_with_region.parquet"
+CSV_PATH = "renewable_energies/cleaned_locations_with_region_new.csv"
+
+STATE_ABBREVIATIONS = {
+    "AL": "Alabama", "AK": "Alaska", "AZ": "Arizona", "AR": "Arkansas", "CA": "California",
+    "CO": "Colorado", "CT": "Connecticut", "DE": "Delaware", "DC": "District of Columbia",
+    "FL": "Florida", "GA": "Georgia", "HI": "Hawaii", "ID": "Idaho", "IL": "Illinois",
+    "IN": "Indiana", "IA": "Iowa", "KS": "Kansas", "KY": "Kentucky", "LA": "Louisiana",
+    "ME": "Maine", "MD": "Maryland", "MA": "Massachusetts", "MI": "Michigan", "MN": "Minnesota",
+    "MS": "Mississippi", "MO": "Missouri", "MT": "Montana", "NE": "Nebraska", "NV": "Nevada",
+    "NH": "New Hampshire", "NJ": "New Jersey", "NM": "New Mexico", "NY": "New York",
+    "NC": "North Carolina", "ND": "North Dakota", "OH": "Ohio", "OK": "Oklahoma", "OR": "Oregon",
+    "PA": "Pennsylvania", "RI": "Rhode Island", "SC": "South Carolina", "SD": "South Dakota",
+    "TN": "Tennessee", "TX": "Texas", "UT": "Utah", "VT": "Vermont", "VA": "Virginia",
+    "WA": "Washington", "WV": "West Virginia", "WI": "Wisconsin", "WY": "Wyoming"
+}
+
+# Common spelled-out forms, so "St. Louis" and "Saint Louis" meet
+_ALIASES = {"st": "saint", "ste": "sainte", "ft": "fort", "mt": "mount"}
+
+gazetteer_cache = get_cache("gazetteer", maxsize=2)
+
+
+def normalize(text):
+    """Lower-case, accent-free, punctuation-free form used for every key"""
+
+    text = unicodedata.normalize("NFKD", str(text)).encode("ascii", "ignore").decode("ascii").lower()
+    words = re.sub(r"[^a-z0-9]+", " ", text).split()
+    return " ".join(_ALIASES.get(w, w) for w in words)
+
+
+def normalize_state(state):
+    """Normalized full state name for a name or two-letter code ('' for none)"""
+
+    if not state:
+        return ""
+    full = STATE_ABBREVIATIONS.get(str(state).strip().upper())
+    return normalize(full or state)
+
+
+def trigrams(key):
+    """Padded character trigrams of a normalized key"""
+
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class Gazetteer:
+    """
+    In-memory forward geocoder over the cleaned US cities.
+
+    Entries keep the source order (uscities is sorted by population), which
+    is used as the rank when several places match.
+
+    Three indexes share the entry arrays:
+      - exact: (city, state) and city keys -> entry ids
+      - prefix: normalized city names sorted, searched by bisection; a
+        prefix maps to one contiguous slice, like a subtree of a trie
+      - fuzzy: trigram -> entry ids, scored by trigram overlap (Dice)
+    """
+
+    def __init__(self, cities_df):
+        self.city = cities_df["city"].astype(str).to_numpy()
+        self.state = cities_df["state_name"].astype(str).to_numpy()
+        self.lat = cities_df["lat"].to_numpy(dtype=np.float64)
+        self.lon = cities_df["lng"].to_numpy(dtype=np.float64)
+        self.keys = [normalize(c) for c in self.city]
+        self.state_keys = np.array([normalize(s) for s in self.state])
+
+        self.exact = {}
+        for i, (key, state) in enumerate(zip(self.keys, self.state_keys)):
+            self.exact.setdefault((key, state), i)
+            self.exact.setdefault((key, ""), i)
+
+        order = sorted(range(len(self.keys)), key=lambda i: (self.keys[i], i))
+        self.sorted_keys = [self.keys[i] for i in order]
+        self.sorted_ids = np.array(order, dtype=np.int64)
+
+        postings = {}
+        for i, key in enumerate(self.keys):
+            for gram in trigrams(key):
+                postings.setdefault(gram, []).append(i)
+        self.postings = {gram: np.array(ids, dtype=np.int64) for gram, ids in postings.items()}
+        self.gram_counts = np.array([len(trigrams(key)) for key in self.keys], dtype=np.int64)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _entry(self, i, score=1.0):
+        return {
+            "city": self.city[i],
+            "state": self.state[i],
+            "lat": float(self.lat[i]),
+            "lon": float(self.lon[i]),
+            "score": float(score)
+        }
+
+    def lookup(self, city, state=None):
+        """Exact (normalized) match, most populous first; None when unknown"""
+
+        i = self.exact.get((normalize(city), normalize_state(state)))
+        return None if i is None else self._entry(i)
+
+    def suggest(self, prefix, state=None, limit=10):
+        """Autocomplete: places whose city name starts with prefix, by rank"""
+
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        lo = bisect.bisect_left(self.sorted_keys, prefix)
+        hi = bisect.bisect_left(self.sorted_keys, prefix + "\x7f", lo)
+        ids = self.sorted_ids[lo:hi]
+
+        state_key = normalize_state(state)
+        if state_key:
+            ids = ids[self.state_keys[ids] == state_key]
+        if len(ids) > limit:
+            ids = np.partition(ids, limit - 1)[:limit]
+        return [self._entry(i) for i in np.sort(ids)]
+
+    def fuzzy(self, query, state=None, limit=5, min_score=0.4):
+        """Typo-tolerant matches by trigram similarity, best first"""
+
+        key = normalize(query)
+        grams = [g for g in trigrams(key) if g in self.postings]
+        if not grams:
+            return []
+
+        shared = np.bincount(np.concatenate([self.postings[g] for g in grams]), minlength=len(self.keys))
+        ids = np.flatnonzero(shared)
+        state_key = normalize_state(state)
+        if state_key:
+            ids = ids[self.state_keys[ids] == state_key]
+
+        scores = 2.0 * shared[ids] / (len(trigrams(key)) + self.gram_counts[ids])
+        keep = scores >= min_score
+        ids, scores = ids[keep], scores[keep]
+        # Best score first, then rank (source order)
+        order = np.lexsort((ids, -scores))[:limit]
+        return [self._entry(ids[j], scores[j]) for j in order]
+
+    def search(self, query, state=None, limit=5):
+        """
+        Best places for free text such as 'Austin, TX' or 'san antonoi'.
+
+        Exact matches come first, then prefix completions, then fuzzy ones.
+        """
+
+        if state is None and "," in query:
+            query, state = (part.strip() for part in query.rsplit(",", 1))
+
+        results = []
+        exact = self.lookup(query, state)
+        if exact:
+            results.append(exact)
+        for entry in self.suggest(query, state, limit) + self.fuzzy(query, state, limit):
+            if len(results) >= limit:
+                break
+            if not any(r["city"] == entry["city"] and r["state"] == entry["state"] for r in results):
+                results.append(entry)
+        return results
+
+
+def get_gazetteer(parquet_path=PARQUET_PATH, csv_path=CSV_PATH):
+    """Process-wide gazetteer, rebuilt when the cities dataset changes"""
+
+    key = (dataset_version(parquet_path), dataset_version(csv_path))
+    return gazetteer_cache.get_or_compute(
+        key, lambda: Gazetteer(load_city_locations(parquet_path=parquet_path, csv_path=csv_path))
+    )
@@ -0,0 +1,182 @@
+# src/grid_store.py (Candidate Grid Storage)
+import argparse
+import json
+import os
+import struct
+
+import numpy as np
+import pandas as pd
+
+from src.memo import dataset_version, get_cache
+
+GRID_MAGIC = b"RWGRID01"
+GRID_EXTENSION = ".grid"
+ALIGNMENT = 64
+
+# Mapped grids per process, keyed by file version
+grid_cache = get_cache("candidate_grids", maxsize=16)
+
+# File layout:
+#   8 bytes   magic
+#   4 bytes   header length (little-endian uint32)
+#   header    UTF-8 JSON: columns, rows, bounds, resolution, source
+#   padding   to a 64-byte boundary
+#   data      float32, one contiguous block per column (shape columns x rows)
+
+
+def grid_path_for(csv_path):
+    """Binary grid file that sits next to a CSV"""
+
+    return os.path.splitext(csv_path)[0] + GRID_EXTENSION
+
+
+def _resolution(values):
+    """Grid spacing: smallest gap between distinct values (None for a single value)"""
+
+    distinct = np.unique(values)
+    if len(distinct) < 2:
+        return None
+    return float(np.diff(distinct).min())
+
+
+def write_grid(df, path, source=None):
+    """
+    Write a numeric candidate table as a memory-mappable float32 grid.
+
+    Args:
+        df: DataFrame with lat, lon and other numeric columns
+        source: optional path of the file the grid was built from; its
+                version is stored so stale grids can be detected
+    """
+
+    columns = list(df.columns)
+    data = np.ascontiguousarray(df.to_numpy(dtype=np.float32).T)
+
+    header = {
+        "columns": columns,
+        "rows": int(len(df)),
+        "dtype": "float32",
+        "bounds": {
+            "lat_min": float(df["lat"].min()),
+            "lat_max": float(df["lat"].max()),
+            "lon_min": float(df["lon"].min()),
+            "lon_max": float(df["lon"].max())
+        } if len(df) else None,
+        "resolution": {
+            "lat": _resolution(df["lat"].to_numpy()),
+            "lon": _resolution(df["lon"].to_numpy())
+        },
+        "source": os.path.basename(source) if source else None,
+        "source_version": dataset_version(source) if source else None
+    }
+    header_bytes = json.dumps(header).encode("utf-8")
+    offset = len(GRID_MAGIC) + 4 + len(header_bytes)
+    padding = (-offset) % ALIGNMENT
+
+    # Write to a temp file and rename so readers never map a partial grid
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(GRID_MAGIC)
+        f.write(struct.pack("<I", len(header_bytes)))
+        f.write(header_bytes)
+        f.write(b"\0" * padding)
+        f.write(data.tobytes())
+    os.replace(tmp_path, path)
+
+    return header
+
+
+def read_header(path):
+    """
+    Header of a grid file.
+
+    Returns:
+        (header dict, byte offset of the data)
+    """
+
+    with open(path, "rb") as f:
+        if f.read(len(GRID_MAGIC)) != GRID_MAGIC:
+            raise ValueError(f"{path} is not a candidate grid file")
+        (length,) = struct.unpack("<I", f.read(4))
+        header = json.loads(f.read(length).decode("utf-8"))
+
+    offset = len(GRID_MAGIC) + 4 + length
+    return header, offset + (-offset) % ALIGNMENT
+
+
+def load_grid(path):
+    """
+    Memory-map a grid file as a read-only DataFrame.
+
+    No data is parsed or copied: the frame is a view of the mapped file, so
+    server processes loading the same grid share its pages.
+    """
+
+    header, offset = read_header(path)
+    shape = (len(header["columns"]), header["rows"])
+    if header["rows"] == 0:
+        return pd.DataFrame(columns=header["columns"], dtype=np.float32)
+
+    data = np.memmap(path, dtype=np.float32, mode="r", offset=offset, shape=shape)
+    return pd.DataFrame(data.T, columns=header["columns"], copy=False)
+
+
+def convert_csv(csv_path, grid_path=None):
+    """Build the binary grid for a candidate CSV; returns the grid path"""
+
+    grid_path = grid_path or grid_path_for(csv_path)
+    df = pd.read_csv(csv_path, engine="pyarrow")
+    write_grid(df, grid_path, source=csv_path)
+    return grid_path
+
+
+def load_candidate_grid(csv_path):
+    """
+    Candidate table for a CSV, served from its binary grid.
+
+    The grid is (re)built when missing or older than the CSV; if it cannot
+    be written the CSV is parsed directly. Each grid version is mapped once
+    per process.
+    """
+
+    grid_path = grid_path_for(csv_path)
+    csv_version = dataset_version(csv_path)
+
+    if os.path.exists(grid_path):
+        header, _ = read_header(grid_path)
+        fresh = csv_version is None or header.get("source_version") == csv_version
+    else:
+        fresh = False
+
+    if not fresh:
+        try:
+            convert_csv(csv_path, grid_path)
+        except OSError:
+            # Still parsed once per CSV version, not once per session
+            return grid_cache.get_or_compute((csv_path, csv_version), lambda: pd.read_csv(csv_path))
+
+    return grid_cache.get_or_compute((grid_path, dataset_version(grid_path)), lambda: load_grid(grid_path))
+
+
+def grid_bounds(csv_path):
+    """Bounds recorded in a candidate grid's header (None if unavailable)"""
+
+    grid_path = grid_path_for(csv_path)
+    if not os.path.exists(grid_path):
+        return None
+    return read_header(grid_path)[0]["bounds"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert candidate CSVs to memory-mappable grid files")
+    parser.add_argument("csv", nargs="+", help="Candidate CSV files")
+    args = parser.parse_args()
+
+    for csv_path in args.csv:
+        grid_path = convert_csv(csv_path)
+        print(f"{csv_path} ({os.path.getsize(csv_path):,} bytes) -> "
+              f"{grid_path} ({os.path.getsize(grid_path):,} bytes)")
+
+
+if __name__ == "__main__":
+    main()
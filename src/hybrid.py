@@ -0,0 +1,224 @@
+# src/hybrid.py (Hybrid Solar+Wind Co-location)
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.grid_store import load_candidate_grid
+from src.jobs import JOBS_DIR, list_jobs
+from src.memo import dataset_version, get_cache
+from src.services import lazy_import
+from src.solar_production import (PANEL_AREA, PANEL_EFFICIENCY, TMY_DIR, read_tmy_file, simulate_pv, site_id,
+                                   tmy_path)
+from src.wind_production import apply_power_curve, site_production
+
+EARTH_RADIUS_KM = 6371.0
+HOURS_PER_YEAR = 8760
+WIND_CANDIDATES_PATH = "renewable_energies/wind/all_candidate_locations.csv"
+IRRADIANCE_COLUMN = "Solar Irradiance (kWh/m²/day)"
+
+hybrid_cache = get_cache("hybrid_sites", maxsize=8)
+
+
+def unit_vectors(lat, lon):
+    """Points on the unit sphere, so KD-tree (chord) distances follow great circles"""
+
+    lat = np.radians(np.asarray(lat, dtype=np.float64))
+    lon = np.radians(np.asarray(lon, dtype=np.float64))
+    return np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+
+def _chord(distance_km):
+    return 2.0 * np.sin(np.asarray(distance_km, dtype=np.float64) / (2.0 * EARTH_RADIUS_KM))
+
+
+def _arc_km(chord):
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.clip(np.asarray(chord) / 2.0, 0.0, 1.0))
+
+
+def spatial_join(points, targets, max_distance_km=50.0, how="nearest", value_cols=None):
+    """
+    Attach target values to each point by location.
+
+    Args:
+        points, targets: DataFrames with lat and lon columns
+        how: "nearest" takes the closest target within max_distance_km;
+             "radius" averages every target within it (numeric columns only)
+        value_cols: target columns to carry over (default: all but lat/lon)
+
+    Points with no target in range are dropped.
+
+    Returns:
+        points with the value columns, distance_km (to the nearest target)
+        and, for "radius", match_count
+    """
+
+    if value_cols is None:
+        value_cols = [c for c in targets.columns if c not in ("lat", "lon")]
+    if len(points) == 0 or len(targets) == 0:
+        return points.iloc[0:0].assign(**{c: [] for c in value_cols}, distance_km=[])
+
+    tree = lazy_import("scipy.spatial").cKDTree(unit_vectors(targets["lat"], targets["lon"]))
+    xyz = unit_vectors(points["lat"], points["lon"])
+    radius = float(_chord(max_distance_km))
+
+    chord, nearest = tree.query(xyz, k=1, distance_upper_bound=radius, workers=-1)
+    matched = np.isfinite(chord)
+
+    joined = points[matched].copy()
+    joined["distance_km"] = _arc_km(chord[matched])
+
+    if how == "nearest":
+        for col in value_cols:
+            joined[col] = targets[col].to_numpy()[nearest[matched]]
+        return joined
+
+    if how != "radius":
+        raise ValueError(f"Unknown join: {how}")
+
+    # Flatten the per-point neighbour lists, then average with bincount
+    neighbours = tree.query_ball_point(xyz[matched], r=radius, workers=-1)
+    counts = np.fromiter((len(n) for n in neighbours), dtype=np.int64, count=len(neighbours))
+    owner = np.repeat(np.arange(len(neighbours)), counts)
+    flat = np.fromiter((i for n in neighbours for i in n), dtype=np.int64, count=counts.sum())
+    for col in value_cols:
+        sums = np.bincount(owner, weights=targets[col].to_numpy(dtype=np.float64)[flat], minlength=len(neighbours))
+        joined[col] = sums / counts
+    joined["match_count"] = counts
+
+    return joined
+
+
+def load_irradiance_points(jobs_dir=JOBS_DIR):
+    """
+    Annual GHI at every city the Solar page has analysed.
+
+    Collected from the saved Solar analysis jobs, one row per location.
+    """
+
+    rows = []
+    for job in list_jobs("solar", jobs_dir):
+        rows.extend(job["results"])
+
+    if not rows:
+        return pd.DataFrame(columns=["lat", "lon", "irradiance", "city", "state"])
+
+    df = pd.DataFrame(rows).rename(columns={
+        "Latitude": "lat",
+        "Longitude": "lon",
+        IRRADIANCE_COLUMN: "irradiance",
+        "City": "city",
+        "State": "state"
+    })
+    df = df.dropna(subset=["lat", "lon", "irradiance"])
+    return df.drop_duplicates(subset=["lat", "lon"], keep="last").reset_index(drop=True)[
+        ["lat", "lon", "irradiance", "city", "state"]
+    ]
+
+
+def hourly_solar_output(sites, tmy_dir=TMY_DIR):
+    """
+    Hourly PV output per panel at each site, from the TMY file of its matched city.
+
+    Returns:
+        (n, 8760) float32 array in kW; rows of sites without a local TMY
+        file are NaN
+    """
+
+    ids = [site_id(city, state) for city, state in zip(sites["city"], sites["state"])]
+    available = sorted({s for s in ids if os.path.exists(tmy_path(s, tmy_dir))})
+    output = np.full((len(sites), HOURS_PER_YEAR), np.nan, dtype=np.float32)
+    if not available:
+        return output
+
+    # Sites near the same city share its weather: simulate each city once
+    weather = np.stack([np.stack(read_tmy_file(tmy_path(s, tmy_dir)), axis=-1) for s in available])
+    simulated = simulate_pv(weather, hourly=True)
+    row = {s: i for i, s in enumerate(available)}
+    matched = np.array([s in row for s in ids])
+    output[matched] = simulated[[row[s] for s in ids if s in row]]
+    return output
+
+
+def complementarity(solar_output, wind_output):
+    """
+    How well solar and wind output offset each other at each site.
+
+    (1 - r) / 2 where r is the correlation of a site's hourly solar and
+    wind output over the same year: 0 when they rise and fall together,
+    1 when opposite. NaN where either series is missing or flat.
+    """
+
+    solar = np.asarray(solar_output, dtype=np.float64)
+    wind = np.asarray(wind_output, dtype=np.float64)
+    solar = solar - solar.mean(axis=1, keepdims=True)
+    wind = wind - wind.mean(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        r = (solar * wind).sum(axis=1) / (np.linalg.norm(solar, axis=1) * np.linalg.norm(wind, axis=1))
+    return (1.0 - r) / 2.0
+
+
+def hybrid_production(sites, num_turbines=1, solar_capacity_mw=3.0, hourly_speeds=None, tmy_dir=TMY_DIR):
+    """
+    Combined annual output of a solar+wind plant at co-located sites.
+
+    Args:
+        sites: output of spatial_join with mean_wind_speed and irradiance
+        num_turbines: wind turbines per site
+        solar_capacity_mw: peak solar capacity per site (1 kW/m² rating)
+        hourly_speeds: optional (n_sites, 8760) hub-height wind speeds, in
+                       the same order as sites and the same year as the
+                       TMY files
+
+    Returns:
+        sites with solar_mwh, wind_mwh and combined_mwh. Complementarity
+        needs both hourly series, so it is added only when hourly_speeds
+        is given (NaN where the matched city has no TMY file).
+    """
+
+    num_panels = solar_capacity_mw * 1000.0 / (PANEL_AREA * PANEL_EFFICIENCY)
+
+    result = sites.copy()
+    result["solar_mwh"] = result["irradiance"].to_numpy() * PANEL_AREA * PANEL_EFFICIENCY * 365 * num_panels / 1000.0
+    wind = site_production(result, hourly_speeds=hourly_speeds)
+    result["wind_mwh"] = wind["annual_energy_mwh"].to_numpy() * num_turbines
+    result["combined_mwh"] = result["solar_mwh"] + result["wind_mwh"]
+    if hourly_speeds is not None:
+        result["complementarity"] = complementarity(hourly_solar_output(result, tmy_dir),
+                                                    apply_power_curve(hourly_speeds))
+
+    return result
+
+
+def hybrid_candidates(wind_path=WIND_CANDIDATES_PATH, jobs_dir=JOBS_DIR, max_distance_km=50.0,
+                      num_turbines=1, solar_capacity_mw=3.0):
+    """
+    Wind candidate sites with measured irradiance nearby, ranked by combined output.
+
+    The wind grid holds annual mean speeds only, so no complementarity is
+    reported (see hybrid_production). Results are cached until the wind
+    grid or the saved Solar analyses change.
+    """
+
+    if not os.path.exists(wind_path):
+        return pd.DataFrame()
+
+    job_files = []
+    if os.path.isdir(jobs_dir):
+        job_files = sorted(f for f in os.listdir(jobs_dir) if f.startswith("solar-"))
+    key = (
+        dataset_version(wind_path),
+        tuple((f, dataset_version(os.path.join(jobs_dir, f))) for f in job_files),
+        max_distance_km, num_turbines, solar_capacity_mw
+    )
+
+    def compute():
+        wind_sites = load_candidate_grid(wind_path)
+        joined = spatial_join(wind_sites, load_irradiance_points(jobs_dir), max_distance_km,
+                              value_cols=["irradiance", "city", "state"])
+        if len(joined) == 0:
+            return joined
+        result = hybrid_production(joined, num_turbines, solar_capacity_mw)
+        return result.sort_values("combined_mwh", ascending=False).reset_index(drop=True)
+
+    return hybrid_cache.get_or_compute(key, compute)
@@ -0,0 +1,584 @@
+# src/hydro.py (Hydroelectric Site Screening)
+import argparse
+import os
+import struct
+
+import numpy as np
+import pandas as pd
+
+from src.memo import dataset_version, get_cache
+
+HYDRO_DIR = "renewable_energies/hydroelectric"
+FLOWLINES_PATH = os.path.join(HYDRO_DIR, "NHDFlowline.shp")
+CANDIDATES_PATH = os.path.join(HYDRO_DIR, "hydro_candidates.csv")
+
+# Demo data lives apart from the real NHD download (and is not committed)
+SYNTHETIC_DIR = os.path.join(HYDRO_DIR, "synthetic")
+SYNTHETIC_FLOWLINES_PATH = os.path.join(SYNTHETIC_DIR, "SyntheticFlowline.shp")
+SYNTHETIC_CANDIDATES_PATH = os.path.join(SYNTHETIC_DIR, "synthetic_hydro_candidates.csv")
+
+WATER_DENSITY = 1000.0          # kg/m³
+GRAVITY = 9.81                  # m/s²
+TURBINE_EFFICIENCY = 0.85
+CAPACITY_FACTOR = 0.5           # typical run-of-river
+CFS_TO_CMS = 0.0283168
+HOURS_PER_YEAR = 8760
+
+# NHDPlus attribute names, first match wins
+ID_FIELDS = ("COMID", "ComID", "REACH_ID")
+NAME_FIELDS = ("GNIS_NAME", "NAME")
+FLOW_FIELDS = ("QE_MA", "Q0001E", "QA_MA", "Q0001A", "FLOW_CFS")    # mean annual flow, cfs
+MAX_ELEV_FIELDS = ("MAXELEVSMO", "MAXELEVRAW")                     # cm
+MIN_ELEV_FIELDS = ("MINELEVSMO", "MINELEVRAW")                     # cm
+
+# NHDPlusV2 keeps flow and elevations out of NHDFlowline.dbf: mean annual
+# flow is in EROMExtension/EROM_MA0001.DBF and the smoothed elevations in
+# NHDPlusAttributes/elevslope.dbf, both keyed by COMID. Copies of these
+# tables next to the shapefile are joined to the flowlines by COMID.
+ATTRIBUTE_TABLES = ("elevslope.dbf", "EROM_MA0001.dbf")
+
+POLYLINE_TYPES = (3, 13, 23)    # PolyLine, PolyLineZ, PolyLineM
+INDEX_NODE_SIZE = 256
+
+hydro_cache = get_cache("hydro_candidates", maxsize=4)
+table_cache = get_cache("nhdplus_tables", maxsize=4)
+
+
+# ---------- Shapefile access ----------
+
+def _record_offsets(shp_path):
+    """Byte offset and content length of every record, from the .shx index"""
+
+    shx = np.fromfile(os.path.splitext(shp_path)[0] + ".shx", dtype=">i4", offset=100).reshape(-1, 2)
+    return shx[:, 0].astype(np.int64) * 2, shx[:, 1].astype(np.int64) * 2
+
+
+def _gather(buffer, starts, width, dtype):
+    """Fixed-width values at many byte offsets of a mapped file, in one fancy-index"""
+
+    raw = np.ascontiguousarray(buffer[np.asarray(starts, dtype=np.int64)[:, None] + np.arange(width)])
+    return raw.view(dtype)
+
+
+def read_bboxes(shp_path, chunk_size=65536):
+    """
+    Bounding box (xmin, ymin, xmax, ymax) of every record, without parsing geometry.
+
+    Reads only the 36 bytes after each record header, in chunks of
+    records. Null shapes get NaN boxes.
+    """
+
+    offsets, _ = _record_offsets(shp_path)
+    shp = np.memmap(shp_path, dtype=np.uint8, mode="r")
+    bboxes = np.full((len(offsets), 4), np.nan)
+
+    for start in range(0, len(offsets), chunk_size):
+        content = offsets[start:start + chunk_size] + 8
+        shape_type = _gather(shp, content, 4, "<i4")[:, 0]
+        boxes = _gather(shp, content + 4, 32, "<f8")
+        valid = np.isin(shape_type, POLYLINE_TYPES)
+        bboxes[start:start + chunk_size][valid] = boxes[valid]
+
+    return bboxes
+
+
+def build_spatial_index(shp_path, node_size=INDEX_NODE_SIZE):
+    """
+    Packed (sort-tile-recursive) index over the record bounding boxes.
+
+    Records are tiled into vertical slices by x, sorted by y inside each
+    slice and grouped into nodes of node_size; each node keeps the box
+    that covers its records. Saved next to the shapefile.
+    """
+
+    bboxes = read_bboxes(shp_path)
+    valid = np.flatnonzero(~np.isnan(bboxes[:, 0]))
+    centers = (bboxes[valid, :2] + bboxes[valid, 2:]) / 2
+
+    n_nodes = max(1, int(np.ceil(len(valid) / node_size)))
+    n_slices = max(1, int(np.ceil(np.sqrt(n_nodes))))
+    slice_size = n_slices * node_size
+
+    by_x = np.argsort(centers[:, 0], kind="stable")
+    order = np.concatenate([
+        by_x[s:s + slice_size][np.argsort(centers[by_x[s:s + slice_size], 1], kind="stable")]
+        for s in range(0, len(by_x), slice_size)
+    ]) if len(by_x) else by_x
+    records = valid[order]
+
+    starts = np.arange(0, len(records), node_size)
+    node_boxes = np.empty((len(starts), 4))
+    if len(records):
+        node_boxes[:, 0] = np.minimum.reduceat(bboxes[records, 0], starts)
+        node_boxes[:, 1] = np.minimum.reduceat(bboxes[records, 1], starts)
+        node_boxes[:, 2] = np.maximum.reduceat(bboxes[records, 2], starts)
+        node_boxes[:, 3] = np.maximum.reduceat(bboxes[records, 3], starts)
+
+    index = {
+        "records": records,
+        "bboxes": bboxes,
+        "node_starts": starts,
+        "node_boxes": node_boxes,
+        "version": np.array(dataset_version(shp_path) or "")
+    }
+    np.savez(_index_path(shp_path), **index)
+    return index
+
+
+def _index_path(shp_path):
+    return os.path.splitext(shp_path)[0] + ".sidx.npz"
+
+
+def load_spatial_index(shp_path):
+    """The saved spatial index, rebuilt when missing or older than the shapefile"""
+
+    path = _index_path(shp_path)
+    if os.path.exists(path):
+        with np.load(path) as saved:
+            if str(saved["version"]) == (dataset_version(shp_path) or ""):
+                return {key: saved[key] for key in saved.files}
+    return build_spatial_index(shp_path)
+
+
+def query_bbox(index, bbox):
+    """Record numbers whose box intersects bbox = (xmin, ymin, xmax, ymax), in file order"""
+
+    xmin, ymin, xmax, ymax = bbox
+    nodes = index["node_boxes"]
+    hit_nodes = np.flatnonzero(
+        (nodes[:, 0] <= xmax) & (nodes[:, 2] >= xmin) & (nodes[:, 1] <= ymax) & (nodes[:, 3] >= ymin)
+    )
+    if len(hit_nodes) == 0:
+        return np.empty(0, dtype=np.int64)
+
+    ends = np.append(index["node_starts"][1:], len(index["records"]))
+    candidates = np.concatenate([index["records"][index["node_starts"][n]:ends[n]] for n in hit_nodes])
+    boxes = index["bboxes"][candidates]
+    inside = (boxes[:, 0] <= xmax) & (boxes[:, 2] >= xmin) & (boxes[:, 1] <= ymax) & (boxes[:, 3] >= ymin)
+    return np.sort(candidates[inside])
+
+
+def read_dbf_header(dbf_path):
+    """(number of records, header length, record length, fields) of a dBASE file"""
+
+    with open(dbf_path, "rb") as f:
+        head = f.read(32)
+        n_records, header_length, record_length = struct.unpack("<IHH", head[4:12])
+        fields = []
+        position = 1  # deletion flag
+        while True:
+            descriptor = f.read(32)
+            if not descriptor or descriptor[0] == 0x0D:
+                break
+            name = descriptor[:11].split(b"\0")[0].decode("ascii")
+            kind = chr(descriptor[11])
+            length = descriptor[16]
+            fields.append({"name": name, "type": kind, "offset": position, "length": length})
+            position += length
+
+    return n_records, header_length, record_length, fields
+
+
+def read_dbf_deleted(dbf_path):
+    """True for every record flagged deleted ('*' in its first byte)"""
+
+    n_records, header_length, record_length, _ = read_dbf_header(dbf_path)
+    flags = np.memmap(dbf_path, dtype=np.uint8, mode="r", offset=header_length, shape=(n_records, record_length))
+    return np.asarray(flags[:, 0]) == ord("*")
+
+
+def read_dbf_rows(dbf_path, rows, columns=None):
+    """
+    Attribute values for the given record numbers only.
+
+    The record area is memory-mapped and only the selected fixed-width
+    rows are decoded; numeric fields come back as floats.
+    """
+
+    n_records, header_length, record_length, fields = read_dbf_header(dbf_path)
+    table = np.memmap(dbf_path, dtype=f"S{record_length}", mode="r", offset=header_length, shape=(n_records,))
+    raw = np.frombuffer(table[np.asarray(rows, dtype=np.int64)].tobytes(), dtype=np.uint8).reshape(-1, record_length)
+
+    out = {}
+    for field in fields:
+        if columns is not None and field["name"] not in columns:
+            continue
+        cells = np.ascontiguousarray(raw[:, field["offset"]:field["offset"] + field["length"]]).view(f"S{field['length']}")[:, 0]
+        if field["type"] in "NF":
+            values = pd.to_numeric(pd.Series(np.char.strip(cells).astype(str)), errors="coerce").to_numpy()
+        else:
+            values = np.char.strip(np.char.decode(cells, "latin-1"))
+        out[field["name"]] = values
+
+    return pd.DataFrame(out)
+
+
+def read_dbf_table(dbf_path):
+    """Every live (not deleted) record of a dBASE table, with upper-case column names"""
+
+    def compute():
+        rows = np.flatnonzero(~read_dbf_deleted(dbf_path))
+        table = read_dbf_rows(dbf_path, rows)
+        return table.rename(columns=str.upper)
+
+    return table_cache.get_or_compute((dbf_path, dataset_version(dbf_path)), compute)
+
+
+def find_attribute_tables(shp_path):
+    """NHDPlus attribute tables (see ATTRIBUTE_TABLES) next to a flowline shapefile"""
+
+    folder = os.path.dirname(shp_path) or "."
+    present = {name.lower(): name for name in os.listdir(folder)} if os.path.isdir(folder) else {}
+    return [os.path.join(folder, present[name.lower()]) for name in ATTRIBUTE_TABLES if name.lower() in present]
+
+
+def join_attribute_tables(attrs, tables):
+    """
+    Add the columns of COMID-keyed tables to flowline attributes.
+
+    Values already on the flowlines win; the tables only fill what is
+    missing. Flowlines without a COMID are left as they are.
+    """
+
+    reach_id = _first_field(attrs, ID_FIELDS)
+    if reach_id is None or not tables:
+        return attrs
+
+    ids = pd.to_numeric(reach_id, errors="coerce").to_numpy()
+    for path in tables:
+        table = read_dbf_table(path)
+        if "COMID" not in table.columns:
+            raise ValueError(f"{path} has no COMID column to join on")
+        table = table.drop_duplicates("COMID").set_index("COMID").reindex(ids)
+        for column in table.columns:
+            values = table[column].to_numpy()
+            attrs[column] = attrs[column].where(attrs[column].notna(), values) if column in attrs else values
+    return attrs
+
+
+def read_polylines(shp_path, rows):
+    """
+    Geometry summary of selected polyline records, without a per-record loop.
+
+    Returns:
+        dict of arrays: mid_lon, mid_lat, length_km, z_drop (NaN without Z)
+    """
+
+    offsets, _ = _record_offsets(shp_path)
+    shp = np.memmap(shp_path, dtype=np.uint8, mode="r")
+    content = offsets[np.asarray(rows, dtype=np.int64)] + 8
+
+    n = len(content)
+    mid_lon = np.full(n, np.nan)
+    mid_lat = np.full(n, np.nan)
+    length_km = np.zeros(n)
+    z_drop = np.full(n, np.nan)
+    if n == 0:
+        return {"mid_lon": mid_lon, "mid_lat": mid_lat, "length_km": length_km, "z_drop": z_drop}
+
+    shape_type = _gather(shp, content, 4, "<i4")[:, 0]
+    valid = np.flatnonzero(np.isin(shape_type, POLYLINE_TYPES))
+    counts = _gather(shp, content[valid] + 36, 8, "<i4")
+    num_parts, num_points = counts[:, 0].astype(np.int64), counts[:, 1].astype(np.int64)
+    points_at = content[valid] + 44 + 4 * num_parts
+
+    middle = _gather(shp, points_at + 16 * (num_points // 2), 16, "<f8")
+    mid_lon[valid], mid_lat[valid] = middle[:, 0], middle[:, 1]
+
+    # Every point of the chunk in one gather; segments that cross a record
+    # or part boundary are dropped before summing
+    owner = np.repeat(np.arange(len(valid)), num_points)
+    first_point = np.cumsum(num_points) - num_points
+    first = np.repeat(first_point, num_points)
+    point_starts = np.repeat(points_at, num_points) + 16 * (np.arange(len(owner)) - first)
+    points = np.radians(_gather(shp, point_starts, 16, "<f8"))
+    lon, lat = points[:, 0], points[:, 1]
+    dlat, dlon = np.diff(lat), np.diff(lon)
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat[:-1]) * np.cos(lat[1:]) * np.sin(dlon / 2) ** 2
+    segments = 2 * 6371.0 * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+    # Part start indices follow each record's counts; the first point of
+    # every part other than the first does not join the point before it
+    part_first = np.repeat(np.cumsum(num_parts) - num_parts, num_parts)
+    part_starts = np.repeat(content[valid] + 44, num_parts) + 4 * (np.arange(num_parts.sum()) - part_first)
+    part_offsets = _gather(shp, part_starts, 4, "<i4")[:, 0].astype(np.int64)
+    part_break = np.zeros(len(owner), dtype=bool)
+    part_break[np.repeat(first_point, num_parts) + np.clip(part_offsets, 0, None)] = True
+    same = (owner[1:] == owner[:-1]) & ~part_break[1:]
+    length_km[valid] = np.bincount(owner[1:][same], weights=segments[same], minlength=len(valid))
+
+    # PolyLineZ records carry their Z range right after the points
+    has_z = shape_type[valid] == 13
+    if has_z.any():
+        z_range = _gather(shp, points_at[has_z] + 16 * num_points[has_z], 16, "<f8")
+        z_drop[valid[has_z]] = z_range[:, 1] - z_range[:, 0]
+
+    return {"mid_lon": mid_lon, "mid_lat": mid_lat, "length_km": length_km, "z_drop": z_drop}
+
+
+# ---------- Screening ----------
+
+def _first_field(df, names):
+    for name in names:
+        if name in df.columns:
+            return df[name]
+    return None
+
+
+def hydro_power_kw(flow_cms, head_m, efficiency=TURBINE_EFFICIENCY):
+    """P = ρ g Q H η, in kW"""
+
+    return WATER_DENSITY * GRAVITY * np.asarray(flow_cms) * np.asarray(head_m) * efficiency / 1000.0
+
+
+def iter_flowline_chunks(shp_path, bbox=None, chunk_size=50000, tables=None):
+    """
+    Flowline attributes and geometry summaries, chunk by chunk.
+
+    Only records whose box intersects bbox (lon_min, lat_min, lon_max,
+    lat_max) are read, located through the spatial index. Records deleted
+    in the .dbf are skipped. Flow and elevations are joined by COMID from
+    tables (default: the NHDPlus attribute tables next to the shapefile).
+    """
+
+    index = load_spatial_index(shp_path)
+    if bbox is None:
+        rows = np.sort(index["records"])
+    else:
+        rows = query_bbox(index, bbox)
+
+    dbf_path = os.path.splitext(shp_path)[0] + ".dbf"
+    has_dbf = os.path.exists(dbf_path)
+    if has_dbf:
+        rows = rows[~read_dbf_deleted(dbf_path)[rows]]
+    tables = find_attribute_tables(shp_path) if tables is None else tables
+    wanted = set(ID_FIELDS + NAME_FIELDS + FLOW_FIELDS + MAX_ELEV_FIELDS + MIN_ELEV_FIELDS)
+
+    for start in range(0, len(rows), chunk_size):
+        chunk_rows = rows[start:start + chunk_size]
+        attrs = read_dbf_rows(dbf_path, chunk_rows, wanted) if has_dbf else pd.DataFrame(index=range(len(chunk_rows)))
+        attrs = join_attribute_tables(attrs, tables)
+        geometry = read_polylines(shp_path, chunk_rows)
+        for key, values in geometry.items():
+            attrs[key] = values
+        attrs["record"] = chunk_rows
+        yield attrs
+
+
+def screen_reaches(chunk, efficiency=TURBINE_EFFICIENCY, capacity_factor=CAPACITY_FACTOR):
+    """
+    Head x flow power potential for one chunk of flowlines (vectorized).
+
+    Head comes from the smoothed NHDPlus elevations (cm) when present,
+    otherwise from the Z range of the geometry.
+
+    Returns:
+        candidate rows in the wind candidate schema family: lat, lon,
+        power_potential (kW), annual_energy_mwh, head_m, flow_cms,
+        length_km, reach_id, name
+    """
+
+    flow = _first_field(chunk, FLOW_FIELDS)
+    flow_cms = flow.to_numpy(dtype=np.float64) * CFS_TO_CMS if flow is not None else np.full(len(chunk), np.nan)
+
+    max_elev = _first_field(chunk, MAX_ELEV_FIELDS)
+    min_elev = _first_field(chunk, MIN_ELEV_FIELDS)
+    if max_elev is not None and min_elev is not None:
+        head_m = (max_elev.to_numpy(dtype=np.float64) - min_elev.to_numpy(dtype=np.float64)) / 100.0
+        head_m = np.where(np.isnan(head_m), chunk["z_drop"].to_numpy(), head_m)
+    else:
+        head_m = chunk["z_drop"].to_numpy()
+
+    power_kw = hydro_power_kw(flow_cms, np.clip(head_m, 0, None), efficiency)
+    reach_id = _first_field(chunk, ID_FIELDS)
+    name = _first_field(chunk, NAME_FIELDS)
+
+    candidates = pd.DataFrame({
+        "lat": chunk["mid_lat"].to_numpy(),
+        "lon": chunk["mid_lon"].to_numpy(),
+        "power_potential": power_kw,
+        "annual_energy_mwh": power_kw * HOURS_PER_YEAR * capacity_factor / 1000.0,
+        "head_m": head_m,
+        "flow_cms": flow_cms,
+        "length_km": chunk["length_km"].to_numpy(),
+        "reach_id": reach_id.to_numpy() if reach_id is not None else chunk["record"].to_numpy(),
+        "name": name.to_numpy() if name is not None else ""
+    })
+    return candidates[np.isfinite(candidates["power_potential"]) & (candidates["power_potential"] > 0)]
+
+
+def screen_flowlines(shp_path=FLOWLINES_PATH, bbox=None, min_power_kw=100.0, output_path=None, chunk_size=50000,
+                     tables=None):
+    """
+    Hydro candidate table for all reaches in bbox with at least min_power_kw.
+
+    Written to output_path (CSV) when given.
+    """
+
+    parts = [
+        chunk[chunk["power_potential"] >= min_power_kw]
+        for chunk in map(screen_reaches, iter_flowline_chunks(shp_path, bbox, chunk_size, tables))
+    ]
+    candidates = pd.concat(parts, ignore_index=True) if parts else screen_reaches(pd.DataFrame({
+        "mid_lat": [], "mid_lon": [], "length_km": [], "z_drop": [], "record": []
+    }))
+    candidates = candidates.sort_values("power_potential", ascending=False).reset_index(drop=True)
+
+    if output_path:
+        candidates.to_csv(output_path, index=False)
+    return candidates
+
+
+def hydro_candidates(candidates_path=CANDIDATES_PATH, shp_path=FLOWLINES_PATH, screen=True):
+    """
+    Screened hydro sites, ranked by power potential.
+
+    Uses the saved candidate table while it is newer than the flowlines and
+    their attribute tables, re-screening the shapefile otherwise. With
+    screen=False only the saved table is read, however old (a national
+    screening is left to python -m src.hydro). Empty when there is nothing
+    to read.
+    """
+
+    sources = [shp_path] + find_attribute_tables(shp_path)
+    key = (dataset_version(candidates_path), screen) + tuple(dataset_version(path) for path in sources)
+
+    def compute():
+        have_csv = os.path.exists(candidates_path)
+        have_shp = os.path.exists(shp_path)
+        if not screen:
+            return pd.read_csv(candidates_path) if have_csv else pd.DataFrame()
+        newest = max(os.path.getmtime(path) for path in sources) if have_shp else None
+        if have_csv and (not have_shp or os.path.getmtime(candidates_path) >= newest):
+            return pd.read_csv(candidates_path)
+        if have_shp:
+            return screen_flowlines(shp_path, output_path=candidates_path)
+        return pd.DataFrame()
+
+    return hydro_cache.get_or_compute(key, compute)
+
+
+# ---------- Synthetic data ----------
+
+def _write_dbf(dbf_path, fields, rows):
+    """Write a dBASE III table; fields are (name, type, length, decimals) with type N or C"""
+
+    record_length = 1 + sum(f[2] for f in fields)
+    header_length = 32 + 32 * len(fields) + 1
+    with open(dbf_path, "wb") as dbf:
+        dbf.write(struct.pack("<B3BIHH20x", 3, 124, 1, 1, len(rows), header_length, record_length))
+        for name, kind, length, decimals in fields:
+            dbf.write(struct.pack("<11sc4xBB14x", name.encode("ascii"), kind.encode("ascii"), length, decimals))
+        dbf.write(b"\r")
+        for values in rows:
+            row = b" "
+            for (name, kind, length, decimals), value in zip(fields, values):
+                if kind == "N":
+                    text = f"{value:>{length}.{decimals}f}"
+                else:
+                    text = f"{value:<{length}}"
+                row += text.encode("latin-1")[:length]
+            dbf.write(row)
+        dbf.write(b"\x1a")
+
+
+def write_synthetic_flowlines(shp_path, n_reaches=200, bbox=(-106.5, 26.0, -93.5, 36.5), seed=0):
+    """
+    Write a small NHDPlus-like PolyLineZ shapefile and its attribute tables.
+
+    Each reach is a short random walk with falling elevation (a few have
+    two parts). As in NHDPlusV2, the flowline .dbf carries COMID and
+    GNIS_NAME only; elevslope.dbf (MAXELEVSMO/MINELEVSMO, cm) and
+    EROM_MA0001.dbf (Q0001E, cfs) are written next to it, keyed by COMID.
+    """
+
+    rng = np.random.default_rng(seed)
+    xmin, ymin, xmax, ymax = bbox
+
+    geometries, attributes = [], []
+    for i in range(n_reaches):
+        n_points = int(rng.integers(2, 12))
+        start = rng.uniform([xmin, ymin], [xmax, ymax])
+        steps = rng.normal(0, 0.01, (n_points - 1, 2))
+        points = np.vstack([start, start + np.cumsum(steps, axis=0)])
+        top = rng.uniform(50, 2500)
+        z = np.linspace(top, top - rng.uniform(0.5, 60), n_points)
+        parts = [0, n_points // 2] if n_points >= 4 and rng.random() < 0.1 else [0]
+        geometries.append((points, z, parts))
+        attributes.append((
+            1000000 + i,
+            f"Synthetic Creek {i}" if rng.random() < 0.7 else "",
+            float(rng.lognormal(4, 1.5)),
+            int(round(z[0] * 100)),
+            int(round(z[-1] * 100))
+        ))
+
+    records = []
+    for points, z, parts in geometries:
+        box = (points[:, 0].min(), points[:, 1].min(), points[:, 0].max(), points[:, 1].max())
+        n = len(points)
+        content = struct.pack("<i4d2i", 13, *box, len(parts), n) + struct.pack(f"<{len(parts)}i", *parts)
+        content += points.astype("<f8").tobytes()
+        content += struct.pack("<2d", z.min(), z.max()) + z.astype("<f8").tobytes()
+        content += struct.pack("<2d", 0.0, 0.0) + np.zeros(n, dtype="<f8").tobytes()
+        records.append(content)
+
+    all_points = np.vstack([g[0] for g in geometries])
+    all_z = np.concatenate([g[1] for g in geometries])
+    extent = (all_points[:, 0].min(), all_points[:, 1].min(), all_points[:, 0].max(), all_points[:, 1].max())
+
+    def header(file_words):
+        return (struct.pack(">7i", 9994, 0, 0, 0, 0, 0, file_words)
+                + struct.pack("<2i", 1000, 13)
+                + struct.pack("<8d", *extent, all_z.min(), all_z.max(), 0.0, 0.0))
+
+    base = os.path.splitext(shp_path)[0]
+    shp_words = (100 + sum(8 + len(r) for r in records)) // 2
+    with open(base + ".shp", "wb") as shp, open(base + ".shx", "wb") as shx:
+        shp.write(header(shp_words))
+        shx.write(header((100 + 8 * len(records)) // 2))
+        offset = 100
+        for number, content in enumerate(records, 1):
+            shp.write(struct.pack(">2i", number, len(content) // 2) + content)
+            shx.write(struct.pack(">2i", offset // 2, len(content) // 2))
+            offset += 8 + len(content)
+
+    folder = os.path.dirname(base)
+    _write_dbf(base + ".dbf", [("COMID", "N", 10, 0), ("GNIS_NAME", "C", 40, 0)],
+               [(comid, name) for comid, name, _, _, _ in attributes])
+    _write_dbf(os.path.join(folder, ATTRIBUTE_TABLES[0]),
+               [("COMID", "N", 10, 0), ("MAXELEVSMO", "N", 10, 0), ("MINELEVSMO", "N", 10, 0)],
+               [(comid, top, bottom) for comid, _, _, top, bottom in attributes])
+    _write_dbf(os.path.join(folder, ATTRIBUTE_TABLES[1]), [("Comid", "N", 10, 0), ("Q0001E", "N", 14, 3)],
+               [(comid, flow) for comid, _, flow, _, _ in attributes])
+
+    return base + ".shp"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Screen NHD flowlines for hydro sites")
+    parser.add_argument("--shapefile", help=f"NHDFlowline .shp path (default {FLOWLINES_PATH})")
+    parser.add_argument("--bbox", nargs=4, type=float, metavar=("LON_MIN", "LAT_MIN", "LON_MAX", "LAT_MAX"))
+    parser.add_argument("--min-power-kw", type=float, default=100.0)
+    parser.add_argument("--output", help=f"Candidate CSV (default {CANDIDATES_PATH})")
+    parser.add_argument("--synthetic", type=int, metavar="N",
+                        help=f"Screen an N-reach synthetic shapefile written under {SYNTHETIC_DIR} instead")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        args.shapefile = args.shapefile or SYNTHETIC_FLOWLINES_PATH
+        args.output = args.output or SYNTHETIC_CANDIDATES_PATH
+        if os.path.abspath(args.shapefile) == os.path.abspath(FLOWLINES_PATH):
+            parser.error("--synthetic will not overwrite the real flowlines")
+        os.makedirs(os.path.dirname(args.shapefile) or ".", exist_ok=True)
+        write_synthetic_flowlines(args.shapefile, args.synthetic)
+    args.shapefile = args.shapefile or FLOWLINES_PATH
+    args.output = args.output or CANDIDATES_PATH
+
+    candidates = screen_flowlines(args.shapefile, args.bbox, args.min_power_kw, args.output)
+    print(f"{len(candidates)} candidate reaches written to {args.output}")
+    print(candidates.head(10).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+# src/jobs.py (Background Jobs)
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.services import get_env, get_or_create
+
+JOBS_DIR = "renewable_energies/jobs"
+
+# Error recorded when work_fn returns None: the item has no data, retrying will not help
+NO_DATA = "no data"
+
+# Jobs submitted in this process that are still running
+_active = {}
+_lock = threading.RLock()
+
+
+def _executor():
+    return get_or_create(
+        "job_executor",
+        lambda: ThreadPoolExecutor(max_workers=int(get_env("JOB_WORKERS", 4)), thread_name_prefix="job")
+    )
+
+
+def job_id_for(kind, payload):
+    """Deterministic job id, so the same inputs map to the same (reusable) job"""
+
+    digest = hashlib.sha1(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    return f"{kind}-{digest[:16]}"
+
+
+def _job_path(job_id, jobs_dir):
+    return os.path.join(jobs_dir, f"{job_id}.json")
+
+
+def _save(job, jobs_dir):
+    """Write the job state atomically so readers never see a partial file"""
+
+    os.makedirs(jobs_dir, exist_ok=True)
+    path = _job_path(job["id"], jobs_dir)
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(job, f)
+    os.replace(tmp_path, path)
+
+
+def get_job(job_id, jobs_dir=JOBS_DIR):
+    """
+    Current state of a job, or None if it was never submitted.
+
+    A job file left "running" by a process that no longer runs it is
+    reported as "interrupted" so the caller can resume it.
+    """
+
+    path = _job_path(job_id, jobs_dir)
+    if not os.path.exists(path):
+        return None
+
+    with open(path) as f:
+        job = json.load(f)
+
+    with _lock:
+        running_here = job_id in _active
+    if job["status"] in ("pending", "running") and not running_here:
+        job["status"] = "interrupted"
+
+    return job
+
+
+def list_jobs(kind, jobs_dir=JOBS_DIR):
+    """All saved jobs of one kind (e.g. "solar"), in any status"""
+
+    if not os.path.isdir(jobs_dir):
+        return []
+
+    jobs = []
+    for name in sorted(os.listdir(jobs_dir)):
+        if name.startswith(f"{kind}-") and name.endswith(".json"):
+            job = get_job(name[:-len(".json")], jobs_dir)
+            if job is not None:
+                jobs.append(job)
+    return jobs
+
+
+def _run(job, items, work_fn, jobs_dir):
+    done_keys = set(job["done_keys"])
+    job["status"] = "running"
+    _save(job, jobs_dir)
+
+    try:
+        for item in items:
+            if item["key"] in done_keys:
+                continue
+            try:
+                result = work_fn(item)
+                if result is not None:
+                    job["results"].append(result)
+                else:
+                    job["errors"].append({"key": item["key"], "error": NO_DATA})
+            except Exception as e:
+                job["errors"].append({"key": item["key"], "error": str(e)})
+
+            job["done_keys"].append(item["key"])
+            job["completed"] = len(job["done_keys"])
+            job["updated"] = time.time()
+            # Persist after every item so progress survives reruns and restarts
+            _save(job, jobs_dir)
+
+        job["status"] = "done"
+    except Exception as e:
+        job["status"] = "failed"
+        job["errors"].append({"key": None, "error": str(e)})
+    finally:
+        job["updated"] = time.time()
+        _save(job, jobs_dir)
+        with _lock:
+            _active.pop(job["id"], None)
+
+
+def retryable_keys(job):
+    """Keys of items that raised (timeouts, HTTP errors, ...) rather than returning no data"""
+
+    return {e["key"] for e in job["errors"] if e["key"] is not None and e["error"] != NO_DATA}
+
+
+def _reset_failures(job):
+    """Forget the items that raised (and any job-level error) so the next run retries them"""
+
+    failed = retryable_keys(job)
+    job["errors"] = [e for e in job["errors"] if e["key"] is not None and e["key"] not in failed]
+    job["done_keys"] = [key for key in job["done_keys"] if key not in failed]
+    job["completed"] = len(job["done_keys"])
+    return job
+
+
+def submit_job(job_id, items, work_fn, jobs_dir=JOBS_DIR, restart=False):
+    """
+    Run work_fn over items on the worker pool, persisting progress.
+
+    Args:
+        items: list of JSON-serialisable dicts, each with a unique "key"
+        work_fn: item -> result dict (or None when there is no data)
+        restart: discard a finished job's results and errors and run every item again
+
+    Reuses the job if it is already running or finished cleanly. An
+    interrupted or failed job resumes and skips the items it had already
+    processed; so does a finished one, retrying only the items that raised.
+
+    Returns:
+        job_id
+    """
+
+    with _lock:
+        if job_id in _active:
+            return job_id
+
+        existing = None if restart else get_job(job_id, jobs_dir)
+        if existing is not None and existing["status"] == "done" and not retryable_keys(existing):
+            return job_id
+
+        if existing is not None and existing["status"] in ("interrupted", "failed", "done"):
+            job = _reset_failures(existing)
+        else:
+            job = {
+                "id": job_id,
+                "status": "pending",
+                "total": len(items),
+                "completed": 0,
+                "done_keys": [],
+                "results": [],
+                "errors": [],
+                "created": time.time(),
+                "updated": time.time(),
+            }
+        job["status"] = "pending"
+        _save(job, jobs_dir)
+
+        _active[job_id] = _executor().submit(_run, job, items, work_fn, jobs_dir)
+
+    return job_id
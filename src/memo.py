@@ -0,0 +1,72 @@
+# src/memo.py (Result Memoization)
+import os
+import threading
+from collections import OrderedDict
+
+from src.services import get_or_create
+
+
+class LRUCache:
+    """
+    Thread-safe, size-bounded memo table.
+
+    Keys must be hashable tuples describing every input that affects the
+    value; the least recently used entry is evicted once maxsize is reached.
+    Cached values are shared across sessions, so callers must not mutate them.
+    """
+
+    def __init__(self, maxsize=32):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_compute(self, key, compute):
+        """Cached value for key, computing (outside the lock) and storing it on a miss"""
+
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is sentinel:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+def get_cache(name, maxsize=32):
+    """Process-wide named LRU cache"""
+
+    return get_or_create(("lru_cache", name), lambda: LRUCache(maxsize))
+
+
+def dataset_version(path):
+    """Cheap version tag for a data file: changes whenever the file is rewritten"""
+
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
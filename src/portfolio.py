@@ -0,0 +1,235 @@
+# src/portfolio.py (Wind Portfolio Optimization)
+import math
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = EARTH_RADIUS_KM * math.pi / 180.0
+
+# Cap on the swap evaluations of each local search (a few ms each on large
+# candidate sets); a count rather than a time limit keeps results reproducible
+MAX_SWAP_EVALS = 1000
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in km (numpy broadcasting)"""
+
+    lat1, lon1, lat2, lon2 = (np.radians(a) for a in (lat1, lon1, lat2, lon2))
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def conflict_lists(lats, lons, min_spacing_km):
+    """
+    For every site, the indices of the other sites closer than min_spacing_km.
+
+    Sites are bucketed into a spatial hash whose cells are at least
+    min_spacing_km wide, so only the 3x3 block of cells around a site can
+    hold a conflict; those candidates are checked with exact distances.
+    """
+
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+    n = len(lats)
+    empty = np.empty(0, dtype=np.intp)
+    if n == 0 or min_spacing_km <= 0:
+        return [empty] * n
+
+    # Longitude cells sized for the most poleward site, where degrees are shortest
+    cell_lat = min_spacing_km / KM_PER_DEGREE
+    max_lat = min(float(np.abs(lats).max()) + cell_lat, 89.0)
+    cell_lon = min(cell_lat / math.cos(math.radians(max_lat)), 360.0)
+
+    cell_i = np.floor(lats / cell_lat).astype(np.int64)
+    cell_j = np.floor(lons / cell_lon).astype(np.int64)
+
+    cells = {}
+    for idx, key in enumerate(zip(cell_i.tolist(), cell_j.tolist())):
+        cells.setdefault(key, []).append(idx)
+    cells = {key: np.array(members, dtype=np.intp) for key, members in cells.items()}
+
+    conflicts = [empty] * n
+    for (ci, cj), members in cells.items():
+        nearby = [cells[(ci + di, cj + dj)] for di in (-1, 0, 1) for dj in (-1, 0, 1)
+                  if (ci + di, cj + dj) in cells]
+        nearby = np.concatenate(nearby)
+
+        dist = haversine_km(lats[members][:, None], lons[members][:, None],
+                            lats[nearby][None, :], lons[nearby][None, :])
+        close = (dist < min_spacing_km) & (members[:, None] != nearby[None, :])
+        for row, idx in enumerate(members):
+            conflicts[idx] = nearby[close[row]]
+
+    return conflicts
+
+
+def _refill(removed, free_budget, values, costs, rank, available, blocked, conflicts, min_cost):
+    """
+    Best greedy replacement set if `removed` left the portfolio.
+
+    Candidates are unselected sites that would no longer conflict with
+    anything once `removed` is gone: the sites it blocks and the ones no
+    chosen site blocks. Only those are walked, in greedy order (rank).
+    Returns (value, indices).
+    """
+
+    freed = set(conflicts[removed].tolist())
+    candidates = np.union1d(conflicts[removed], np.flatnonzero(available & (blocked == 0)))
+    taken = []
+    excluded = set()
+    total = 0.0
+
+    for i in candidates[np.argsort(rank[candidates], kind="stable")].tolist():
+        if free_budget < min_cost:
+            break
+        if not available[i] or i == removed or i in excluded:
+            continue
+        if blocked[i] > (1 if i in freed else 0):
+            continue
+        if costs[i] > free_budget:
+            continue
+        taken.append(i)
+        total += values[i]
+        free_budget -= costs[i]
+        excluded.update(conflicts[i].tolist())
+
+    return total, taken
+
+
+def optimize_portfolio(sites, budget, site_cost=None, cost_col=None,
+                       value_col="Annual Profit ($M)", min_spacing_km=0.0,
+                       max_rounds=50, max_swap_evals=MAX_SWAP_EVALS):
+    """
+    Choose the set of sites to build under a capital budget and spacing rule.
+
+    Args:
+        sites: DataFrame with lat, lon and the value column
+        budget: total capital available, in the same units as the site cost
+        site_cost: capital cost of one site (used when cost_col is not given)
+        cost_col: column holding a per-site capital cost
+        value_col: column to maximise, e.g. annual profit or energy
+        min_spacing_km: minimum distance between any two chosen sites
+        max_rounds, max_swap_evals: caps on each local search, in passes over
+                                    the chosen sites and in swaps evaluated
+
+    Greedy passes (by value per unit cost and by value) with a spatial-hash
+    conflict check, each followed by local search: a chosen site is swapped
+    out whenever the sites its removal would free up are worth more. A
+    search cut short by its caps keeps every swap made so far, and the same
+    inputs always give the same portfolio. The fractional-knapsack bound (spacing
+    ignored) bounds the optimum from above.
+
+    Returns:
+        dict with the chosen sites (plus a 'Marginal Value' column: value
+        lost if the site were dropped and the best replacement built
+        instead), total value and cost, the upper bound and the gap to it
+    """
+
+    if cost_col is None and site_cost is None:
+        raise ValueError("Either site_cost or cost_col is required")
+
+    values = sites[value_col].to_numpy(dtype=np.float64)
+    if cost_col is not None:
+        costs = sites[cost_col].to_numpy(dtype=np.float64)
+    else:
+        costs = np.full(len(sites), float(site_cost))
+
+    available = np.isfinite(values) & (values > 0) & (costs > 0) & (costs <= budget)
+    if not available.any():
+        return {
+            "sites": sites.iloc[0:0].assign(**{"Marginal Value": []}),
+            "total_value": 0.0,
+            "total_cost": 0.0,
+            "upper_bound": 0.0,
+            "gap": 0.0
+        }
+
+    conflicts = conflict_lists(sites["lat"].to_numpy(), sites["lon"].to_numpy(), min_spacing_km)
+
+    # Best value per unit of capital first; ties go to the larger site value
+    density = np.where(available, values / np.where(costs > 0, costs, 1.0), -np.inf)
+    order = np.lexsort((-values, -density))
+    order = order[available[order]].tolist()
+    rank = np.full(len(sites), len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order))
+    min_cost = costs[available].min()
+
+    def solve(greedy_order):
+        selected = np.zeros(len(sites), dtype=bool)
+        free = available.copy()
+        blocked = np.zeros(len(sites), dtype=np.int64)   # chosen sites within the spacing
+        spent = 0.0
+
+        def select(i):
+            selected[i] = True
+            free[i] = False
+            blocked[conflicts[i]] += 1
+
+        for i in greedy_order:
+            if blocked[i] == 0 and spent + costs[i] <= budget:
+                select(i)
+                spent += costs[i]
+
+        # Swap a chosen site for its replacement set while that gains value
+        evals = 0
+        for _ in range(max_rounds):
+            improved = False
+            for s in np.flatnonzero(selected):
+                if evals >= max_swap_evals:
+                    break
+                evals += 1
+                gain, taken = _refill(s, budget - spent + costs[s], values, costs, rank,
+                                      free, blocked, conflicts, min_cost)
+                if gain > values[s] + 1e-9:
+                    selected[s] = False
+                    free[s] = True
+                    blocked[conflicts[s]] -= 1
+                    spent -= costs[s]
+                    for i in taken:
+                        select(i)
+                        spent += costs[i]
+                    improved = True
+            if not improved or evals >= max_swap_evals:
+                break
+
+        return selected, free, blocked, spent
+
+    # By density alone the greedy can be arbitrarily bad (one big site beats
+    # many cheap ones), so also start from the most valuable sites
+    by_value = sorted(order, key=lambda i: -values[i])
+    selected, available, blocked, spent = max(
+        (solve(order), solve(by_value)), key=lambda result: values[result[0]].sum()
+    )
+
+    chosen = np.flatnonzero(selected)
+    marginal = np.empty(len(chosen))
+    for k, s in enumerate(chosen):
+        replacement, _ = _refill(s, budget - spent + costs[s], values, costs, rank,
+                                 available, blocked, conflicts, min_cost)
+        marginal[k] = values[s] - replacement
+
+    # Fractional knapsack over every eligible site, spacing relaxed
+    eligible = np.isfinite(values) & (values > 0) & (costs > 0)
+    by_density = np.argsort(-(values[eligible] / costs[eligible]), kind="stable")
+    cum_cost = np.cumsum(costs[eligible][by_density])
+    cum_value = np.cumsum(values[eligible][by_density])
+    full = np.searchsorted(cum_cost, budget, side="right")
+    upper_bound = cum_value[full - 1] if full > 0 else 0.0
+    if full < len(by_density):
+        prev_cost = cum_cost[full - 1] if full > 0 else 0.0
+        nxt = by_density[full]
+        upper_bound += values[eligible][nxt] * (budget - prev_cost) / costs[eligible][nxt]
+
+    total_value = float(values[chosen].sum())
+    portfolio = sites.iloc[chosen].copy()
+    portfolio["Marginal Value"] = marginal
+    portfolio = portfolio.sort_values(value_col, ascending=False)
+
+    return {
+        "sites": portfolio,
+        "total_value": total_value,
+        "total_cost": float(costs[chosen].sum()),
+        "upper_bound": float(upper_bound),
+        "gap": float((upper_bound - total_value) / upper_bound) if upper_bound > 0 else 0.0
+    }
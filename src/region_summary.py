@@ -0,0 +1,173 @@
+# src/region_summary.py (Solar Region Summaries)
+import json
+import os
+import threading
+
+import numpy as np
+
+from src.jobs import JOBS_DIR, NO_DATA, get_job
+from src.memo import dataset_version, get_cache
+
+SUMMARY_PATH = "renewable_energies/solar/region_summary.json"
+IRRADIANCE_COLUMN = "Solar Irradiance (kWh/m²/day)"
+TOP_N = 5
+
+_lock = threading.Lock()
+summary_cache = get_cache("region_summary", maxsize=4)
+
+
+def city_key(city, state):
+    """Key used for a city by Solar analysis jobs, e.g. 'Austin|Texas'"""
+
+    return f"{city}|{state}"
+
+
+def _empty_summary():
+    return {"jobs": {}, "cities": {}, "no_data": [], "regions": {}, "states": {}}
+
+
+def load_summary(summary_path=SUMMARY_PATH):
+    """The materialized summaries, parsed once per file version"""
+
+    version = dataset_version(summary_path)
+    if version is None:
+        return _empty_summary()
+
+    def read():
+        with open(summary_path) as f:
+            return json.load(f)
+
+    return summary_cache.get_or_compute((summary_path, version), read)
+
+
+def _save(summary, summary_path):
+    os.makedirs(os.path.dirname(summary_path) or ".", exist_ok=True)
+    tmp_path = f"{summary_path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(summary, f)
+    os.replace(tmp_path, summary_path)
+
+
+def _aggregate(rows, total, top_n):
+    """Count, irradiance percentiles and best cities for one region or state"""
+
+    values = np.array([r["irradiance"] for r in rows], dtype=np.float64)
+    best = sorted(rows, key=lambda r: r["irradiance"], reverse=True)[:top_n]
+
+    summary = {"cities": int(total), "cached": len(rows), "best": best}
+    if len(values):
+        p10, p50, p90 = np.percentile(values, [10, 50, 90])
+        summary.update({
+            "mean": float(values.mean()),
+            "p10": float(p10),
+            "p50": float(p50),
+            "p90": float(p90),
+            "max": float(values.max())
+        })
+    return summary
+
+
+def refresh_summaries(cities_df, jobs_dir=JOBS_DIR, summary_path=SUMMARY_PATH, top_n=TOP_N):
+    """
+    Bring the per-region and per-state summaries up to date with the GHI cache.
+
+    The cache is the set of finished Solar analysis jobs. Only jobs that are
+    new or changed since the last refresh are read, and only the regions
+    and states of the cities they touch are re-aggregated.
+
+    Args:
+        cities_df: cleaned cities (city, state_name, Region), used for the
+                   region of each city and the per-group city counts
+
+    Returns:
+        the summary dict (see load_summary)
+    """
+
+    if not os.path.isdir(jobs_dir):
+        return load_summary(summary_path)
+
+    with _lock:
+        summary = load_summary(summary_path)
+
+        versions = {}
+        for name in os.listdir(jobs_dir):
+            if name.startswith("solar-") and name.endswith(".json"):
+                versions[name[:-len(".json")]] = dataset_version(os.path.join(jobs_dir, name))
+        changed = {job_id for job_id, version in versions.items() if summary["jobs"].get(job_id) != version}
+        if not changed:
+            return summary
+
+        # Copy before editing: the loaded summary is shared through the cache
+        summary = json.loads(json.dumps(summary))
+        if "state_name" in cities_df.columns:
+            states = cities_df["state_name"]
+        else:
+            states = cities_df["city"].map(lambda _: "")
+        region_of = dict(zip((city_key(c, s) for c, s in zip(cities_df["city"], states)), cities_df["Region"]))
+
+        touched_regions, touched_states = set(), set()
+        no_data = set(summary["no_data"])
+
+        for job_id in sorted(changed):
+            job = get_job(job_id, jobs_dir)
+            # Running jobs are picked up once they finish
+            if job is None or job["status"] != "done":
+                continue
+            summary["jobs"][job["id"]] = versions[job["id"]]
+
+            for r in job["results"]:
+                key = city_key(r["City"], r["State"])
+                region = region_of.get(key)
+                summary["cities"][key] = {
+                    "City": r["City"],
+                    "State": r["State"],
+                    "Region": region,
+                    IRRADIANCE_COLUMN: r[IRRADIANCE_COLUMN],
+                    "Latitude": r["Latitude"],
+                    "Longitude": r["Longitude"]
+                }
+                no_data.discard(key)
+                touched_regions.add(region)
+                touched_states.add(r["State"])
+
+            # Only "no data" is permanent; cities that raised (timeouts, 401/429/5xx) stay retryable
+            for e in job["errors"]:
+                if e["key"] and e["error"] == NO_DATA and e["key"] not in summary["cities"]:
+                    no_data.add(e["key"])
+
+        summary["no_data"] = sorted(no_data)
+
+        totals = {
+            "regions": cities_df["Region"].value_counts().to_dict(),
+            "states": states.value_counts().to_dict()
+        }
+        touched_regions.discard(None)
+
+        for group, column, touched in (
+            ("regions", "Region", touched_regions),
+            ("states", "State", touched_states),
+        ):
+            rows = {name: [] for name in touched | {"All"}}
+            for c in summary["cities"].values():
+                row = {"City": c["City"], "State": c["State"], "irradiance": c[IRRADIANCE_COLUMN]}
+                rows["All"].append(row)
+                if c[column] in touched:
+                    rows[c[column]].append(row)
+
+            for name, group_rows in rows.items():
+                total = len(cities_df) if name == "All" else totals[group].get(name, len(group_rows))
+                summary[group][name] = _aggregate(group_rows, total, top_n)
+
+        _save(summary, summary_path)
+        summary_cache.put((summary_path, dataset_version(summary_path)), summary)
+
+    return summary
+
+
+def cached_results(summary, keys):
+    """Cached GHI rows (in Solar job result format) for the given city keys"""
+
+    return {
+        key: {k: v for k, v in summary["cities"][key].items() if k != "Region"}
+        for key in keys if key in summary["cities"]
+    }
@@ -0,0 +1,279 @@
+# src/scoring_service.py (Wind Scoring Service)
+import argparse
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from src import tracing
+from src.services import get_env, lazy_import
+from src.synthetic import synthetic_wind_features
+from src.wind_model import MODEL_INFO_PATH, MODEL_PATH, USWTDB_PATH, fleet_tree, load_uswtdb, predict_sites
+
+DEFAULT_MAX_BATCH = 512
+DEFAULT_MAX_WAIT_MS = 5.0
+
+
+def valid_coordinates(lats, lons):
+    """True where a point is a finite latitude in [-90, 90] and longitude in [-180, 180]"""
+
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+    return np.isfinite(lats) & np.isfinite(lons) & (np.abs(lats) <= 90.0) & (np.abs(lons) <= 180.0)
+
+
+class WindScorer:
+    """
+    Power potential at any coordinates, with everything loaded once.
+
+    The trained model, the turbine fleet and its KD-tree are built on
+    construction, so each call is one vectorized predict. With proxy=True
+    no model is needed: the score is the notebook's power proxy (mean
+    wind speed cubed), which is also the model's training label.
+    """
+
+    def __init__(self, model_path=MODEL_PATH, uswtdb_path=USWTDB_PATH, info_path=MODEL_INFO_PATH, proxy=False):
+        self.proxy = proxy
+        self.model = None
+        self.fleet = None
+        self.tree = None
+        self.info = {"mode": "proxy" if proxy else "model"}
+
+        if not proxy:
+            self.model = lazy_import("joblib").load(model_path)
+            self.fleet = load_uswtdb(uswtdb_path)
+            self.tree = fleet_tree(self.fleet["ylat"], self.fleet["xlong"])
+            self.info["turbines"] = len(self.fleet)
+            try:
+                with open(info_path) as f:
+                    self.info["model"] = json.load(f)
+            except OSError:
+                pass
+
+    def __call__(self, lats, lons):
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        if self.proxy:
+            return synthetic_wind_features(lats, lons)["mean_ws"].to_numpy() ** 3
+        return predict_sites(self.model, lats, lons, self.fleet, tree=self.tree)
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-point requests into one vectorized call.
+
+    A worker thread takes the first waiting request, then keeps collecting
+    until max_batch requests are in hand or max_wait_ms has passed since
+    that first request - the most latency batching may add. Whatever is
+    already queued when the worker comes back is picked up at once, so
+    under load batches grow even with max_wait_ms=0.
+    """
+
+    def __init__(self, score, max_batch=DEFAULT_MAX_BATCH, max_wait_ms=DEFAULT_MAX_WAIT_MS):
+        self.score = score
+        self.max_batch = max(1, int(max_batch))
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.stats = {"requests": 0, "batches": 0, "largest_batch": 0}
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, lat, lon):
+        """Queue one point; the returned Future resolves to its score"""
+
+        future = Future()
+        self._queue.put((float(lat), float(lon), future))
+        return future
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+
+            batch = [first]
+            deadline = time.perf_counter() + self.max_wait
+            closing = False
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    closing = True
+                    break
+                batch.append(item)
+
+            self._flush(batch)
+            if closing:
+                return
+
+    def _flush(self, batch):
+        lats = np.fromiter((item[0] for item in batch), dtype=np.float64, count=len(batch))
+        lons = np.fromiter((item[1] for item in batch), dtype=np.float64, count=len(batch))
+        try:
+            with tracing.span("scoring.batch", size=len(batch)):
+                scores = self.score(lats, lons)
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0][2].set_exception(e)
+            else:
+                # Score one by one so a single bad point cannot fail the requests batched with it
+                for item in batch:
+                    self._flush([item])
+                return
+        else:
+            for (_, _, future), value in zip(batch, scores):
+                future.set_result(float(value))
+
+        with self._lock:
+            self.stats["requests"] += len(batch)
+            self.stats["batches"] += 1
+            self.stats["largest_batch"] = max(self.stats["largest_batch"], len(batch))
+
+
+class ScoringHandler(BaseHTTPRequestHandler):
+    # Keep-alive, so clients scoring many points reuse one connection
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, payload, status=200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/health":
+            self._send_json(dict(self.server.scorer.info, batching=self.server.batcher_stats()))
+            return
+        if url.path != "/score":
+            self._send_json({"error": "not found"}, status=404)
+            return
+
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        try:
+            lat, lon = float(query["lat"]), float(query["lon"])
+        except (KeyError, ValueError):
+            self._send_json({"error": "lat and lon are required numbers"}, status=400)
+            return
+        if not valid_coordinates(lat, lon):
+            self._send_json({"error": "lat must be in [-90, 90] and lon in [-180, 180]"}, status=400)
+            return
+
+        try:
+            score = self.server.batcher.submit(lat, lon).result(timeout=self.server.timeout_s)
+        except Exception as e:
+            self._send_json({"error": str(e)}, status=500)
+            return
+        self._send_json({"lat": lat, "lon": lon, "power_potential": score})
+
+    def do_POST(self):
+        """Many points in one request: {"points": [[lat, lon], ...]}, scored as one batch"""
+
+        if urlparse(self.path).path != "/score":
+            self._send_json({"error": "not found"}, status=404)
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            points = np.asarray(json.loads(self.rfile.read(length) or b"{}")["points"], dtype=np.float64)
+            if points.ndim != 2 or points.shape[1] != 2:
+                raise ValueError
+        except (KeyError, TypeError, ValueError):
+            self._send_json({"error": "body must be {\"points\": [[lat, lon], ...]}"}, status=400)
+            return
+        invalid = np.flatnonzero(~valid_coordinates(points[:, 0], points[:, 1]))
+        if len(invalid):
+            self._send_json({"error": "lat must be in [-90, 90] and lon in [-180, 180]",
+                             "invalid_points": invalid.tolist()}, status=400)
+            return
+
+        try:
+            with tracing.span("scoring.bulk", size=len(points)):
+                scores = self.server.scorer(points[:, 0], points[:, 1])
+        except Exception as e:
+            self._send_json({"error": str(e)}, status=500)
+            return
+        self._send_json({"power_potential": [float(v) for v in scores]})
+
+
+class ScoringServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, scorer, max_batch=DEFAULT_MAX_BATCH, max_wait_ms=DEFAULT_MAX_WAIT_MS,
+                 timeout_s=30.0):
+        super().__init__(address, ScoringHandler)
+        self.scorer = scorer
+        self.batcher = MicroBatcher(scorer, max_batch, max_wait_ms)
+        self.timeout_s = timeout_s
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def batcher_stats(self):
+        stats = dict(self.batcher.stats, max_batch=self.batcher.max_batch,
+                     max_wait_ms=self.batcher.max_wait * 1000.0)
+        stats["mean_batch"] = stats["requests"] / stats["batches"] if stats["batches"] else 0.0
+        return stats
+
+    def server_close(self):
+        super().server_close()
+        self.batcher.close()
+
+
+def start_scoring_server(scorer, host="127.0.0.1", port=0, max_batch=DEFAULT_MAX_BATCH,
+                         max_wait_ms=DEFAULT_MAX_WAIT_MS):
+    """Start the scoring server on a background thread and return it"""
+
+    server = ScoringServer((host, port), scorer, max_batch, max_wait_ms)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve wind power-potential scores over HTTP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=int(get_env("SCORING_PORT", 8765)))
+    parser.add_argument("--max-batch", type=int, default=int(get_env("SCORING_MAX_BATCH", DEFAULT_MAX_BATCH)),
+                        help="Largest micro-batch")
+    parser.add_argument("--max-wait-ms", type=float,
+                        default=float(get_env("SCORING_MAX_WAIT_MS", DEFAULT_MAX_WAIT_MS)),
+                        help="Latency budget: longest a request waits for its batch to fill")
+    parser.add_argument("--model", default=MODEL_PATH, help="Model from python -m src.wind_model")
+    parser.add_argument("--uswtdb", default=USWTDB_PATH, help="Turbine fleet the model was trained on")
+    parser.add_argument("--proxy", action="store_true",
+                        help="Score with the power proxy instead of a trained model")
+    args = parser.parse_args()
+
+    scorer = WindScorer(args.model, args.uswtdb, proxy=args.proxy)
+    server = ScoringServer((args.host, args.port), scorer, args.max_batch, args.max_wait_ms)
+    print(f"Serving {scorer.info['mode']} scores on {server.url}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
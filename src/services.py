@@ -0,0 +1,189 @@
+# src/services.py (Shared Services)
+import importlib
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+# Process-wide instances, shared by every Streamlit session and rerun
+_instances = {}
+_lock = threading.RLock()  # factories may request other services
+
+NOMINATIM_USER_AGENT = "renewweb"
+
+
+def get_or_create(key, factory):
+    """
+    Return the process-wide instance for `key`, creating it on first use.
+
+    Creation happens under a lock so concurrent sessions never build the
+    same expensive object twice.
+    """
+
+    instance = _instances.get(key)
+    if instance is not None:
+        return instance
+
+    with _lock:
+        if key not in _instances:
+            _instances[key] = factory()
+        return _instances[key]
+
+
+def reset(key=None):
+    """Drop one cached instance (or all of them) so the next call recreates it"""
+
+    with _lock:
+        if key is None:
+            _instances.clear()
+        else:
+            _instances.pop(key, None)
+
+
+def lazy_import(module_name):
+    """Import a heavy module on first use instead of at page import time"""
+
+    return get_or_create(("module", module_name), lambda: importlib.import_module(module_name))
+
+
+def load_env():
+    """Load the .env file once per process"""
+
+    def _load():
+        lazy_import("dotenv").load_dotenv()
+        return True
+
+    return get_or_create("dotenv", _load)
+
+
+def get_env(name, default=None):
+    """Read a setting after making sure .env has been loaded"""
+
+    load_env()
+    return os.getenv(name, default)
+
+
+def get_openai_client():
+    """Shared OpenAI client (OPENAI_API_KEY / OPENAI_BASE_URL from the environment)"""
+
+    def _create():
+        openai = lazy_import("openai")
+        return openai.OpenAI(api_key=get_env("OPENAI_API_KEY"))
+
+    return get_or_create("openai", _create)
+
+
+def get_geocoder(user_agent=NOMINATIM_USER_AGENT):
+    """Shared Nominatim geocoder; NOMINATIM_DOMAIN/NOMINATIM_SCHEME override the server"""
+
+    def _create():
+        geocoders = lazy_import("geopy.geocoders")
+        return geocoders.Nominatim(
+            user_agent=user_agent,
+            domain=get_env("NOMINATIM_DOMAIN", "nominatim.openstreetmap.org"),
+            scheme=get_env("NOMINATIM_SCHEME", "https")
+        )
+
+    return get_or_create(("nominatim", user_agent), _create)
+
+
+# Requests per second allowed towards each upstream, shared by all sessions
+DEFAULT_RATE_LIMITS = {
+    "nominatim": 1.0,   # Nominatim usage policy: at most 1 request/s
+    "nrel": 5.0,
+}
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket.
+
+    acquire() reserves a token and sleeps until it is due, so concurrent
+    callers are spaced out instead of all hitting the upstream at once.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1.0
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def get_rate_limiter(name):
+    """Shared limiter for an upstream; <NAME>_RATE_LIMIT (requests/s) overrides the default"""
+
+    def _create():
+        rate = float(get_env(f"{name.upper()}_RATE_LIMIT", DEFAULT_RATE_LIMITS.get(name, 10.0)))
+        return RateLimiter(rate)
+
+    return get_or_create(("rate_limiter", name), _create)
+
+
+def get_http_session(host=None):
+    """
+    Shared keep-alive requests session for one upstream host.
+
+    Connections are pooled and bounded (HTTP_POOL_MAXSIZE, default 10): extra
+    concurrent requests wait for a free connection instead of opening new
+    ones. 429/5xx responses are retried with backoff, honouring Retry-After.
+    """
+
+    def _create():
+        requests = lazy_import("requests")
+        retry = lazy_import("urllib3.util.retry").Retry(
+            total=3, backoff_factor=0.5, status_forcelist=(429, 502, 503, 504),
+            allowed_methods=("GET", "POST"), respect_retry_after_header=True
+        )
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=int(get_env("HTTP_POOL_MAXSIZE", 10)),
+            pool_block=True,
+            max_retries=retry
+        )
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    return get_or_create(("http_session", host), _create)
+
+
+def http_get(url, rate_limit=None, timeout=30, **kwargs):
+    """GET through the pooled session of the URL's host, paced by the named rate limiter"""
+
+    host = urlsplit(url).netloc
+    if rate_limit is not None:
+        get_rate_limiter(rate_limit).acquire()
+    return get_http_session(host).get(url, timeout=timeout, **kwargs)
+
+
+def reverse_geocode(query, **kwargs):
+    """Rate-limited reverse geocode through the shared Nominatim client"""
+
+    with get_rate_limiter("nominatim"):
+        return get_geocoder().reverse(query, **kwargs)
+
+
+def geocode(query, **kwargs):
+    """Rate-limited forward geocode through the shared Nominatim client"""
+
+    with get_rate_limiter("nominatim"):
+        return get_geocoder().geocode(query, **kwargs)
@@ -0,0 +1,191 @@
+# src/site_selection.py (Spatially Diverse Site Selection)
+import math
+
+import numpy as np
+
+from src.services import lazy_import
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = 111.2
+
+# Rasters much sparser than this many cells per candidate are not treated as grids
+MAX_RASTER_FILL = 50
+
+
+def _grid_step(values):
+    """Spacing of a regular grid axis: smallest gap between distinct values"""
+
+    distinct = np.unique(values)
+    if len(distinct) < 2:
+        return None
+    return float(np.diff(distinct).min())
+
+
+def local_maxima(lats, lons, scores, radius_cells=1):
+    """
+    Cells that are the maximum of their (2r+1) x (2r+1) raster neighbourhood.
+
+    The candidates are snapped to their grid (spacing inferred from the
+    coordinates) and a maximum filter is run over the raster. Points that
+    do not form a reasonably dense grid are all returned as maxima.
+
+    Returns:
+        boolean mask over the candidates
+    """
+
+    lats, lons, scores = (np.asarray(a, dtype=np.float64) for a in (lats, lons, scores))
+    lat_step, lon_step = _grid_step(lats), _grid_step(lons)
+    if lat_step is None or lon_step is None:
+        return np.ones(len(scores), dtype=bool)
+
+    rows = np.rint((lats - lats.min()) / lat_step).astype(np.int64)
+    cols = np.rint((lons - lons.min()) / lon_step).astype(np.int64)
+    shape = (rows.max() + 1, cols.max() + 1)
+    if shape[0] * shape[1] > MAX_RASTER_FILL * len(scores) + 1_000_000:
+        return np.ones(len(scores), dtype=bool)
+
+    raster = np.full(shape, -np.inf)
+    np.maximum.at(raster, (rows, cols), scores)
+    # scipy.ndimage is slow to import, so it is loaded on first use
+    neighbourhood = lazy_import("scipy.ndimage").maximum_filter(raster, size=2 * radius_cells + 1, mode="constant", cval=-np.inf)
+    return scores >= neighbourhood[rows, cols]
+
+
+def _ranked_blocks(scores, first_block):
+    """
+    Candidate ids in descending score order (ties by id), block by block.
+
+    Each block is found with a partial partition, so picking the top few
+    of millions never sorts the whole array.
+    """
+
+    n = len(scores)
+    size = first_block
+    upper = np.inf
+    while True:
+        if size >= n:
+            ids = np.flatnonzero(scores < upper)
+        else:
+            threshold = np.partition(scores, n - size)[n - size]
+            ids = np.flatnonzero((scores >= threshold) & (scores < upper))
+            upper = threshold
+        yield ids[np.lexsort((ids, -scores[ids]))]
+        if size >= n:
+            return
+        size *= 4
+
+
+def grid_nms(lats, lons, scores, min_separation_km, k=None, seeds=None):
+    """
+    Greedy non-maximum suppression with a grid hash.
+
+    Candidates are taken best first. Each one is kept unless an already kept
+    site lies within min_separation_km. Kept sites are bucketed in cells
+    at least min_separation_km wide, so each check only looks at the 3x3
+    surrounding cells. The pass is linear in the candidates examined and
+    stops as soon as k sites are kept.
+
+    Args:
+        seeds: (lats, lons) of sites chosen earlier; they suppress nearby
+               candidates but are not returned or counted towards k
+
+    Returns:
+        positions of the kept candidates, best first
+    """
+
+    lats, lons, scores = (np.asarray(a, dtype=np.float64) for a in (lats, lons, scores))
+    finite = np.flatnonzero(np.isfinite(scores) & np.isfinite(lats) & np.isfinite(lons))
+    lats, lons, scores = lats[finite], lons[finite], scores[finite]
+    k = len(scores) if k is None else k
+    if k <= 0 or len(scores) == 0:
+        return np.empty(0, dtype=np.int64)
+
+    if min_separation_km <= 0:
+        return finite[next(_ranked_blocks(scores, k))[:k]]
+
+    # Seeds are appended after the candidates and bucketed before the pass
+    n = len(scores)
+    if seeds is not None:
+        all_lats = np.concatenate([lats, np.asarray(seeds[0], dtype=np.float64)])
+        all_lons = np.concatenate([lons, np.asarray(seeds[1], dtype=np.float64)])
+    else:
+        all_lats, all_lons = lats, lons
+
+    cell_lat = min_separation_km / KM_PER_DEGREE
+    # Cells are widened for the most poleward latitude so 3x3 always covers the radius
+    widest = min(89.0, float(np.abs(all_lats).max()) + cell_lat)
+    cell_lon = cell_lat / math.cos(math.radians(widest))
+
+    rad_lat, rad_lon = np.radians(all_lats), np.radians(all_lons)
+    cos_lat = np.cos(rad_lat)
+    # Haversine threshold on a = sin²(d/2R), avoiding arcsin per pair
+    max_a = math.sin(min_separation_km / (2 * EARTH_RADIUS_KM)) ** 2
+
+    buckets = {}
+    for j in range(n, len(all_lats)):
+        buckets.setdefault((math.floor(all_lats[j] / cell_lat), math.floor(all_lons[j] / cell_lon)), []).append(j)
+    kept = []
+    for block in _ranked_blocks(scores, max(64, 8 * k)):
+        for i in block:
+            cy = math.floor(lats[i] / cell_lat)
+            cx = math.floor(lons[i] / cell_lon)
+            suppressed = False
+            for dy in (-1, 0, 1):
+                for dx in (-1, 0, 1):
+                    for j in buckets.get((cy + dy, cx + dx), ()):
+                        a = (math.sin((rad_lat[j] - rad_lat[i]) / 2) ** 2
+                             + cos_lat[i] * cos_lat[j] * math.sin((rad_lon[j] - rad_lon[i]) / 2) ** 2)
+                        if a < max_a:
+                            suppressed = True
+                            break
+                    if suppressed:
+                        break
+                if suppressed:
+                    break
+            if suppressed:
+                continue
+
+            buckets.setdefault((cy, cx), []).append(i)
+            kept.append(i)
+            if len(kept) >= k:
+                return finite[np.array(kept, dtype=np.int64)]
+
+    return finite[np.array(kept, dtype=np.int64)]
+
+
+def diverse_top_k(df, score_col, k=5, min_separation_km=50.0, ascending=False, peaks_only=True,
+                  lat_col="lat", lon_col="lon"):
+    """
+    Best k rows of a candidate table that are at least min_separation_km apart.
+
+    Args:
+        ascending: True when lower scores are better (e.g. payback years)
+        peaks_only: first reduce the grid to its local maxima (3x3 raster
+                    neighbourhood), so a ridge yields one candidate; if
+                    that leaves fewer than k sites, the rest are filled
+                    from the other rows, kept apart from the peaks chosen
+
+    Returns:
+        the selected rows, best first
+    """
+
+    scores = df[score_col].to_numpy(dtype=np.float64)
+    if ascending:
+        scores = -scores
+    lats = df[lat_col].to_numpy(dtype=np.float64)
+    lons = df[lon_col].to_numpy(dtype=np.float64)
+
+    if peaks_only:
+        is_peak = local_maxima(lats, lons, scores)
+        peaks = np.flatnonzero(is_peak)
+        picked = peaks[grid_nms(lats[peaks], lons[peaks], scores[peaks], min_separation_km, k)]
+        if len(picked) >= k or len(picked) == len(df):
+            return df.iloc[picked]
+
+        rest = np.flatnonzero(~is_peak)
+        extra = rest[grid_nms(lats[rest], lons[rest], scores[rest], min_separation_km, k - len(picked),
+                              seeds=(lats[picked], lons[picked]))]
+        chosen = np.concatenate([picked, extra])
+        return df.iloc[chosen[np.argsort(-scores[chosen], kind="stable")]]
+
+    return df.iloc[grid_nms(lats, lons, scores, min_separation_km, k)]
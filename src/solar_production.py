@@ -0,0 +1,284 @@
+# src/solar_production.py (Solar Energy Production)
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+
+import numpy as np
+import pandas as pd
+
+from src.memo import dataset_version
+from src.services import http_get
+
+HOURS_PER_YEAR = 8760
+
+TMY_DIR = "renewable_energies/solar/tmy"
+TMY_CACHE_DIR = "renewable_energies/solar/tmy_cache"
+
+_results_lock = threading.Lock()
+
+# Panel / system defaults (match calculate_solar_financials)
+PANEL_AREA = 1.7              # m²
+PANEL_EFFICIENCY = 0.18
+TEMP_COEFFICIENT = -0.004     # power change per °C above 25 °C
+NOCT = 45.0                   # nominal operating cell temperature, °C
+INVERTER_EFFICIENCY = 0.96
+DC_AC_RATIO = 1.2             # inverter sized below the array's peak DC output
+
+
+def site_id(city, state=""):
+    """Stable file-name friendly id for a city, e.g. 'austin_texas'"""
+
+    label = f"{city} {state}".strip().lower()
+    return re.sub(r"[^a-z0-9]+", "_", label).strip("_")
+
+
+def tmy_path(site, tmy_dir=TMY_DIR):
+    """Local TMY file for a site"""
+
+    return os.path.join(tmy_dir, f"{site}.csv")
+
+
+def read_tmy_file(filepath):
+    """
+    Read an hourly typical-meteorological-year file.
+
+    Accepts NSRDB TMY CSV downloads (two metadata lines before the header)
+    as well as plain CSVs whose first line is the header.
+
+    Returns:
+        (ghi, temperature) float32 arrays of 8760 hours
+    """
+
+    with open(filepath) as f:
+        first_line = f.readline()
+    skiprows = 0 if "GHI" in first_line else 2
+
+    df = pd.read_csv(filepath, skiprows=skiprows, usecols=["GHI", "Temperature"],
+                     dtype={"GHI": np.float32, "Temperature": np.float32})
+
+    # TMY years occasionally carry Feb 29 - keep a fixed 8760-hour year
+    ghi = df["GHI"].to_numpy()[:HOURS_PER_YEAR]
+    temperature = df["Temperature"].to_numpy()[:HOURS_PER_YEAR]
+    if len(ghi) < HOURS_PER_YEAR:
+        raise ValueError(f"{filepath} has {len(ghi)} hours, expected {HOURS_PER_YEAR}")
+
+    return ghi, temperature
+
+
+def build_tmy_cache(sites, tmy_dir=TMY_DIR, cache_dir=TMY_CACHE_DIR):
+    """
+    Stack the TMY files of many sites into one memory-mappable array.
+
+    Sites without a local TMY file are skipped. The array has shape
+    (n_sites, 8760, 2) holding GHI and air temperature.
+
+    Returns:
+        list of site ids stored in the cache, in row order
+    """
+
+    available = [s for s in sites if os.path.exists(tmy_path(s, tmy_dir))]
+    if not available:
+        return []
+    os.makedirs(cache_dir, exist_ok=True)
+
+    weather = np.lib.format.open_memmap(
+        os.path.join(cache_dir, "weather.npy"), mode="w+",
+        dtype=np.float32, shape=(len(available), HOURS_PER_YEAR, 2)
+    )
+    for row, site in enumerate(available):
+        ghi, temperature = read_tmy_file(tmy_path(site, tmy_dir))
+        weather[row, :, 0] = ghi
+        weather[row, :, 1] = temperature
+    weather.flush()
+    del weather
+
+    with open(os.path.join(cache_dir, "sites.json"), "w") as f:
+        json.dump(available, f)
+
+    return available
+
+
+def load_tmy_cache(cache_dir=TMY_CACHE_DIR):
+    """
+    Memory-map the stacked TMY weather.
+
+    Returns:
+        (site_ids, weather) or ([], None) if no cache has been built
+    """
+
+    sites_file = os.path.join(cache_dir, "sites.json")
+    weather_file = os.path.join(cache_dir, "weather.npy")
+    if not (os.path.exists(sites_file) and os.path.exists(weather_file)):
+        return [], None
+
+    with open(sites_file) as f:
+        sites = json.load(f)
+
+    return sites, np.load(weather_file, mmap_mode="r")
+
+
+def simulate_pv(weather, panel_area=PANEL_AREA, panel_efficiency=PANEL_EFFICIENCY,
+                temp_coefficient=TEMP_COEFFICIENT, noct=NOCT,
+                inverter_efficiency=INVERTER_EFFICIENCY, dc_ac_ratio=DC_AC_RATIO,
+                chunk_size=256, hourly=False):
+    """
+    Hourly PV output for one panel at every site.
+
+    Args:
+        weather: (n_sites, 8760, 2) array of GHI (W/m²) and air temperature (°C),
+                 typically the memory-mapped TMY cache
+        chunk_size: sites simulated per step so only a slice is paged in
+        hourly: return the hourly series instead of the annual total
+
+    Returns:
+        float64 array of annual AC energy per panel in kWh, or with
+        hourly=True a float32 (n_sites, 8760) array of AC output in kW
+    """
+
+    n_sites = weather.shape[0]
+    annual_kwh = np.empty(n_sites, dtype=np.float64)
+    hourly_kw = np.empty((n_sites, weather.shape[1]), dtype=np.float32) if hourly else None
+
+    dc_rating_kw = np.float32(panel_area * panel_efficiency)   # at 1000 W/m²
+    ac_limit_kw = dc_rating_kw / np.float32(dc_ac_ratio)
+
+    for start in range(0, n_sites, chunk_size):
+        stop = min(start + chunk_size, n_sites)
+        ghi = np.asarray(weather[start:stop, :, 0], dtype=np.float32)
+        air_temp = np.asarray(weather[start:stop, :, 1], dtype=np.float32)
+
+        # Cell temperature rises with irradiance (NOCT model)
+        cell_temp = air_temp + np.float32((noct - 20.0) / 800.0) * ghi
+        derate = np.float32(1.0) + np.float32(temp_coefficient) * (cell_temp - np.float32(25.0))
+
+        dc_kw = dc_rating_kw * (ghi / np.float32(1000.0)) * np.maximum(derate, np.float32(0.0))
+        ac_kw = np.minimum(dc_kw * np.float32(inverter_efficiency), ac_limit_kw)
+
+        if hourly:
+            hourly_kw[start:stop] = ac_kw
+        else:
+            annual_kwh[start:stop] = ac_kw.sum(axis=1, dtype=np.float64)
+
+    return hourly_kw if hourly else annual_kwh
+
+
+def _results_cache_file(cache_dir):
+    return os.path.join(cache_dir, "annual_energy_per_panel.json")
+
+
+def _read_results(cache_file):
+    """Cached {site: {"version", "kwh"}} entries (entries from older formats are dropped)"""
+
+    try:
+        with open(cache_file) as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return {site: entry for site, entry in cached.items() if isinstance(entry, dict)}
+
+
+def simulated_energy_per_panel(sites, tmy_dir=TMY_DIR, cache_dir=TMY_CACHE_DIR):
+    """
+    Annual kWh per panel for each site that has a local TMY file.
+
+    Results are cached per site and TMY file version, so only sites not
+    simulated before, or whose TMY file changed since, are read and
+    simulated. Their weather is stacked in a private temporary directory,
+    so concurrent sessions never write to each other's arrays.
+
+    Returns:
+        dict of site id -> annual kWh per panel
+    """
+
+    cache_file = _results_cache_file(cache_dir)
+    versions = {s: dataset_version(tmy_path(s, tmy_dir)) for s in sites}
+    cached = _read_results(cache_file)
+    energy = {s: cached[s]["kwh"] for s in sites
+              if versions[s] is not None and s in cached and cached[s].get("version") == versions[s]}
+
+    missing = [s for s in sites if versions[s] is not None and s not in energy]
+    if missing:
+        os.makedirs(cache_dir, exist_ok=True)
+        work_dir = tempfile.mkdtemp(prefix="pending-", dir=cache_dir)
+        try:
+            simulated = build_tmy_cache(missing, tmy_dir, work_dir)
+            if simulated:
+                _, weather = load_tmy_cache(work_dir)
+                energy.update(zip(simulated, simulate_pv(weather).tolist()))
+                del weather
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        with _results_lock:
+            # Re-read so entries other sessions added meanwhile are kept
+            cached = _read_results(cache_file)
+            cached.update({s: {"version": versions[s], "kwh": energy[s]} for s in missing if s in energy})
+            fd, tmp_path = tempfile.mkstemp(prefix="annual_energy_per_panel-", suffix=".tmp", dir=cache_dir)
+            with os.fdopen(fd, "w") as f:
+                json.dump(cached, f)
+            os.replace(tmp_path, cache_file)
+
+    return {s: energy[s] for s in sites if s in energy}
+
+
+def fetch_annual_ghi(lat, lon, api_key, api_base="https://developer.nrel.gov"):
+    """Annual average GHI (kWh/m²/day) from the NREL solar resource API, or None"""
+
+    response = http_get(
+        f"{api_base}/api/solar/solar_resource/v1.json",
+        params={'api_key': api_key, 'lat': lat, 'lon': lon},
+        rate_limit="nrel"
+    )
+    # Bad keys, rate limits and server errors raise (and are retried); None means no data
+    response.raise_for_status()
+    data = response.json()
+
+    if 'outputs' in data:
+        return float(data['outputs']['avg_ghi']['annual'])
+    return None
+
+
+def calculate_solar_financials(irradiance, num_panels,
+                               panel_area=PANEL_AREA, panel_efficiency=PANEL_EFFICIENCY,
+                               electricity_rate=0.12,
+                               panel_cost=250, install_cost=250,
+                               maintenance_cost=15,
+                               lifetime_years=25, discount_rate=0.05,
+                               annual_energy_per_panel=None):
+    """
+    Financials for a solar installation.
+
+    Uses the simulated hourly energy per panel when available, otherwise
+    annual GHI (kWh/m²/day) × panel area × efficiency.
+    """
+
+    # Energy per panel
+    if annual_energy_per_panel is None:
+        annual_energy_per_panel = irradiance * panel_area * panel_efficiency * 365  # kWh/year
+    total_annual_energy = annual_energy_per_panel * num_panels
+
+    # Revenue
+    annual_revenue = total_annual_energy * electricity_rate
+
+    # Costs
+    total_initial_cost = num_panels * (panel_cost + install_cost)
+    total_maintenance = num_panels * maintenance_cost
+    annual_net_savings = annual_revenue - total_maintenance
+
+    # Payback Period
+    payback_period = total_initial_cost / annual_net_savings if annual_net_savings > 0 else None
+
+    # ROI %
+    roi_percent = (annual_net_savings / total_initial_cost) * 100 if total_initial_cost > 0 else 0
+
+    return {
+        "Annual Energy (kWh)": total_annual_energy,
+        "Annual Revenue ($)": annual_revenue,
+        "Net Annual Savings ($)": annual_net_savings,
+        "Total Initial Cost ($)": total_initial_cost,
+        "Payback Period (years)": payback_period,
+        "ROI (%)": roi_percent
+    }
@@ -0,0 +1,199 @@
+# src/solar_surface.py (National Solar Resource Surface)
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.grid_store import grid_cache, load_grid, read_header, write_grid
+from src.hybrid import unit_vectors
+from src.jobs import JOBS_DIR, job_id_for, list_jobs
+from src.memo import dataset_version
+from src.region_summary import IRRADIANCE_COLUMN
+from src.services import lazy_import
+
+SURFACE_PATH = "renewable_energies/solar/ghi_surface.grid"
+SAMPLE_JOB_KIND = "ghi-surface"
+
+# Contiguous US
+CONUS_BOUNDS = {"lat_min": 24.5, "lat_max": 49.5, "lon_min": -125.0, "lon_max": -66.5}
+SAMPLE_SPACING_DEG = 2.0
+SURFACE_RESOLUTION_DEG = 0.25
+
+# Fewer samples than this cannot describe a surface (e.g. the sampling job failed)
+MIN_SURFACE_SAMPLES = 3
+
+IDW_NEIGHBOURS = 8
+IDW_POWER = 2.0
+
+
+def sample_lattice(bounds=CONUS_BOUNDS, spacing_deg=SAMPLE_SPACING_DEG):
+    """
+    Sparse sampling points for the surface, as job items.
+
+    A 2° lattice over the contiguous US is ~400 points. Points over the
+    ocean simply return no data.
+    """
+
+    lats = np.arange(bounds["lat_min"], bounds["lat_max"] + 1e-9, spacing_deg)
+    lons = np.arange(bounds["lon_min"], bounds["lon_max"] + 1e-9, spacing_deg)
+    return [
+        {"key": f"{lat:.3f},{lon:.3f}", "lat": float(lat), "lon": float(lon)}
+        for lat in lats for lon in lons
+    ]
+
+
+def sample_job_id(items, api_base):
+    return job_id_for(SAMPLE_JOB_KIND, {"points": [item["key"] for item in items], "api_base": api_base})
+
+
+def collect_samples(summary=None, jobs_dir=JOBS_DIR):
+    """
+    Every measured GHI point: lattice sample jobs plus cities already analyzed.
+
+    Returns:
+        DataFrame with lat, lon, ghi (duplicate points averaged)
+    """
+
+    rows = [
+        (r["Latitude"], r["Longitude"], r[IRRADIANCE_COLUMN])
+        for job in list_jobs(SAMPLE_JOB_KIND, jobs_dir) for r in job["results"]
+    ]
+    if summary is not None:
+        rows += [(c["Latitude"], c["Longitude"], c[IRRADIANCE_COLUMN]) for c in summary["cities"].values()]
+
+    samples = pd.DataFrame(rows, columns=["lat", "lon", "ghi"]).dropna()
+    return samples.groupby(["lat", "lon"], as_index=False)["ghi"].mean()
+
+
+class IDWInterpolator:
+    """
+    Inverse-distance interpolation over a KD-tree of sample points.
+
+    Distances are chord lengths between unit vectors, so neighbours are
+    correct across the whole country. The error estimate comes from
+    leave-one-out residuals: each sample's residual when predicted from
+    its own neighbours, spread the same way as the values and scaled by
+    how far the query is from its nearest sample relative to the local
+    sample spacing. It is zero at a sample and about the typical
+    interpolation error midway between samples.
+    """
+
+    def __init__(self, lats, lons, values, neighbours=IDW_NEIGHBOURS, power=IDW_POWER):
+        self.values = np.asarray(values, dtype=np.float64)
+        self.neighbours = min(neighbours, len(self.values))
+        self.power = power
+        self.tree = lazy_import("scipy.spatial").cKDTree(unit_vectors(lats, lons))
+
+        # Leave-one-out: query one extra neighbour and drop the point itself
+        if len(self.values) > 1:
+            distance, index = self.tree.query(self.tree.data, k=min(self.neighbours + 1, len(self.values)))
+            loo = self._weighted(distance[:, 1:], index[:, 1:])
+            self.residuals = np.abs(loo - self.values)
+            self.spacing = distance[:, 1]
+        else:
+            self.residuals = np.zeros(len(self.values))
+            self.spacing = np.ones(len(self.values))
+
+    def _weighted(self, distance, index, values=None):
+        values = self.values if values is None else values
+        weights = 1.0 / np.maximum(distance, 1e-12) ** self.power
+        return (weights * values[index]).sum(axis=1) / weights.sum(axis=1)
+
+    def predict(self, lats, lons):
+        """
+        Returns:
+            (estimate, error estimate) arrays, in the units of the values
+        """
+
+        points = unit_vectors(np.atleast_1d(lats), np.atleast_1d(lons))
+        distance, index = self.tree.query(points, k=self.neighbours)
+        if self.neighbours == 1:
+            distance, index = distance[:, None], index[:, None]
+
+        estimate = self._weighted(distance, index)
+        exact = distance[:, 0] < 1e-12
+        estimate[exact] = self.values[index[exact, 0]]
+
+        local_error = self._weighted(distance, index, self.residuals)
+        closeness = np.clip(distance[:, 0] / self.spacing[index[:, 0]], 0.0, 1.0)
+        return estimate, local_error * closeness
+
+
+def build_surface(samples, surface_path=SURFACE_PATH, bounds=CONUS_BOUNDS, resolution=SURFACE_RESOLUTION_DEG):
+    """
+    Interpolate the samples onto a regular grid and store it as a grid file.
+
+    Columns: lat, lon, ghi (kWh/m²/day), ghi_error (same units). The
+    header records how many samples the surface was built from.
+
+    Raises ValueError with fewer than MIN_SURFACE_SAMPLES samples.
+    """
+
+    if len(samples) < MIN_SURFACE_SAMPLES:
+        raise ValueError(f"Need at least {MIN_SURFACE_SAMPLES} GHI samples to build a surface, got {len(samples)}")
+    interpolator = IDWInterpolator(samples["lat"], samples["lon"], samples["ghi"])
+
+    lats = np.arange(bounds["lat_min"], bounds["lat_max"] + 1e-9, resolution)
+    lons = np.arange(bounds["lon_min"], bounds["lon_max"] + 1e-9, resolution)
+    grid_lat, grid_lon = np.meshgrid(lats, lons, indexing="ij")
+    ghi, error = interpolator.predict(grid_lat.ravel(), grid_lon.ravel())
+
+    surface = pd.DataFrame({"lat": grid_lat.ravel(), "lon": grid_lon.ravel(), "ghi": ghi, "ghi_error": error})
+    os.makedirs(os.path.dirname(surface_path) or ".", exist_ok=True)
+    write_grid(surface, surface_path, source=f"{len(samples)} samples")
+    return surface
+
+
+def load_surface(surface_path=SURFACE_PATH):
+    """The stored surface (memory-mapped, once per file version), or None"""
+
+    version = dataset_version(surface_path)
+    if version is None:
+        return None
+    return grid_cache.get_or_compute((surface_path, version), lambda: load_grid(surface_path))
+
+
+def surface_info(surface_path=SURFACE_PATH):
+    """Header of the stored surface (bounds, resolution, source), or None"""
+
+    if not os.path.exists(surface_path):
+        return None
+    return read_header(surface_path)[0]
+
+
+def estimate_ghi(lats, lons, surface_path=SURFACE_PATH):
+    """
+    GHI and its error estimate at any coordinates, from the stored surface.
+
+    Bilinear interpolation between the four surrounding grid cells;
+    points outside the surface get NaN.
+
+    Returns:
+        (ghi, error) arrays, or None when no surface has been built
+    """
+
+    surface = load_surface(surface_path)
+    if surface is None:
+        return None
+
+    header = surface_info(surface_path)
+    lat_step, lon_step = header["resolution"]["lat"], header["resolution"]["lon"]
+    bounds = header["bounds"]
+    n_lat = int(round((bounds["lat_max"] - bounds["lat_min"]) / lat_step)) + 1
+    n_lon = int(round((bounds["lon_max"] - bounds["lon_min"]) / lon_step)) + 1
+    ghi = surface["ghi"].to_numpy().reshape(n_lat, n_lon)
+    error = surface["ghi_error"].to_numpy().reshape(n_lat, n_lon)
+
+    y = (np.asarray(lats, dtype=np.float64) - bounds["lat_min"]) / lat_step
+    x = (np.asarray(lons, dtype=np.float64) - bounds["lon_min"]) / lon_step
+    outside = (y < 0) | (y > n_lat - 1) | (x < 0) | (x > n_lon - 1)
+    y0 = np.clip(np.floor(y).astype(np.int64), 0, n_lat - 2)
+    x0 = np.clip(np.floor(x).astype(np.int64), 0, n_lon - 2)
+    fy, fx = y - y0, x - x0
+
+    def bilinear(grid):
+        value = (grid[y0, x0] * (1 - fy) * (1 - fx) + grid[y0 + 1, x0] * fy * (1 - fx)
+                 + grid[y0, x0 + 1] * (1 - fy) * fx + grid[y0 + 1, x0 + 1] * fy * fx)
+        return np.where(outside, np.nan, value)
+
+    return bilinear(ghi), bilinear(error)
@@ -0,0 +1,195 @@
+# src/synthetic.py (Synthetic Wind Data)
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# Philox4x64-10 constants (Salmon et al. 2011; the generator behind np.random.Philox)
+PHILOX_M0 = np.uint64(0xD2E7470EE14C6C93)
+PHILOX_M1 = np.uint64(0xCA5A826395121157)
+PHILOX_W0 = np.uint64(0x9E3779B97F4A7C15)
+PHILOX_W1 = np.uint64(0xBB67AE8584CAA73B)
+PHILOX_ROUNDS = 10
+
+_LOW32 = np.uint64(0xFFFFFFFF)
+_SHIFT32 = np.uint64(32)
+
+# Points closer than this share a cell, and therefore their random draws
+CELL_DEG = 1e-4
+
+# Key word that separates wind-feature draws from other uses of the same seed
+FEATURE_STREAM = 0x57494E44  # "WIND"
+
+WIND_DIRECTIONS = np.array([45, 90, 135, 180, 225, 270])
+
+# US wind development regions: (lat, lon, share of turbines, spread in degrees)
+FLEET_REGIONS = [
+    (33.5, -101.5, 0.25, 2.5),   # West Texas / Panhandle
+    (42.0, -94.5, 0.15, 2.0),    # Iowa / Upper Plains
+    (37.0, -98.5, 0.15, 2.0),    # Oklahoma / Kansas
+    (45.5, -98.0, 0.10, 2.0),    # Dakotas / Minnesota
+    (41.5, -105.0, 0.08, 1.5),   # Wyoming / Colorado
+    (35.0, -118.3, 0.07, 1.2),   # California passes
+    (40.5, -88.5, 0.07, 1.2),    # Illinois / Indiana
+    (45.7, -120.5, 0.05, 1.0),   # Columbia Gorge
+    (43.0, -75.5, 0.04, 1.5),    # New York / New England
+    (34.5, -104.0, 0.04, 1.5),   # New Mexico
+]
+
+
+def _mulhilo(a, b):
+    """High and low 64-bit words of the 128-bit product a * b (elementwise)"""
+
+    a_lo, a_hi = a & _LOW32, a >> _SHIFT32
+    b_lo, b_hi = b & _LOW32, b >> _SHIFT32
+    lo_lo = a_lo * b_lo
+    lo_hi = a_lo * b_hi
+    hi_lo = a_hi * b_lo
+    middle = (lo_lo >> _SHIFT32) + (lo_hi & _LOW32) + (hi_lo & _LOW32)
+    high = a_hi * b_hi + (lo_hi >> _SHIFT32) + (hi_lo >> _SHIFT32) + (middle >> _SHIFT32)
+    return high, a * b
+
+
+def philox4x64(counter, key):
+    """
+    Philox4x64-10 block function over many counters at once.
+
+    Args:
+        counter: (4, n) uint64 array, one 256-bit counter per column
+        key: two integers
+
+    Returns:
+        (4, n) uint64 array of random words. Counter c gives the block that
+        np.random.Philox(key=key, counter=c - 1) produces first.
+    """
+
+    x0, x1, x2, x3 = (np.asarray(word, dtype=np.uint64) for word in counter)
+    k0, k1 = np.uint64(key[0]), np.uint64(key[1])
+    with np.errstate(over="ignore"):
+        for round_ in range(PHILOX_ROUNDS):
+            if round_:
+                k0, k1 = k0 + PHILOX_W0, k1 + PHILOX_W1
+            hi0, lo0 = _mulhilo(x0, PHILOX_M0)
+            hi1, lo1 = _mulhilo(x2, PHILOX_M1)
+            x0, x1, x2, x3 = hi1 ^ x1 ^ k0, lo1, hi0 ^ x3 ^ k1, lo0
+    return np.stack([x0, x1, x2, x3])
+
+
+def cell_ids(lats, lons, cell_deg=CELL_DEG):
+    """64-bit id of the lat/lon cell each point falls in"""
+
+    rows = np.rint((np.asarray(lats, dtype=np.float64) + 90.0) / cell_deg).astype(np.uint64)
+    cols = np.rint((np.asarray(lons, dtype=np.float64) + 180.0) / cell_deg).astype(np.uint64)
+    return (rows << _SHIFT32) | cols
+
+
+def cell_uniforms(lats, lons, n_draws, seed=0, stream=FEATURE_STREAM):
+    """
+    Uniform [0, 1) draws that depend only on (seed, stream, cell, draw number).
+
+    The counter is (cell id, block, 0, 0) and the key (seed, stream), so
+    each point's values are the same in any batch, order or thread.
+
+    Returns:
+        (n_draws, n) float64 array
+    """
+
+    cells = cell_ids(lats, lons)
+    zeros = np.zeros_like(cells)
+    blocks = [
+        philox4x64((cells, np.full_like(cells, block), zeros, zeros), (seed, stream))
+        for block in range(-(-n_draws // 4))
+    ]
+    words = np.concatenate(blocks)[:n_draws]
+    # 53 random bits per double, as Generator.random does
+    return (words >> np.uint64(11)).astype(np.float64) * (1.0 / 9007199254740992.0)
+
+
+def synthetic_wind_features(lats, lons, seed=0):
+    """
+    Deterministic synthetic wind climate for any number of points, in one pass.
+
+    Same model as the wind notebook's original per-point generator: mean
+    speed rises away from 35°N, with noise; the others follow from it.
+
+    Returns:
+        DataFrame with mean_ws, std_ws, max_ws (m/s), mean_temp (°C) and
+        dominant_dir (degrees), one row per point
+    """
+
+    lats = np.asarray(lats, dtype=np.float64)
+    u = cell_uniforms(lats, lons, 6, seed)
+
+    # Box-Muller normal from the first two draws
+    normal = np.sqrt(-2.0 * np.log1p(-u[0])) * np.cos(2.0 * np.pi * u[1])
+    base_wind = 6 + np.abs(lats - 35) / 10 + normal
+
+    return pd.DataFrame({
+        "mean_ws": np.clip(base_wind, 4.0, 12.0),
+        "std_ws": np.clip(base_wind * 0.3 + 0.5 + u[2], 1.5, 4.0),
+        "max_ws": np.clip(base_wind * 1.8 + 2 + 3 * u[3], 8.0, 25.0),
+        "mean_temp": 15 - (lats - 35) * 0.5 - 3 + 6 * u[4],
+        "dominant_dir": WIND_DIRECTIONS[(u[5] * len(WIND_DIRECTIONS)).astype(np.int64)]
+    })
+
+
+def synthetic_turbine_fleet(n_turbines=75000, seed=0, turbines_per_project=50):
+    """
+    A USWTDB-shaped turbine table for offline benchmarks.
+
+    Turbines are grouped into projects of varying size around the main US
+    wind regions. Newer projects have larger turbines, as in the real fleet.
+    Capacity is in kW, hub height and rotor diameter in m, like USWTDB.
+
+    Returns:
+        DataFrame with case_id, p_name, p_year, t_cap, t_hh, t_rd, xlong, ylat
+    """
+
+    rng = np.random.Generator(np.random.Philox(key=seed))
+    n_projects = max(1, n_turbines // turbines_per_project)
+
+    regions = np.array([r[:2] for r in FLEET_REGIONS])
+    shares = np.array([r[2] for r in FLEET_REGIONS])
+    spreads = np.array([r[3] for r in FLEET_REGIONS])
+    region = rng.choice(len(FLEET_REGIONS), size=n_projects, p=shares / shares.sum())
+    centers = regions[region] + rng.normal(0, 1, (n_projects, 2)) * spreads[region, None]
+
+    # Project sizes are heavy-tailed; newer projects are more common
+    size_weights = rng.lognormal(0, 1, n_projects)
+    project = rng.choice(n_projects, size=n_turbines, p=size_weights / size_weights.sum())
+    project_year = np.clip(np.rint(2024 - rng.exponential(7, n_projects)), 1990, 2024).astype(np.int64)
+
+    year = project_year[project]
+    age = year - 2000
+    lat = np.clip(centers[project, 0] + rng.normal(0, 0.03, n_turbines), 24.5, 49.5)
+    lon = np.clip(centers[project, 1] + rng.normal(0, 0.04, n_turbines), -125.0, -66.5)
+
+    return pd.DataFrame({
+        "case_id": 3000000 + np.arange(n_turbines),
+        "p_name": np.char.add("Synthetic Wind Project ", project.astype(str)),
+        "p_year": year,
+        "t_cap": np.clip(np.rint((1500 + 60 * age + rng.normal(0, 200, n_turbines)) / 50) * 50, 500, 6000),
+        "t_hh": np.clip(80 + 1.2 * age + rng.normal(0, 5, n_turbines), 50, 140).round(1),
+        "t_rd": np.clip(77 + 2.5 * age + rng.normal(0, 6, n_turbines), 40, 170).round(1),
+        "xlong": lon,
+        "ylat": lat
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic USWTDB-shaped turbine fleet with wind features")
+    parser.add_argument("--turbines", type=int, default=75000, help="Number of turbines")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="synthetic_uswtdb.csv", help="CSV output path")
+    parser.add_argument("--features", action="store_true", help="Also add synthetic wind features per turbine")
+    args = parser.parse_args()
+
+    fleet = synthetic_turbine_fleet(args.turbines, args.seed)
+    if args.features:
+        fleet = pd.concat([fleet, synthetic_wind_features(fleet["ylat"], fleet["xlong"], args.seed)], axis=1)
+    fleet.to_csv(args.output, index=False)
+    print(f"Wrote {len(fleet)} turbines to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+# src/tracing.py (Performance Tracing)
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+# Off unless RENEWWEB_TRACING=1 (or enable() is called); disabled spans cost one flag check
+_enabled = os.getenv("RENEWWEB_TRACING", "0") == "1"
+_trace_file = os.getenv("RENEWWEB_TRACE_FILE")            # JSON lines sink
+_metrics_file = os.getenv("RENEWWEB_METRICS_FILE")        # Prometheus text-format sink
+
+# The metrics file is rewritten at most this often (seconds), by one writer at a time
+METRICS_INTERVAL_S = float(os.getenv("RENEWWEB_METRICS_INTERVAL", "5"))
+
+_lock = threading.Lock()
+_metrics_lock = threading.Lock()
+_metrics_written = 0.0
+_recent = deque(maxlen=500)
+_stats = {}
+_local = threading.local()
+
+# Histogram buckets in seconds (Prometheus convention)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def enable(trace_file=None, metrics_file=None):
+    """Turn tracing on, optionally setting the JSON lines / Prometheus output files"""
+
+    global _enabled, _trace_file, _metrics_file
+    _enabled = True
+    _trace_file = trace_file or _trace_file
+    _metrics_file = metrics_file or _metrics_file
+
+
+def disable():
+    global _enabled
+    _enabled = False
+    # Last write regardless of the interval, so the file ends with the final counts
+    if _metrics_file:
+        with _metrics_lock:
+            try:
+                write_prometheus(_metrics_file)
+            except OSError:
+                pass
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    """Forget all recorded spans and statistics"""
+
+    with _lock:
+        _recent.clear()
+        _stats.clear()
+
+
+class _NoopSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ("name", "attrs", "parent", "start")
+
+    def __init__(self, name, attrs):
+        self.name = name
+        self.attrs = attrs
+        self.parent = None
+        self.start = 0.0
+
+    def set(self, **attrs):
+        """Attach attributes (e.g. row counts) to the span"""
+
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        self.parent = stack[-1].name if stack else None
+        stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self.start
+        _local.stack.pop()
+        _record({
+            "name": self.name,
+            "parent": self.parent,
+            "start": time.time() - duration,
+            "duration_ms": duration * 1000.0,
+            "thread": threading.current_thread().name,
+            "error": exc_type.__name__ if exc_type else None,
+            **({"attrs": self.attrs} if self.attrs else {})
+        })
+        return False
+
+
+def span(name, **attrs):
+    """
+    Time a block of code.
+
+        with span("geocode.reverse", lat=lat):
+            ...
+    """
+
+    if not _enabled:
+        return _NOOP
+    return _Span(name, attrs)
+
+
+def traced(name=None):
+    """Decorator version of span(); the span name defaults to module.function"""
+
+    def decorator(func):
+        span_name = name or f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Span(span_name, {}):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _record(event):
+    seconds = event["duration_ms"] / 1000.0
+    with _lock:
+        _recent.append(event)
+        entry = _stats.get(event["name"])
+        if entry is None:
+            entry = _stats[event["name"]] = {
+                "count": 0, "sum": 0.0, "max": 0.0, "errors": 0, "buckets": [0] * len(BUCKETS)
+            }
+        entry["count"] += 1
+        entry["sum"] += seconds
+        entry["max"] = max(entry["max"], seconds)
+        if event["error"]:
+            entry["errors"] += 1
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                entry["buckets"][i] += 1
+
+        if _trace_file:
+            try:
+                with open(_trace_file, "a") as f:
+                    f.write(json.dumps(event) + "\n")
+            except OSError:
+                pass  # a broken sink must never fail the traced code
+
+    if _metrics_file:
+        _maybe_write_metrics(_metrics_file)
+
+
+def _maybe_write_metrics(path):
+    """Rewrite the metrics file if the last write is older than METRICS_INTERVAL_S"""
+
+    global _metrics_written
+    # Non-blocking: spans finishing while another thread writes simply skip
+    if not _metrics_lock.acquire(blocking=False):
+        return
+    try:
+        now = time.monotonic()
+        if now - _metrics_written < METRICS_INTERVAL_S:
+            return
+        _metrics_written = now
+        write_prometheus(path)
+    except OSError:
+        pass
+    finally:
+        _metrics_lock.release()
+
+
+def recent_spans(limit=100):
+    """Most recent spans, newest first"""
+
+    with _lock:
+        return list(_recent)[-limit:][::-1]
+
+
+def span_stats():
+    """Per-span count / total / mean / max in milliseconds"""
+
+    with _lock:
+        return {
+            name: {
+                "count": s["count"],
+                "total_ms": s["sum"] * 1000.0,
+                "mean_ms": s["sum"] * 1000.0 / s["count"],
+                "max_ms": s["max"] * 1000.0,
+                "errors": s["errors"],
+            }
+            for name, s in _stats.items()
+        }
+
+
+def prometheus_text():
+    """Span durations as a Prometheus histogram in text exposition format"""
+
+    lines = [
+        "# HELP renewweb_span_duration_seconds Duration of traced operations.",
+        "# TYPE renewweb_span_duration_seconds histogram",
+    ]
+    with _lock:
+        for name, s in sorted(_stats.items()):
+            label = name.replace("\\", "\\\\").replace('"', '\\"')
+            for bound, count in zip(BUCKETS, s["buckets"]):
+                lines.append(f'renewweb_span_duration_seconds_bucket{{span="{label}",le="{bound}"}} {count}')
+            lines.append(f'renewweb_span_duration_seconds_bucket{{span="{label}",le="+Inf"}} {s["count"]}')
+            lines.append(f'renewweb_span_duration_seconds_sum{{span="{label}"}} {s["sum"]}')
+            lines.append(f'renewweb_span_duration_seconds_count{{span="{label}"}} {s["count"]}')
+        lines.append("# HELP renewweb_span_errors_total Traced operations that raised.")
+        lines.append("# TYPE renewweb_span_errors_total counter")
+        for name, s in sorted(_stats.items()):
+            label = name.replace("\\", "\\\\").replace('"', '\\"')
+            lines.append(f'renewweb_span_errors_total{{span="{label}"}} {s["errors"]}')
+
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path):
+    """Atomically write the metrics file so a scraper never reads a partial file"""
+
+    # Unique per process and thread, so concurrent writers never share a temp file
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(prometheus_text())
+    os.replace(tmp_path, path)
+
+
+def write_jsonl(path, spans=None):
+    """Append spans (default: all recent spans) to a JSON lines file"""
+
+    spans = recent_spans(limit=len(_recent))[::-1] if spans is None else spans
+    with open(path, "a") as f:
+        for event in spans:
+            f.write(json.dumps(event) + "\n")
+
+
+def render_debug_panel():
+    """Show span statistics in the Streamlit sidebar when tracing is on"""
+
+    if not _enabled:
+        return
+
+    import streamlit as st
+    import pandas as pd
+
+    with st.sidebar.expander("⏱️ Performance", expanded=False):
+        stats = span_stats()
+        if not stats:
+            st.caption("No spans recorded yet")
+            return
+        df = pd.DataFrame.from_dict(stats, orient="index").sort_values("total_ms", ascending=False)
+        st.dataframe(df.round(2), use_container_width=True)
+
+        st.caption("Latest spans")
+        latest = pd.DataFrame(recent_spans(20))[["name", "duration_ms", "parent"]]
+        st.dataframe(latest.round(2), use_container_width=True, hide_index=True)
@@ -0,0 +1,267 @@
+# src/wind_model.py (Wind Model Training)
+import argparse
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.hybrid import unit_vectors
+from src.services import lazy_import
+from src.synthetic import synthetic_turbine_fleet, synthetic_wind_features
+
+WIND_DIR = "renewable_energies/wind"
+USWTDB_PATH = os.path.join(WIND_DIR, "uswtdb.csv")
+FEATURE_CACHE_PATH = os.path.join(WIND_DIR, "turbine_features.parquet")
+MODEL_PATH = os.path.join(WIND_DIR, "wind_model.joblib")
+MODEL_INFO_PATH = os.path.join(WIND_DIR, "wind_model.json")
+
+TURBINE_COLUMNS = ["case_id", "ylat", "xlong", "t_cap", "t_hh", "t_rd", "p_year"]
+SITE_COLUMNS = ["ylat", "xlong", "t_cap", "t_hh", "t_rd", "p_year"]
+WIND_FEATURES = ["mean_ws", "std_ws", "max_ws", "mean_temp"]
+NEIGHBOUR_FEATURES = ["nearest_turbine_km", "turbines_within_10km"]
+FEATURE_COLUMNS = WIND_FEATURES + NEIGHBOUR_FEATURES
+
+NEIGHBOUR_RADIUS_KM = 10.0
+EARTH_RADIUS_KM = 6371.0
+
+
+def load_uswtdb(path=USWTDB_PATH):
+    """
+    Turbines from a local USWTDB CSV (only the columns the model uses).
+
+    Rows without coordinates are dropped.
+    """
+
+    header = pd.read_csv(path, nrows=0).columns
+    fleet = pd.read_csv(path, usecols=[c for c in TURBINE_COLUMNS if c in header], engine="pyarrow")
+    fleet = fleet.dropna(subset=["ylat", "xlong"]).reset_index(drop=True)
+    if "case_id" not in fleet.columns:
+        fleet.insert(0, "case_id", np.arange(len(fleet)))
+    return fleet
+
+
+def site_hashes(fleet):
+    """Content hash per turbine: changes when its location or specs change"""
+
+    columns = [c for c in SITE_COLUMNS if c in fleet.columns]
+    return pd.util.hash_pandas_object(fleet[columns], index=False).to_numpy()
+
+
+def fleet_fingerprint(fleet):
+    """Order-independent fingerprint of a whole fleet"""
+
+    keyed = np.sort(site_hashes(fleet) ^ fleet["case_id"].to_numpy(dtype=np.uint64))
+    return hashlib.sha1(keyed.tobytes()).hexdigest()[:16]
+
+
+def fleet_tree(fleet_lats, fleet_lons):
+    """KD-tree over the fleet (unit-sphere vectors, so chord distances follow great circles)"""
+
+    return lazy_import("scipy.spatial").cKDTree(unit_vectors(fleet_lats, fleet_lons))
+
+
+def neighbour_features(lats, lons, fleet_lats=None, fleet_lons=None, exclude_self=False,
+                       radius_km=NEIGHBOUR_RADIUS_KM, tree=None):
+    """
+    Distance to the nearest turbine and turbine count within radius_km.
+
+    One KD-tree over the fleet answers every point in O(log n).
+
+    Args:
+        exclude_self: the points are the fleet itself, so each point's own
+                      entry is skipped
+        tree: a prebuilt fleet_tree, instead of fleet_lats/fleet_lons
+    """
+
+    tree = tree if tree is not None else fleet_tree(fleet_lats, fleet_lons)
+    points = unit_vectors(lats, lons)
+
+    k = 2 if exclude_self else 1
+    chord, _ = tree.query(points, k=k, workers=-1)
+    if exclude_self:
+        chord = chord[:, 1]
+    nearest_km = 2.0 * EARTH_RADIUS_KM * np.arcsin(np.clip(chord / 2.0, 0.0, 1.0))
+
+    radius_chord = 2.0 * np.sin(radius_km / (2.0 * EARTH_RADIUS_KM))
+    counts = tree.query_ball_point(points, r=radius_chord, return_length=True, workers=-1)
+    if exclude_self:
+        counts = counts - 1
+
+    return pd.DataFrame({"nearest_turbine_km": nearest_km, "turbines_within_10km": counts})
+
+
+def update_feature_cache(fleet, cache_path=FEATURE_CACHE_PATH, wind_features=None):
+    """
+    Per-turbine wind features, computing them only for new or changed turbines.
+
+    The cache holds case_id, the site hash and the wind features of the
+    last fleet. Turbines whose hash is unchanged reuse their row. The rest
+    go through wind_features in one call. Removed turbines are dropped.
+
+    Args:
+        wind_features: (lats, lons) -> DataFrame of WIND_FEATURES; defaults
+                       to the synthetic generator
+
+    Returns:
+        (features aligned with fleet, {"reused", "computed", "removed"})
+    """
+
+    wind_features = wind_features or synthetic_wind_features
+    current = pd.DataFrame({"case_id": fleet["case_id"].to_numpy(), "site_hash": site_hashes(fleet)})
+
+    if os.path.exists(cache_path):
+        cache = pd.read_parquet(cache_path)
+        merged = current.merge(cache, on=["case_id", "site_hash"], how="left")
+        removed = int((~cache["case_id"].isin(current["case_id"])).sum())
+    else:
+        merged = current.assign(**{c: np.nan for c in WIND_FEATURES})
+        removed = 0
+
+    todo = merged[WIND_FEATURES[0]].isna().to_numpy()
+    if todo.any():
+        fresh = wind_features(fleet["ylat"].to_numpy()[todo], fleet["xlong"].to_numpy()[todo])
+        merged.loc[todo, WIND_FEATURES] = fresh[WIND_FEATURES].to_numpy()
+
+    os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    merged[["case_id", "site_hash"] + WIND_FEATURES].to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, cache_path)
+
+    stats = {"reused": int((~todo).sum()), "computed": int(todo.sum()), "removed": removed}
+    return merged[WIND_FEATURES].reset_index(drop=True), stats
+
+
+def build_training_set(fleet, wind):
+    """
+    Feature matrix and label for every turbine.
+
+    The label is the notebook's power proxy (wind power density ∝ v³).
+    """
+
+    neighbours = neighbour_features(fleet["ylat"], fleet["xlong"], fleet["ylat"], fleet["xlong"], exclude_self=True)
+    X = pd.concat([wind.reset_index(drop=True), neighbours], axis=1)[FEATURE_COLUMNS]
+    y = wind["mean_ws"].to_numpy() ** 3
+    return X, y
+
+
+def train_model(X, y, n_estimators=100, seed=42):
+    """
+    Random forest on a held-out split.
+
+    Returns:
+        (model, R² on the 20% test split)
+    """
+
+    ensemble = lazy_import("sklearn.ensemble")
+    model_selection = lazy_import("sklearn.model_selection")
+
+    X_train, X_test, y_train, y_test = model_selection.train_test_split(X, y, test_size=0.2, random_state=seed)
+    model = ensemble.RandomForestRegressor(
+        n_estimators=n_estimators, min_samples_leaf=5, n_jobs=-1, random_state=seed
+    )
+    model.fit(X_train, y_train)
+    return model, float(model.score(X_test, y_test))
+
+
+def train_pipeline(uswtdb_path=USWTDB_PATH, cache_path=FEATURE_CACHE_PATH, model_path=MODEL_PATH,
+                   info_path=MODEL_INFO_PATH, wind_features=None, force=False):
+    """
+    Train the wind model on the full fleet in a local USWTDB file.
+
+    Wind features come from the per-turbine cache, so a new download only
+    pays for turbines that are new or changed. Neighbour features are
+    recomputed for the whole fleet, which takes well under a second with
+    the KD-tree. When the fleet is unchanged since the saved model, the
+    model is kept as is unless force is set.
+
+    Returns:
+        info dict (saved next to the model): fleet size, fingerprint, R²,
+        cache stats and timings
+    """
+
+    joblib = lazy_import("joblib")
+    timings = {}
+
+    start = time.perf_counter()
+    fleet = load_uswtdb(uswtdb_path)
+    fingerprint = fleet_fingerprint(fleet)
+    timings["load_s"] = time.perf_counter() - start
+
+    if not force and os.path.exists(model_path) and os.path.exists(info_path):
+        with open(info_path) as f:
+            info = json.load(f)
+        if info.get("fingerprint") == fingerprint:
+            return dict(info, skipped=True)
+
+    start = time.perf_counter()
+    wind, cache_stats = update_feature_cache(fleet, cache_path, wind_features)
+    timings["wind_features_s"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    X, y = build_training_set(fleet, wind)
+    timings["neighbour_features_s"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    model, r2 = train_model(X, y)
+    timings["train_s"] = time.perf_counter() - start
+
+    joblib.dump(model, model_path)
+    info = {
+        "turbines": len(fleet),
+        "fingerprint": fingerprint,
+        "features": FEATURE_COLUMNS,
+        "r2": r2,
+        "cache": cache_stats,
+        "timings": timings,
+        "trained": time.strftime("%Y-%m-%d %H:%M:%S")
+    }
+    with open(info_path, "w") as f:
+        json.dump(info, f, indent=2)
+
+    return dict(info, skipped=False)
+
+
+def predict_sites(model, lats, lons, fleet, wind_features=None, tree=None):
+    """
+    Model power potential at candidate sites, with neighbour features against the fleet.
+
+    Pass the fleet's fleet_tree when predicting repeatedly against the same fleet.
+    """
+
+    wind_features = wind_features or synthetic_wind_features
+    wind = wind_features(lats, lons)[WIND_FEATURES].reset_index(drop=True)
+    if tree is None:
+        tree = fleet_tree(fleet["ylat"], fleet["xlong"])
+    neighbours = neighbour_features(lats, lons, tree=tree)
+    X = pd.concat([wind, neighbours], axis=1)[FEATURE_COLUMNS]
+    return model.predict(X)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the wind model on the full USWTDB turbine fleet")
+    parser.add_argument("--uswtdb", default=USWTDB_PATH, help="Local USWTDB CSV")
+    parser.add_argument("--synthetic", type=int, metavar="N",
+                        help="First write an N-turbine synthetic fleet to --uswtdb")
+    parser.add_argument("--force", action="store_true", help="Retrain even if the fleet is unchanged")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        synthetic_turbine_fleet(args.synthetic).to_csv(args.uswtdb, index=False)
+
+    info = train_pipeline(args.uswtdb, force=args.force)
+    if info["skipped"]:
+        print(f"Fleet unchanged ({info['turbines']} turbines); kept the model trained {info['trained']}")
+        return
+
+    print(f"Trained on {info['turbines']} turbines, R² = {info['r2']:.4f}")
+    print(f"Wind features: {info['cache']['computed']} computed, {info['cache']['reused']} reused, "
+          f"{info['cache']['removed']} removed")
+    for step, seconds in info["timings"].items():
+        print(f"  {step}: {seconds:.2f}")
+
+
+if __name__ == "__main__":
+    main()
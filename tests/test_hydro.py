@@ -0,0 +1,111 @@
+import struct
+
+import numpy as np
+import pytest
+
+from src import hydro
+
+TEXAS = (-106.5, 26.0, -93.5, 36.5)
+
+
+@pytest.fixture
+def flowlines(tmp_path):
+    return hydro.write_synthetic_flowlines(str(tmp_path / "SyntheticFlowline.shp"), n_reaches=3000, bbox=TEXAS,
+                                           seed=7)
+
+
+def read_records(shp_path):
+    """Every record of a PolyLineZ file, parsed one by one: (bbox, parts, points)"""
+
+    with open(shp_path, "rb") as f:
+        data = f.read()
+    records = []
+    position = 100
+    while position < len(data):
+        (length,) = struct.unpack(">i", data[position + 4:position + 8])
+        content = position + 8
+        box = struct.unpack("<4d", data[content + 4:content + 36])
+        num_parts, num_points = struct.unpack("<2i", data[content + 36:content + 44])
+        parts = struct.unpack(f"<{num_parts}i", data[content + 44:content + 44 + 4 * num_parts])
+        start = content + 44 + 4 * num_parts
+        points = np.frombuffer(data[start:start + 16 * num_points], dtype="<f8").reshape(-1, 2)
+        records.append((box, parts, points))
+        position = content + 2 * length
+    return records
+
+
+def haversine_length_km(points):
+    lon, lat = np.radians(points[:, 0]), np.radians(points[:, 1])
+    a = np.sin(np.diff(lat) / 2) ** 2 + np.cos(lat[:-1]) * np.cos(lat[1:]) * np.sin(np.diff(lon) / 2) ** 2
+    return float((2 * 6371.0 * np.arcsin(np.sqrt(a))).sum())
+
+
+@pytest.mark.parametrize("bbox", [
+    (-100.0, 30.0, -99.0, 31.0),
+    (-106.5, 26.0, -93.5, 36.5),
+    (-98.123, 33.4, -98.1, 33.45),
+    (0.0, 0.0, 1.0, 1.0),
+])
+def test_bbox_query_matches_brute_force(flowlines, bbox):
+    xmin, ymin, xmax, ymax = bbox
+    expected = [i for i, (box, _, _) in enumerate(read_records(flowlines))
+                if box[0] <= xmax and box[2] >= xmin and box[1] <= ymax and box[3] >= ymin]
+
+    result = hydro.query_bbox(hydro.load_spatial_index(flowlines), bbox)
+    assert result.tolist() == expected
+
+
+def test_lengths_skip_the_jump_between_parts(flowlines):
+    records = read_records(flowlines)
+    assert any(len(parts) > 1 for _, parts, _ in records)
+
+    expected = [
+        sum(haversine_length_km(points[start:end]) for start, end in zip(parts, list(parts[1:]) + [len(points)]))
+        for _, parts, points in records
+    ]
+    result = hydro.read_polylines(flowlines, np.arange(len(records)))["length_km"]
+    np.testing.assert_allclose(result, expected, rtol=1e-9)
+
+
+def expected_power(flowlines):
+    """COMID -> head x flow power from the attribute tables written next to the flowlines"""
+
+    folder = flowlines.rsplit("/", 1)[0]
+    elevations = hydro.read_dbf_table(f"{folder}/elevslope.dbf").set_index("COMID")
+    flows = hydro.read_dbf_table(f"{folder}/EROM_MA0001.dbf").set_index("COMID")
+    head_m = (elevations["MAXELEVSMO"] - elevations["MINELEVSMO"]) / 100.0
+    flow_cms = flows["Q0001E"].reindex(head_m.index) * hydro.CFS_TO_CMS
+    return 1000.0 * 9.81 * flow_cms * head_m * hydro.TURBINE_EFFICIENCY / 1000.0
+
+
+def test_screening_returns_the_reaches_above_threshold(flowlines):
+    power = expected_power(flowlines)
+    candidates = hydro.screen_flowlines(flowlines, min_power_kw=500.0)
+
+    assert sorted(candidates["reach_id"].astype(int)) == sorted(power.index[power >= 500.0].astype(int))
+    np.testing.assert_allclose(candidates["power_potential"].to_numpy(),
+                               power.reindex(candidates["reach_id"]).to_numpy(), rtol=1e-9)
+    assert candidates["power_potential"].is_monotonic_decreasing
+
+
+def test_screening_a_bbox_keeps_only_reaches_inside_it(flowlines):
+    bbox = (-101.0, 29.0, -97.0, 33.0)
+    inside = hydro.query_bbox(hydro.load_spatial_index(flowlines), bbox)
+    power = expected_power(flowlines)
+    comids = power.index.to_numpy()[inside]
+
+    candidates = hydro.screen_flowlines(flowlines, bbox=bbox, min_power_kw=100.0)
+    assert sorted(candidates["reach_id"].astype(int)) == sorted(c for c in comids if power[c] >= 100.0)
+
+
+def test_deleted_records_are_skipped(flowlines):
+    dbf_path = flowlines[:-len(".shp")] + ".dbf"
+    _, header_length, record_length, _ = hydro.read_dbf_header(dbf_path)
+    deleted = [0, 5, 17]
+    with open(dbf_path, "r+b") as f:
+        for row in deleted:
+            f.seek(header_length + row * record_length)
+            f.write(b"*")
+
+    candidates = hydro.screen_flowlines(flowlines, min_power_kw=0.0)
+    assert not set(candidates["reach_id"].astype(int)) & {1000000 + row for row in deleted}
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.calculations import pareto_frontier
+
+OBJECTIVES = ["cost", "potential_revenue", "irradiance", "weather_stability", "co2_reduction"]
+DIRECTIONS = ["min", "max", "max", "min", "max"]
+
+
+def brute_force_frontier(configs, objectives):
+    """Rows no other row dominates, by pairwise comparison"""
+
+    signs = np.array([1.0 if objectives[col] == "min" else -1.0 for col in objectives])
+    points = configs[list(objectives)].to_numpy(dtype=np.float64) * signs
+    no_worse = (points[None, :, :] <= points[:, None, :]).all(axis=2)
+    better = (points[None, :, :] < points[:, None, :]).any(axis=2)
+    dominated = (no_worse & better).any(axis=1)
+    return configs[~dominated]
+
+
+def random_configs(rng, n, dims, levels):
+    """Integer-valued objectives from a small range, so ties and duplicate rows are common"""
+
+    data = rng.integers(0, levels, size=(n, dims)).astype(np.float64)
+    configs = pd.DataFrame(data, columns=OBJECTIVES[:dims])
+    # Exact copies of some rows
+    return pd.concat([configs, configs.sample(n // 5, random_state=int(rng.integers(1 << 31)))],
+                     ignore_index=True)
+
+
+@pytest.mark.parametrize("dims", [1, 2, 3, 4, 5])
+@pytest.mark.parametrize("levels", [3, 10, 1000])
+def test_matches_brute_force(dims, levels):
+    rng = np.random.default_rng(dims * 100 + levels)
+    objectives = dict(zip(OBJECTIVES[:dims], DIRECTIONS[:dims]))
+    for n in (1, 2, 7, 60, 400):
+        configs = random_configs(rng, n, dims, levels)
+        expected = brute_force_frontier(configs, objectives)
+        # A small chunk size exercises the chunked skyline for 4+ objectives
+        result = pareto_frontier(configs, objectives, chunk_size=16)
+        pd.testing.assert_frame_equal(result, expected)
+
+
+def test_identical_rows_are_all_kept():
+    configs = pd.DataFrame({"cost": [1.0, 1.0, 2.0], "potential_revenue": [5.0, 5.0, 5.0]})
+    result = pareto_frontier(configs, {"cost": "min", "potential_revenue": "max"})
+    assert result.index.tolist() == [0, 1]
+
+
+def test_ties_in_one_objective():
+    # Equal cost: only the higher revenue survives; equal revenue: only the lower cost
+    configs = pd.DataFrame({"cost": [1.0, 1.0, 2.0, 0.5], "potential_revenue": [4.0, 5.0, 6.0, 4.0]})
+    result = pareto_frontier(configs, {"cost": "min", "potential_revenue": "max"})
+    assert result.index.tolist() == [1, 2, 3]
+
+
+def test_empty_table():
+    configs = pd.DataFrame({"cost": [], "potential_revenue": []})
+    assert len(pareto_frontier(configs, {"cost": "min", "potential_revenue": "max"})) == 0